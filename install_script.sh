@@ -170,13 +170,13 @@ else
 fi
 
 # Install sidecar
-python -m pip install sidecar || pip install sidecar
+python -m pip install sidecar
 
 # Install dev packages if needed
 if [ $INSTALL_MODE == "DEV" ]; then
-	python -m pip install flake8 || pip install flake8
-	python -m pip install selenium || pip install selenium
-	python -m pip install pyvirtualdisplay || pip install pyvirtualdisplay
+	python -m pip install flake8
+	python -m pip install selenium
+	python -m pip install pyvirtualdisplay
 fi
 
 # Install extensions
@@ -185,6 +185,9 @@ jupyter labextension install @jupyter-widgets/jupyterlab-sidecar --no-build
 jupyter labextension install jupyterlab-tutorial-extension --no-build
 jupyter labextension install @jupyterlab/hub-extension --no-build
 
+# Install the kernel side of jupyter-vcdat
+python -m pip install .
+
 # Install jupyter-vcdat extension
 npm install
 jupyter lab build
@@ -5,6 +5,7 @@ jupyter labextension install @jupyter-widgets/jupyterlab-manager --no-build
 jupyter labextension install @jupyter-widgets/jupyterlab-sidecar --no-build
 jupyter labextension install jupyterlab-tutorial-extension --no-build
 jupyter labextension install @jupyterlab/hub-extension
+pip install .
 npm install
 jupyter lab build
 jupyter labextension install jupyter-vcdat@nightly
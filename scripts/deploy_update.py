@@ -76,7 +76,7 @@ SIDECAR_PIP = ("https://files.pythonhosted.org/packages/55/a4/"
 def create_pip_commands(packages, pre=""):
     c = ""
     for p in packages:
-        c += "{}python -m pip install {} || pip install {}\n".format(pre, p, p)
+        c += "{}python -m pip install {}\n".format(pre, p)
     return c[:-1]  # The command string
 
 
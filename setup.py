@@ -0,0 +1,20 @@
+import os
+import json
+
+from setuptools import setup
+
+this_dir = os.path.abspath(os.path.dirname(__file__))
+
+# The kernel package is released with the extension, so it shares its version
+with open(os.path.join(this_dir, 'package.json')) as package_file:
+    version = json.load(package_file)['version']
+
+setup(
+    name='vcdat_kernel',
+    version=version,
+    description='Kernel side of the jupyter-vcdat JupyterLab extension',
+    url='https://github.com/cdat/jupyter-vcdat',
+    license='BSD-3-Clause',
+    packages=['vcdat_kernel'],
+    python_requires='>=3.7',
+)
@@ -35,4 +35,34 @@ export class AppSettings {
       console.error(error);
     }
   }
+
+  @boundMethod
+  public getPushUpdates(): boolean {
+    try {
+      return this.settings.get("pushUpdates").composite as boolean;
+    } catch (error) {
+      console.error(error);
+      return false;
+    }
+  }
+
+  @boundMethod
+  public getLazyLoad(): boolean {
+    try {
+      return this.settings.get("lazyLoad").composite as boolean;
+    } catch (error) {
+      console.error(error);
+      return false;
+    }
+  }
+
+  @boundMethod
+  public getSharedCache(): boolean {
+    try {
+      return this.settings.get("sharedCache").composite as boolean;
+    } catch (error) {
+      console.error(error);
+      return false;
+    }
+  }
 }
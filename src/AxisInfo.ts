@@ -1,5 +1,5 @@
 export default class AxisInfo {
-  public data: number[]; // the raw axis data
+  public data: number[]; // the raw axis data, an evenly strided sample for long axes
   public isTime: boolean; // is this a time axis
   public modulo: number; // is this axis repeating
   public moduloCycle: number;
@@ -2,30 +2,38 @@
 import { NotebookPanel } from "@jupyterlab/notebook";
 
 // Project Components
+import { AppSettings } from "./AppSettings";
 import CellUtilities from "./CellUtilities";
 import AxisInfo from "./AxisInfo";
+import KernelScheduler from "./KernelScheduler";
+import RequestMetrics from "./RequestMetrics";
 import Variable from "./Variable";
 import VariableTracker from "./VariableTracker";
 import {
-  BASE_DATA_READER_NAME,
   CANVAS_CELL_KEY,
+  DEFAULT_CANVAS_HEIGHT,
+  DEFAULT_CANVAS_WIDTH,
   DISPLAY_MODE,
   IMPORT_CELL_KEY,
   MAX_SLABS,
+  REQUEST_PRIORITY,
   REQUIRED_MODULES,
   VCDAT_VERSION,
   VCDAT_VERSION_KEY,
 } from "./constants";
 
 import {
+  CANVAS_DIMENSIONS_CMD,
   CHECK_MODULES_CMD,
   CHECK_SIDECAR_EXISTS_CMD,
+  estimateLoadCommand,
   getSidecarDisplayCommand,
+  reportExportCommand,
 } from "./PythonCommands";
 
 import NotebookUtilities from "./NotebookUtilities";
 import Utilities from "./Utilities";
-import { ExportFormat, ImageUnit } from "./types";
+import { ExportFormat, ImageUnit, LoadMode } from "./types";
 import { boundMethod } from "autobind-decorator";
 
 /**
@@ -36,13 +44,15 @@ export default class CodeInjector {
   private canvasReady: boolean; // Whether the canvas is ready/has been already run
   private _notebookPanel: NotebookPanel;
   private varTracker: VariableTracker;
+  private appSettings: AppSettings;
   private logErrorsToConsole: boolean; // Whether errors should log to console. Should be false during production.
 
-  constructor(variableTracker: VariableTracker) {
+  constructor(variableTracker: VariableTracker, appSettings: AppSettings) {
     this._notebookPanel = null;
     this._isBusy = false;
     this.canvasReady = false;
     this.varTracker = variableTracker;
+    this.appSettings = appSettings;
     this.logErrorsToConsole = true;
   }
 
@@ -198,7 +208,8 @@ canvas = vcs.init(display_target='off')`;
     appendToExistingFile: boolean,
     shuffle: boolean,
     deflate: boolean,
-    deflateValue: number
+    deflateValue: number,
+    exportId?: string
   ): Promise<void> {
     let cmd = ``;
     if (shuffle) {
@@ -212,8 +223,17 @@ canvas = vcs.init(display_target='off')`;
     const variableNameInFile = newVariableName
       ? newVariableName
       : currentVariableName;
+    // Lazy variables are read whole, or refused if they don't fit in memory. They are read
+    // before the file is opened for writing, since they may come from the file being written.
+    cmd += `_vcdat_save_data = vcdat_kernel.write_data(${currentVariableName})\n`;
+    // The kernel's pooled reader of the file is closed, so it doesn't hold the file open
+    cmd += `vcdat_kernel.close_readers('${filename}')\n`;
     cmd += `with cdms2.open('${filename}', "${writeMode}") as f:\n`;
-    cmd += `\tf.write(${currentVariableName}, id='${variableNameInFile}')`;
+    cmd += `\tf.write(_vcdat_save_data, id='${variableNameInFile}')\n`;
+    cmd += `del _vcdat_save_data`;
+    if (exportId) {
+      cmd = reportExportCommand(cmd, filename, exportId);
+    }
 
     await this.inject(
       cmd,
@@ -222,6 +242,9 @@ canvas = vcs.init(display_target='off')`;
       "saveNetCDFFile",
       arguments
     );
+
+    // The file's axes may have changed, read them again when next shown
+    this.varTracker.forgetFileAxes(filename);
   }
 
   /**
@@ -238,7 +261,8 @@ canvas = vcs.init(display_target='off')`;
     width?: string,
     height?: string,
     units?: ImageUnit,
-    provenance?: boolean
+    provenance?: boolean,
+    exportId?: string
   ): Promise<void> {
     let cmd: string;
 
@@ -286,6 +310,9 @@ canvas = vcs.init(display_target='off')`;
 
     // Close command
     cmd += `)`;
+    if (exportId) {
+      cmd = reportExportCommand(cmd, `${name}.${format || "png"}`, exportId);
+    }
 
     await this.inject(
       cmd,
@@ -383,32 +410,19 @@ canvas = vcs.init(display_target='off')`;
 
     // inject the code to load the variable into the notebook
     const varAlias: string = newAlias ? newAlias : variable.alias;
-    let cmd: string = isDerived
-      ? `${varAlias} = ${variable.alias}(`
-      : `${varAlias} = ${BASE_DATA_READER_NAME}("${variable.name}"`;
-
-    // update axis info
-    const axesCount: number = variable.axisInfo.length;
-    if (axesCount > 0) {
-      let axis: AxisInfo = variable.axisInfo[0];
-      const axisCmd: string =
-        axis.first === axis.last
-          ? `${axis.name}=(${axis.first})`
-          : `${axis.name}=(${axis.first}, ${axis.last})`;
-      cmd += isDerived ? axisCmd : `, ${axisCmd}`;
-      for (let idx = 1; idx < axesCount; idx += 1) {
-        axis = variable.axisInfo[idx];
-        cmd +=
-          axis.first === axis.last
-            ? `, ${axis.name}=(${axis.first})`
-            : `, ${axis.name}=(${axis.first}, ${axis.last})`;
+    let cmd: string;
+    if (isDerived) {
+      cmd = `${varAlias} = ${variable.alias}(${this.axisSelectionArgs(
+        variable
+      )})`;
+    } else {
+      cmd = await this.fileLoadCmd({
+        [variable.sourceName]: [[varAlias, variable]],
+      });
+      if (cmd === null) {
+        return;
       }
     }
-    cmd += ")";
-
-    if (!isDerived) {
-      cmd = await this.openCloseFileCmd(variable.sourceName, cmd);
-    }
 
     // Inject the code into the notebook cell
     await this.inject(
@@ -423,45 +437,53 @@ canvas = vcs.init(display_target='off')`;
     this.varTracker.addVariable(variable);
   }
 
+  /**
+   * Loads variables into the notebook. The variables may come from several files, which are read
+   * in parallel.
+   * @param variables The variables to load
+   * @param preview Default false. If true, the axes that are plotted are read with a stride that
+   * fits the canvas, and the variables are marked as previews that can be loaded in full later.
+   */
   @boundMethod
-  public async loadMultipleVariables(variables: Variable[]): Promise<void> {
+  public async loadMultipleVariables(
+    variables: Variable[],
+    preview = false
+  ): Promise<void> {
     if (!variables) {
       return;
     }
 
-    const fileName: string = variables[0].sourceName;
+    // Group the variables by the file they're from
+    const files: { [filePath: string]: [string, Variable][] } = {};
+    variables.forEach((variable: Variable) => {
+      if (!variable.sourceName) {
+        throw Error(`Could not determine what file ${variable.alias} is from.`);
+      }
+      if (!files[variable.sourceName]) {
+        files[variable.sourceName] = [];
+      }
+      files[variable.sourceName].push([variable.alias, variable]);
+    });
 
-    if (!fileName) {
-      throw Error("Could not determine what file the variables are from.");
+    // Create code to load the variables into the notebook
+    const cmd: string = await this.fileLoadCmd(files, preview);
+    if (cmd === null) {
+      return;
+    }
+    if (!cmd) {
+      console.error(
+        "The load command was empty. Could be the path was not correct."
+      );
     }
 
-    let cmd = ``;
     const newSelection = Array<string>();
     variables.forEach((variable: Variable) => {
-      // Create code to load the variable into the notebook
-      cmd += `${variable.alias} = ${BASE_DATA_READER_NAME}("${variable.name}"`;
-      variable.axisInfo.forEach((axis: AxisInfo) => {
-        cmd +=
-          axis.first === axis.last
-            ? `, ${axis.name}=(${axis.first})`
-            : `, ${axis.name}=(${axis.first}, ${axis.last})`;
-      });
-      cmd += ")\n";
-
       // Select variable
       newSelection.push(variable.varID);
 
       // new variable to var tracker
       this.varTracker.addVariable(variable);
     });
-    cmd = cmd.slice(0, cmd.length - 1);
-
-    cmd = await this.openCloseFileCmd(fileName, cmd);
-    if (!cmd) {
-      console.error(
-        "openCloseFileCmd result was empty. Could be the path was not correct."
-      );
-    }
 
     // Inject the code into the notebook cell
     await this.inject(
@@ -479,6 +501,24 @@ canvas = vcs.init(display_target='off')`;
     await this.varTracker.refreshVariables();
   }
 
+  /**
+   * Reads a preview variable again at full resolution, under the same name.
+   * @param variable The preview variable
+   */
+  @boundMethod
+  public async promoteVariable(variable: Variable): Promise<void> {
+    await this.inject(
+      `${variable.alias} = vcdat_kernel.full_resolution(${variable.alias})`,
+      undefined,
+      "Failed to load the variable at full resolution.",
+      "promoteVariable",
+      arguments
+    );
+
+    // Refresh the list, the variable is no longer a preview
+    await this.varTracker.refreshVariables();
+  }
+
   @boundMethod
   public async clearPlot(): Promise<void> {
     await this.inject(
@@ -607,7 +647,8 @@ canvas = vcs.init(display_target='off')`;
     selectedTemplate: string,
     overlayMode: boolean,
     previousDisplayMode: DISPLAY_MODE,
-    currentDisplayMode: DISPLAY_MODE
+    currentDisplayMode: DISPLAY_MODE,
+    preview = false
   ): Promise<[number, string]> {
     // Limit selection to MAX_SLABS
     let selectedVariables: string[] = this.varTracker.selectedVariables;
@@ -633,7 +674,11 @@ canvas = vcs.init(display_target='off')`;
     let cmd = "";
     const sidecarReady: string = await Utilities.sendSimpleKernelRequest(
       this.notebookPanel,
-      CHECK_SIDECAR_EXISTS_CMD
+      CHECK_SIDECAR_EXISTS_CMD,
+      false,
+      REQUEST_PRIORITY.Interactive,
+      undefined,
+      { command: "sidecar-check" }
     );
 
     // Change display target if neccessary
@@ -645,10 +690,20 @@ canvas = vcs.init(display_target='off')`;
       );
     }
 
-    // Create plot injection command string
+    // Create plot injection command string, lazy variables only read the part that's shown.
+    // Variables can be lazy without the lazyLoad setting (from the load size dialog), so
+    // every variable goes through plot_data, which returns other variables as they are.
+    const [width, height]: [number, number] = preview
+      ? await this.canvasSize()
+      : [0, 0];
     cmd += overlayMode ? `canvas.plot(` : `canvas.clear()\ncanvas.plot(`;
     for (const varID of selectedVariables) {
-      cmd += `${this.varTracker.findVariableByID(varID)[1].alias}, `;
+      const alias: string = this.varTracker.findVariableByID(varID)[1].alias;
+      if (preview) {
+        cmd += `vcdat_kernel.preview_data(${alias}, ${width}, ${height}), `;
+      } else {
+        cmd += `vcdat_kernel.plot_data(${alias}), `;
+      }
     }
     cmd += `${templateParam}, ${gmParam})`;
 
@@ -657,7 +712,8 @@ canvas = vcs.init(display_target='off')`;
       undefined,
       "Failed to make plot.",
       "plot",
-      arguments
+      arguments,
+      "plot"
     );
   }
 
@@ -668,6 +724,7 @@ canvas = vcs.init(display_target='off')`;
    * @param errorMsg The error message to provide if injection throws an error
    * @param funcName The name of the function calling the injection
    * @param funcArgs The arguments object of the calling function
+   * @param key If given, an injection with the same key that hasn't run yet is replaced by this one
    * @returns [number, string] The index of the following the newly injected cell, and the output result as a string
    */
   @boundMethod
@@ -676,26 +733,43 @@ canvas = vcs.init(display_target='off')`;
     index?: number,
     errorMsg?: string,
     funcName?: string,
-    funcArgs?: IArguments
+    funcArgs?: IArguments,
+    key?: string
   ): Promise<[number, string]> {
     if (this.notebookPanel === null) {
       throw Error("No notebook, code injection cancelled.");
     }
+    const notebookPanel: NotebookPanel = this.notebookPanel;
     try {
       this._isBusy = true;
-      const idx: number =
-        index || this.notebookPanel.content.model.cells.length - 1;
-      const [newIdx, result]: [
-        number,
-        string
-      ] = await CellUtilities.insertRunShow(
-        this.notebookPanel,
-        idx,
+      // Run the cell ahead of any queued background requests
+      return await RequestMetrics.getMetrics().measure(
+        { command: funcName ? funcName : "inject" },
         code,
-        true
+        (started) =>
+          KernelScheduler.getScheduler(
+            notebookPanel.sessionContext.session.kernel
+          ).schedule(
+            async (): Promise<[number, string]> => {
+              started();
+              const idx: number =
+                index || notebookPanel.content.model.cells.length - 1;
+              const [newIdx, result]: [
+                number,
+                string
+              ] = await CellUtilities.insertRunShow(
+                notebookPanel,
+                idx,
+                code,
+                true
+              );
+              notebookPanel.content.activeCellIndex = newIdx + 1;
+              return [newIdx, result];
+            },
+            REQUEST_PRIORITY.Interactive,
+            key
+          )
       );
-      this.notebookPanel.content.activeCellIndex = newIdx + 1;
-      return [newIdx, result];
     } catch (error) {
       const argStr =
         funcArgs && funcArgs.length > 0 ? `(${[...funcArgs]})` : "()";
@@ -731,32 +805,302 @@ canvas = vcs.init(display_target='off')`;
   }
 
   /**
-   * Will surround specified code with a file open and close command, returns new command as string.
-   * If the file couldn't be opened, returns empty string
-   * @param filePath The path of the file to open
-   * @param code The code that needs the open file
+   * Creates the axis keyword arguments used to select a region of a variable.
+   * Axes without a first and last value (not yet shown in the loader) are left out,
+   * so their full range gets loaded.
+   * @param variable The variable whose axis selection to use
+   */
+  @boundMethod
+  private axisSelectionArgs(variable: Variable): string {
+    const args = Array<string>();
+    variable.axisInfo.forEach((axis: AxisInfo) => {
+      if (axis.first === undefined || axis.last === undefined) {
+        return;
+      }
+      args.push(
+        axis.first === axis.last
+          ? `${axis.name}=(${axis.first})`
+          : `${axis.name}=(${axis.first}, ${axis.last})`
+      );
+    });
+    return args.join(", ");
+  }
+
+  /**
+   * Creates the code that loads variables of one or more files into the notebook. Unless variables
+   * are loaded lazily, the memory their selected regions take is estimated first. If it's more than
+   * the kernel can spare, the user can subsample the regions, load them lazily, load them anyway or
+   * cancel. Returns null if the user cancelled, and empty string if a file couldn't be opened.
+   * @param files The alias to assign and the variable to load for each variable, by file path
+   * @param preview Default false. If true, previews sized to the canvas are loaded instead.
+   */
+  @boundMethod
+  private async fileLoadCmd(
+    files: { [filePath: string]: [string, Variable][] },
+    preview = false
+  ): Promise<string | null> {
+    const filePaths: string[] = Object.keys(files);
+    if (
+      filePaths.length === 0 ||
+      filePaths.some(
+        (filePath: string) => !filePath || !files[filePath].length
+      )
+    ) {
+      throw new Error("Filepath and variables must be defined.");
+    }
+
+    // Check that the files can open before adding them as code
+    const paths: string[] = await Promise.all(
+      filePaths.map(this.checkedFilePath)
+    );
+    if (paths.some((path: string) => !path)) {
+      return "";
+    }
+    const loads: [string, [string, Variable][]][] = paths.map(
+      (path: string, idx: number): [string, [string, Variable][]] => [
+        path,
+        files[filePaths[idx]],
+      ]
+    );
+
+    if (preview) {
+      const canvasSize: [number, number] = await this.canvasSize();
+      return loads
+        .map(([path, variables]: [string, [string, Variable][]]) =>
+          this.previewLoadCmd(path, variables, canvasSize)
+        )
+        .join("\n");
+    }
+    const [mode, strides]: [LoadMode, { [alias: string]: number[] }] = this
+      .appSettings.getLazyLoad()
+      ? ["lazy", {}]
+      : await this.chooseLoadMode(loads);
+    switch (mode) {
+      case "cancel":
+        return null;
+      case "lazy":
+      case "subsample":
+        return loads
+          .map(([path, variables]: [string, [string, Variable][]]) =>
+            this.lazyLoadCmd(
+              path,
+              variables,
+              mode === "subsample" ? strides : undefined
+            )
+          )
+          .join("\n");
+      default:
+        return this.readLoadCmd(loads);
+    }
+  }
+
+  /**
+   * Estimates the memory the variables take once loaded, without reading them, and asks the user
+   * how to load them if it's more than the kernel can spare.
+   * @param loads The path of each file, relative to the notebook, and the alias to assign and the
+   * variable to load for each of its variables
+   * @returns [mode, strides] - How to load the variables, and the strides that subsample each alias
+   */
+  @boundMethod
+  private async chooseLoadMode(
+    loads: [string, [string, Variable][]][]
+  ): Promise<[LoadMode, { [alias: string]: number[] }]> {
+    const requests: [string, string, string, string][] = [];
+    loads.forEach(([path, variables]: [string, [string, Variable][]]) => {
+      variables.forEach(([varAlias, variable]: [string, Variable]) => {
+        requests.push([
+          varAlias,
+          path,
+          variable.name,
+          this.axisSelectionArgs(variable),
+        ]);
+      });
+    });
+    let estimate: any;
+    try {
+      estimate = await Utilities.sendDataRequest(
+        this.notebookPanel,
+        estimateLoadCommand(requests),
+        REQUEST_PRIORITY.Interactive,
+        undefined,
+        {
+          command: "load-estimate",
+          detail: loads
+            .map((load: [string, [string, Variable][]]) => load[0])
+            .join(", "),
+        }
+      );
+    } catch (error) {
+      console.error(error);
+      return ["full", {}];
+    }
+    if (!estimate.limitBytes || estimate.totalBytes <= estimate.limitBytes) {
+      return ["full", {}];
+    }
+
+    const strides: { [alias: string]: number[] } = {};
+    const shapes = Array<string>();
+    Object.keys(estimate.variables).forEach((alias: string) => {
+      const info: any = estimate.variables[alias];
+      strides[alias] = info.strides;
+      shapes.push(
+        `${alias} from ${info.shape.join("x")} to ${info.subsampledShape.join(
+          "x"
+        )}`
+      );
+    });
+    const choice: string = await NotebookUtilities.showChoiceDialog(
+      "Large Selection",
+      `The selected data takes ${Utilities.formatBytes(
+        estimate.totalBytes
+      )} of memory, but the kernel only has ${Utilities.formatBytes(
+        estimate.availableBytes
+      )} available. Subsampling reads every few values along each axis, which shrinks ${shapes.join(
+        ", "
+      )}. Loading lazily reads values only when a plot or computation uses them, and its sum, mean, min, max and std are computed a block at a time.`,
+      ["Subsample", "Load Lazily", "Load Anyway"]
+    );
+    switch (choice) {
+      case "Subsample":
+        return ["subsample", strides];
+      case "Load Lazily":
+        return ["lazy", {}];
+      case "Load Anyway":
+        return ["full", {}];
+      default:
+        return ["cancel", {}];
+    }
+  }
+
+  /**
+   * Creates the code that reads variables. The kernel keeps each file open in its reader pool, so
+   * the path check and later loads from the file don't open it again. With the shared cache
+   * setting, the values are mapped from the cache other kernels on the machine use. Several
+   * variables are read by one call, which reads their files in parallel and assigns every alias
+   * at once, or none of them if a read fails.
+   * @param loads The path of each file, relative to the notebook, and the alias to assign and the
+   * variable to load for each of its variables
    */
   @boundMethod
-  private async openCloseFileCmd(
-    filePath: string,
-    code: string
-  ): Promise<string> {
-    if (!filePath || !code) {
-      throw new Error("Filepath and code must be defined.");
+  private readLoadCmd(loads: [string, [string, Variable][]][]): string {
+    const shared: boolean = this.appSettings.getSharedCache();
+    if (loads.length === 1 && loads[0][1].length === 1) {
+      const [path, [[varAlias, variable]]] = loads[0];
+      const axisCmd: string = this.axisSelectionArgs(variable);
+      return `${varAlias} = vcdat_kernel.${
+        shared ? "shared_variable" : "read_variable"
+      }('${path}', "${variable.name}"${axisCmd ? `, ${axisCmd}` : ""})`;
     }
 
+    const requests = Array<string>();
+    loads.forEach(([path, variables]: [string, [string, Variable][]]) => {
+      variables.forEach(([varAlias, variable]: [string, Variable]) => {
+        requests.push(
+          `    ("${varAlias}", '${path}', "${
+            variable.name
+          }", dict(${this.axisSelectionArgs(variable)})),`
+        );
+      });
+    });
+    return `vcdat_kernel.load_variables([\n${requests.join("\n")}\n]${
+      shared ? ", shared=True" : ""
+    })`;
+  }
+
+  /**
+   * Creates the code that binds variables of a file to lazy variables, which keep the file's
+   * metadata and only read the values a plot or computation uses. With strides, each region is
+   * subsampled and read right away instead.
+   * @param path The path of the file the variables are in, relative to the notebook
+   * @param variables The alias to assign and the variable to load, for each variable
+   * @param strides The stride of each axis to subsample each alias with
+   */
+  @boundMethod
+  private lazyLoadCmd(
+    path: string,
+    variables: [string, Variable][],
+    strides?: { [alias: string]: number[] }
+  ): string {
+    return variables
+      .map(([varAlias, variable]: [string, Variable]) => {
+        const axisCmd: string = this.axisSelectionArgs(variable);
+        let cmd = `${varAlias} = vcdat_kernel.lazy_variable('${path}', "${
+          variable.name
+        }"${axisCmd ? `, ${axisCmd}` : ""})`;
+        if (strides && strides[varAlias]) {
+          cmd += `[${strides[varAlias]
+            .map((stride: number) => `::${stride}`)
+            .join(", ")}]`;
+        }
+        return cmd;
+      })
+      .join("\n");
+  }
+
+  /**
+   * Creates the code that reads previews of variables of a file, with the two axes that are plotted
+   * thinned to fit the canvas.
+   * @param path The path of the file the variables are in, relative to the notebook
+   * @param variables The alias to assign and the variable to load, for each variable
+   * @param canvasSize The width and height of the canvas in pixels
+   */
+  @boundMethod
+  private previewLoadCmd(
+    path: string,
+    variables: [string, Variable][],
+    canvasSize: [number, number]
+  ): string {
+    const [width, height]: [number, number] = canvasSize;
+    return variables
+      .map(([varAlias, variable]: [string, Variable]) => {
+        const axisCmd: string = this.axisSelectionArgs(variable);
+        return `${varAlias} = vcdat_kernel.preview_variable('${path}', "${
+          variable.name
+        }", ${width}, ${height}${axisCmd ? `, ${axisCmd}` : ""})`;
+      })
+      .join("\n");
+  }
+
+  /**
+   * Gets the width and height of the notebook's canvas in pixels.
+   * Returns the default canvas size if there is no canvas yet.
+   */
+  @boundMethod
+  private async canvasSize(): Promise<[number, number]> {
+    try {
+      const output: string = await Utilities.sendSimpleKernelRequest(
+        this.notebookPanel,
+        CANVAS_DIMENSIONS_CMD,
+        false,
+        REQUEST_PRIORITY.Interactive,
+        undefined,
+        { command: "canvas-size" }
+      );
+      const dimensions: number[] = Utilities.strToArray(output);
+      if (dimensions.length === 2) {
+        return [dimensions[0], dimensions[1]];
+      }
+    } catch (error) {
+      console.error(error);
+    }
+    return [DEFAULT_CANVAS_WIDTH, DEFAULT_CANVAS_HEIGHT];
+  }
+
+  /**
+   * Gets the path of a file relative to the notebook, if the file can be opened.
+   * Returns empty string otherwise.
+   * @param filePath The path of the file
+   */
+  @boundMethod
+  private async checkedFilePath(filePath: string): Promise<string> {
     // Get the relative filepath to open the file
     const path = Utilities.getUpdatedPath(
       this.notebookPanel.sessionContext.path,
       filePath
     );
 
-    // Check that file can open before adding it as code
     if (await Utilities.tryFilePath(this.notebookPanel, path)) {
-      // Add code to notebook
-      let newCode = `${BASE_DATA_READER_NAME} = cdms2.open('${path}')\n`;
-      newCode += `${code}\n${BASE_DATA_READER_NAME}.close()`;
-      return newCode;
+      return path;
     }
     console.error(`Opening file failed. Path: ${path}`);
 
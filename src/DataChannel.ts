@@ -0,0 +1,121 @@
+import { Kernel, KernelMessage } from "@jupyterlab/services";
+import { boundMethod } from "autobind-decorator";
+import { DATA_CHANNEL_TARGET } from "./constants";
+
+/**
+ * Receives structured data sent from the kernel over a comm, so results don't need to be
+ * repr'd into a string and parsed again. Numeric lists arrive as binary float64 buffers.
+ * There is one channel for each kernel connection.
+ */
+export default class DataChannel {
+  /**
+   * Gets the data channel of the kernel, registering the comm target if needed.
+   * @param kernel The kernel connection that will send the data
+   */
+  public static getChannel(kernel: Kernel.IKernelConnection): DataChannel {
+    if (!DataChannel.channels[kernel.id]) {
+      DataChannel.channels[kernel.id] = new DataChannel(kernel);
+    }
+    return DataChannel.channels[kernel.id];
+  }
+
+  private static channels: { [kernelId: string]: DataChannel } = {};
+
+  private _requestCount: number;
+  private _pending: {
+    [requestId: string]: {
+      resolve: (payload: any) => void;
+      reject: (reason: any) => void;
+    };
+  };
+
+  constructor(kernel: Kernel.IKernelConnection) {
+    this._requestCount = 0;
+    this._pending = {};
+    kernel.registerCommTarget(DATA_CHANNEL_TARGET, this.handleCommOpen);
+    kernel.disposed.connect(() => {
+      delete DataChannel.channels[kernel.id];
+      this.cancelAll("The kernel was shut down.");
+    });
+  }
+
+  /**
+   * Creates a new request id and a promise for the data the kernel sends with that id.
+   * @returns [requestId, reply] - The id to pass to the kernel and the promise of its data
+   */
+  @boundMethod
+  public expectReply(): [string, Promise<any>] {
+    this._requestCount += 1;
+    const requestId = `${Date.now()}-${this._requestCount}`;
+    const reply = new Promise<any>((resolve, reject) => {
+      this._pending[requestId] = { reject, resolve };
+    });
+    return [requestId, reply];
+  }
+
+  /**
+   * Stops waiting for a reply, for example when the request failed or the data came back another way.
+   * @param requestId The id of the request to stop waiting for
+   * @param reason If given, the reply promise is rejected with this reason
+   */
+  @boundMethod
+  public cancel(requestId: string, reason?: any): void {
+    const pending = this._pending[requestId];
+    if (!pending) {
+      return;
+    }
+    delete this._pending[requestId];
+    if (reason !== undefined) {
+      pending.reject(reason);
+    }
+  }
+
+  @boundMethod
+  private cancelAll(reason: string): void {
+    Object.keys(this._pending).forEach((requestId: string) => {
+      this.cancel(requestId, new Error(reason));
+    });
+  }
+
+  @boundMethod
+  private handleCommOpen(
+    comm: Kernel.IComm,
+    msg: KernelMessage.ICommOpenMsg
+  ): void {
+    const data: any = msg.content.data;
+    const pending = this._pending[data.requestId];
+    if (!pending) {
+      return;
+    }
+    delete this._pending[data.requestId];
+    pending.resolve(this.decode(data.payload, msg.buffers || []));
+  }
+
+  // Replaces the buffer placeholders in the payload with the numbers they hold
+  @boundMethod
+  private decode(value: any, buffers: (ArrayBuffer | ArrayBufferView)[]): any {
+    if (Array.isArray(value)) {
+      return value.map((item: any) => this.decode(item, buffers));
+    }
+    if (!value || typeof value !== "object") {
+      return value;
+    }
+    if (typeof value.vcdatBuffer === "number") {
+      const buffer = buffers[value.vcdatBuffer];
+      // Copy the bytes, the view may not be aligned for a Float64Array
+      const bytes: ArrayBuffer =
+        buffer instanceof ArrayBuffer
+          ? buffer
+          : buffer.buffer.slice(
+              buffer.byteOffset,
+              buffer.byteOffset + buffer.byteLength
+            );
+      return Array.from(new Float64Array(bytes));
+    }
+    const decoded: any = {};
+    Object.keys(value).forEach((key: string) => {
+      decoded[key] = this.decode(value[key], buffers);
+    });
+    return decoded;
+  }
+}
@@ -0,0 +1,219 @@
+import { JupyterFrontEnd } from "@jupyterlab/application";
+import { Session } from "@jupyterlab/services";
+import { UUID } from "@lumino/coreutils";
+import { boundMethod } from "autobind-decorator";
+import { KERNEL_POOL_IDLE_TIMEOUT, KERNEL_POOL_SIZE } from "./constants";
+import { WARM_KERNEL_CMD } from "./PythonCommands";
+
+interface IHelperKernel {
+  session: Session.ISessionConnection;
+  starting: Promise<Session.ISessionConnection>; // resolves once the session has started
+  slot: number; // the helper's number, which names its session path
+  ready: Promise<void>; // resolves once the session has started and run its imports
+  busy: boolean;
+  idleTimer: number;
+}
+
+/**
+ * Keeps helper kernels running for requests that aren't tied to a notebook, like checking that
+ * a file opens. The kernels import cdms2 and vcs when they start, so requests don't wait for a
+ * new kernel and its imports. Kernels start with the first request that needs them, and are shut
+ * down once idle for KERNEL_POOL_IDLE_TIMEOUT or when the page is closed.
+ */
+export default class KernelPool {
+  /**
+   * Gets the helper kernel pool of the application.
+   * @param app The JupyterLab application, whose service manager starts the kernels
+   */
+  public static getPool(app: JupyterFrontEnd): KernelPool {
+    if (!KernelPool.pool) {
+      KernelPool.pool = new KernelPool(app);
+    }
+    return KernelPool.pool;
+  }
+
+  /**
+   * Shuts down the helper kernels of the application's pool, if it has one.
+   */
+  public static disposePool(): void {
+    if (KernelPool.pool) {
+      KernelPool.pool.dispose();
+      KernelPool.pool = null;
+    }
+  }
+
+  private static pool: KernelPool = null;
+
+  private _app: JupyterFrontEnd;
+  private _id: string; // names this page's helper sessions apart from other pages'
+  private _kernels: IHelperKernel[];
+  private _waiting: Array<(kernel: IHelperKernel) => void>; // requests waiting for a free kernel
+  private _shutdowns: { [slot: number]: Promise<void> }; // the last shutdown of each slot's kernel
+
+  constructor(app: JupyterFrontEnd) {
+    this._app = app;
+    this._id = UUID.uuid4();
+    this._kernels = Array<IHelperKernel>();
+    this._waiting = Array<(kernel: IHelperKernel) => void>();
+    this._shutdowns = {};
+    window.addEventListener("beforeunload", this.dispose);
+  }
+
+  /**
+   * Shuts down every helper kernel. Requests still waiting for a kernel are dropped.
+   */
+  @boundMethod
+  public dispose(): void {
+    window.removeEventListener("beforeunload", this.dispose);
+    this._waiting = [];
+    this._kernels.slice().forEach(this.removeKernel);
+  }
+
+  /**
+   * Runs a request with a helper kernel. If every kernel is busy and the pool is full,
+   * the request waits for a kernel to be free.
+   * @param request Sends the request using the kernel's session and returns its result
+   * @returns Promise<T> - The result of the request
+   */
+  @boundMethod
+  public async run<T>(
+    request: (session: Session.ISessionConnection) => Promise<T>
+  ): Promise<T> {
+    const kernel: IHelperKernel = await this.acquire();
+    try {
+      return await request(kernel.session);
+    } finally {
+      this.release(kernel);
+    }
+  }
+
+  // Gets a free, running kernel, starting one if the pool isn't full
+  @boundMethod
+  private async acquire(): Promise<IHelperKernel> {
+    // Drop kernels that died or were shut down from elsewhere
+    this._kernels
+      .filter((kernel: IHelperKernel) => !this.isHealthy(kernel))
+      .forEach(this.removeKernel);
+
+    let kernel: IHelperKernel = this._kernels.find(
+      (helper: IHelperKernel) => !helper.busy
+    );
+    if (kernel) {
+      kernel.busy = true;
+      window.clearTimeout(kernel.idleTimer);
+    } else if (this._kernels.length < KERNEL_POOL_SIZE) {
+      kernel = this.startKernel();
+    } else {
+      kernel = await new Promise<IHelperKernel>((resolve) => {
+        this._waiting.push(resolve);
+      });
+    }
+
+    try {
+      await kernel.ready;
+    } catch (error) {
+      this.removeKernel(kernel);
+      throw error;
+    }
+    return kernel;
+  }
+
+  // Passes the kernel on to a waiting request, or leaves it idle until it times out
+  @boundMethod
+  private release(kernel: IHelperKernel): void {
+    if (this._kernels.indexOf(kernel) < 0) {
+      return;
+    }
+    if (this._waiting.length > 0) {
+      this._waiting.shift()(kernel);
+      return;
+    }
+    kernel.busy = false;
+    window.clearTimeout(kernel.idleTimer);
+    kernel.idleTimer = window.setTimeout(() => {
+      if (!kernel.busy) {
+        this.removeKernel(kernel);
+      }
+    }, KERNEL_POOL_IDLE_TIMEOUT);
+  }
+
+  @boundMethod
+  private startKernel(): IHelperKernel {
+    const slots: number[] = this._kernels.map(
+      (helper: IHelperKernel) => helper.slot
+    );
+    let slot: number = 0;
+    while (slots.indexOf(slot) >= 0) {
+      slot += 1;
+    }
+    const kernel: IHelperKernel = {
+      busy: true,
+      idleTimer: null,
+      ready: null,
+      session: null,
+      slot,
+      starting: null,
+    };
+    kernel.starting = (async (): Promise<Session.ISessionConnection> => {
+      await this._app.serviceManager.sessions.ready;
+      // A kernel shutting down would otherwise be returned for its slot's path
+      await this._shutdowns[slot];
+      // Each helper needs its own path, sessions with the same path share a kernel.
+      // The page's id keeps other pages from sharing, and shutting down, its helpers.
+      return this._app.serviceManager.sessions.startNew({
+        name: "VCDAT Helper",
+        path: `vcdat-helper-${this._id}-${slot}`,
+        type: "",
+      });
+    })();
+    kernel.ready = (async (): Promise<void> => {
+      kernel.session = await kernel.starting;
+      const message = await kernel.session.kernel.requestExecute({
+        code: WARM_KERNEL_CMD,
+        silent: true,
+      }).done;
+      const content: any = message.content;
+      if (content.status !== "ok") {
+        // The kernel can still run requests which don't need these modules
+        console.error(content);
+      }
+    })();
+    this._kernels.push(kernel);
+    return kernel;
+  }
+
+  @boundMethod
+  private isHealthy(kernel: IHelperKernel): boolean {
+    // Kernels still starting up count as healthy, acquire waits for them
+    if (!kernel.session) {
+      return true;
+    }
+    return (
+      !kernel.session.isDisposed &&
+      kernel.session.kernel !== null &&
+      kernel.session.kernel.status !== "dead"
+    );
+  }
+
+  @boundMethod
+  private removeKernel(kernel: IHelperKernel): void {
+    const idx: number = this._kernels.indexOf(kernel);
+    if (idx < 0) {
+      return;
+    }
+    this._kernels.splice(idx, 1);
+    window.clearTimeout(kernel.idleTimer);
+    // A kernel still starting is shut down once its session has started
+    this._shutdowns[kernel.slot] = kernel.starting
+      .then((session: Session.ISessionConnection) =>
+        session.isDisposed ? undefined : session.shutdown()
+      )
+      .catch((error: any) => {
+        console.error(error);
+      });
+    // A request waiting on a full pool gets a new kernel in its place
+    if (this._waiting.length > 0 && this._kernels.length < KERNEL_POOL_SIZE) {
+      this._waiting.shift()(this.startKernel());
+    }
+  }
+}
@@ -0,0 +1,173 @@
+import { Kernel } from "@jupyterlab/services";
+import { boundMethod } from "autobind-decorator";
+import { REQUEST_PRIORITY } from "./constants";
+
+interface IScheduledRequest {
+  key: string; // requests with the same key replace each other while queued
+  priority: REQUEST_PRIORITY;
+  order: number; // requests with the same priority are sent in the order they were scheduled
+  run: () => Promise<any>;
+  // The callers waiting for this request, including those of requests it replaced
+  callers: Array<{
+    resolve: (result: any) => void;
+    reject: (reason: any) => void;
+  }>;
+}
+
+/**
+ * Sends the vcdat requests for a kernel one at a time. The kernel runs requests in the
+ * order they arrive, so holding them here lets interactive requests go ahead of queued
+ * background ones, and lets queued requests be replaced or cancelled before they are sent.
+ * There is one scheduler for each kernel connection.
+ */
+export default class KernelScheduler {
+  /**
+   * Gets the scheduler of the kernel.
+   * @param kernel The kernel connection the requests are sent to
+   */
+  public static getScheduler(
+    kernel: Kernel.IKernelConnection
+  ): KernelScheduler {
+    if (!KernelScheduler.schedulers[kernel.id]) {
+      KernelScheduler.schedulers[kernel.id] = new KernelScheduler(kernel);
+    }
+    return KernelScheduler.schedulers[kernel.id];
+  }
+
+  private static schedulers: { [kernelId: string]: KernelScheduler } = {};
+
+  private _kernel: Kernel.IKernelConnection;
+  private _queue: IScheduledRequest[];
+  private _running: IScheduledRequest;
+  private _requestCount: number;
+
+  constructor(kernel: Kernel.IKernelConnection) {
+    this._kernel = kernel;
+    this._queue = Array<IScheduledRequest>();
+    this._running = null;
+    this._requestCount = 0;
+    kernel.disposed.connect(() => {
+      delete KernelScheduler.schedulers[kernel.id];
+      this.dropQueued(null, new Error("The kernel was shut down."));
+    });
+  }
+
+  /**
+   * Whether a request is running or waiting to be sent.
+   */
+  get isBusy(): boolean {
+    return this._running !== null || this._queue.length > 0;
+  }
+
+  /**
+   * Queues a request to send to the kernel.
+   * @param run Sends the request and returns its result, it's only called once the earlier requests are done
+   * @param priority Requests with a lower priority are sent first
+   * @param key If given, a queued request with the same key is dropped, and its callers get the result
+   * of this request instead. A request that's already running is left to finish.
+   * @returns Promise<T> - The result of the request
+   */
+  @boundMethod
+  public schedule<T>(
+    run: () => Promise<T>,
+    priority: REQUEST_PRIORITY = REQUEST_PRIORITY.Normal,
+    key?: string
+  ): Promise<T> {
+    this._requestCount += 1;
+    const request: IScheduledRequest = {
+      callers: [],
+      key: key ? key : null,
+      order: this._requestCount,
+      priority,
+      run,
+    };
+
+    if (request.key) {
+      this._queue = this._queue.filter((queued: IScheduledRequest) => {
+        if (queued.key !== request.key) {
+          return true;
+        }
+        // The replacement keeps its place if the replaced request was more urgent
+        request.callers = request.callers.concat(queued.callers);
+        request.priority = Math.min(request.priority, queued.priority);
+        request.order = Math.min(request.order, queued.order);
+        return false;
+      });
+    }
+
+    const result = new Promise<T>((resolve, reject) => {
+      request.callers.push({ reject, resolve });
+    });
+    this._queue.push(request);
+    this.sendNext();
+    return result;
+  }
+
+  /**
+   * Drops the queued requests and interrupts the kernel if a request is running.
+   * @param key If given, only requests with this key are cancelled
+   * @returns Promise<number> - The number of requests that were cancelled
+   */
+  @boundMethod
+  public async cancel(key?: string): Promise<number> {
+    const reason = new Error("The request was cancelled.");
+    let cancelled: number = this.dropQueued(key ? key : null, reason);
+    if (this._running && (!key || this._running.key === key)) {
+      cancelled += 1;
+      await this._kernel.interrupt();
+    }
+    return cancelled;
+  }
+
+  // Rejects the queued requests with the key, or all of them if the key is null
+  @boundMethod
+  private dropQueued(key: string, reason: Error): number {
+    const dropped: IScheduledRequest[] = this._queue.filter(
+      (request: IScheduledRequest) => key === null || request.key === key
+    );
+    this._queue = this._queue.filter(
+      (request: IScheduledRequest) => dropped.indexOf(request) < 0
+    );
+    dropped.forEach((request: IScheduledRequest) => {
+      request.callers.forEach((caller) => {
+        caller.reject(reason);
+      });
+    });
+    return dropped.length;
+  }
+
+  // Sends the most urgent queued request, if none is running
+  @boundMethod
+  private async sendNext(): Promise<void> {
+    if (this._running || this._queue.length === 0) {
+      return;
+    }
+    const next: IScheduledRequest = this._queue.reduce(
+      (best: IScheduledRequest, request: IScheduledRequest) => {
+        if (
+          request.priority < best.priority ||
+          (request.priority === best.priority && request.order < best.order)
+        ) {
+          return request;
+        }
+        return best;
+      }
+    );
+    this._queue.splice(this._queue.indexOf(next), 1);
+    this._running = next;
+
+    try {
+      const result: any = await next.run();
+      next.callers.forEach((caller) => {
+        caller.resolve(result);
+      });
+    } catch (error) {
+      next.callers.forEach((caller) => {
+        caller.reject(error);
+      });
+    } finally {
+      this._running = null;
+      this.sendNext();
+    }
+  }
+}
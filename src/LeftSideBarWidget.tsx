@@ -1,10 +1,12 @@
 // Dependencies
 import { JupyterFrontEnd, LabShell } from "@jupyterlab/application";
 import {
+  Notebook,
   NotebookActions,
   NotebookPanel,
   NotebookTracker,
 } from "@jupyterlab/notebook";
+import { Kernel, KernelMessage } from "@jupyterlab/services";
 
 import { ISignal, Signal } from "@lumino/signaling";
 import { CommandRegistry } from "@lumino/commands";
@@ -17,6 +19,8 @@ import CellUtilities from "./CellUtilities";
 import CodeInjector from "./CodeInjector";
 import ErrorBoundary from "./components/ErrorBoundary";
 import PopUpModal from "./components/PopUpModal";
+import KernelPool from "./KernelPool";
+import KernelScheduler from "./KernelScheduler";
 import Variable from "./Variable";
 import VCSMenu from "./components/VCSMenu";
 import {
@@ -28,6 +32,9 @@ import {
   NO_VERSION,
   NOTEBOOK_STATE,
   OLD_VCDAT_VERSION,
+  PUSH_CHANNEL_TARGET,
+  REQUEST_PRIORITY,
+  SIDEBAR_REFRESH_DELAY,
   VCDAT_VERSION,
   VCDAT_VERSION_KEY,
 } from "./constants";
@@ -37,11 +44,13 @@ import VariableTracker from "./VariableTracker";
 import {
   CHECK_PLOT_EXIST_CMD,
   CHECK_VCS_CMD,
-  REFRESH_GRAPHICS_CMD,
-  REFRESH_TEMPLATES_CMD,
+  getSidebarSnapshotCommand,
+  INSTALL_PUSH_HOOK_CMD,
+  refreshGraphicsCommand,
+  refreshTemplatesCommand,
 } from "./PythonCommands";
 import AboutVCDAT from "./components/AboutVCDAT";
-import { ICellModel } from "@jupyterlab/cells";
+import { Cell, ICellModel } from "@jupyterlab/cells";
 import { IIterator } from "@lumino/algorithm";
 import { AppSettings } from "./AppSettings";
 import { boundMethod } from "autobind-decorator";
@@ -108,6 +117,14 @@ export default class LeftSideBarWidget extends Widget {
   private _state: NOTEBOOK_STATE; // Keeps track of the current state of the notebook in the sidebar widget
   private preparing: boolean; // Whether the notebook is currently being prepared
   private activeSidecarOnRight: boolean;
+  private kernelLists: {
+    [kernelId: string]: { [list: string]: { version: string; value: any } };
+  }; // The graphics method and template lists of each kernel, versioned by the vcs registry's hash
+  private plotExistsVersion: string; // The kernel's version of the plot status shown
+  private sidebarRefreshTimer: number; // Delays the sidebar update until cells stop running
+  private sidebarRefreshing: boolean; // Whether a sidebar update is waiting on the kernel
+  private sidebarRefreshQueued: boolean; // Whether cells ran during the current sidebar update
+  private pushKernels: string[]; // The id's of kernels that push sidebar updates after each cell
 
   constructor(
     app: JupyterFrontEnd,
@@ -130,11 +147,17 @@ export default class LeftSideBarWidget extends Widget {
     this._plotReadyChanged = new Signal<this, boolean>(this);
     this._plotExistsChanged = new Signal<this, boolean>(this);
     this.varTracker = new VariableTracker();
-    this.codeInjector = new CodeInjector(this.varTracker);
+    this.codeInjector = new CodeInjector(this.varTracker, this.appSettings);
     this._notebookPanel = null;
     this.graphicsMethods = BASE_GRAPHICS;
     this.templatesList = BASE_TEMPLATES;
     this.kernels = [];
+    this.kernelLists = {};
+    this.plotExistsVersion = null;
+    this.sidebarRefreshTimer = null;
+    this.sidebarRefreshing = false;
+    this.sidebarRefreshQueued = false;
+    this.pushKernels = [];
     this._plotExists = false;
     this.vcsMenuRef = (React as any).createRef();
     this.loadingModalRef = (React as any).createRef();
@@ -183,6 +206,20 @@ export default class LeftSideBarWidget extends Widget {
       },
     });
 
+    // Add command that drops the queued vcdat requests and interrupts the running one
+    app.commands.addCommand("vcdat-cancel-requests", {
+      caption: "Cancel the queued VCDAT requests and interrupt the running one.",
+      execute: async (): Promise<void> => {
+        if (!this.notebookPanel || !this.notebookPanel.sessionContext.session) {
+          return;
+        }
+        await KernelScheduler.getScheduler(
+          this.notebookPanel.sessionContext.session.kernel
+        ).cancel();
+      },
+      label: "Cancel VCDAT Requests",
+    });
+
     // Add command that displays the 'About' dialog
     app.commands.addCommand("vcdat-show-about", {
       caption: "See the VCDAT about page.",
@@ -214,6 +251,14 @@ export default class LeftSideBarWidget extends Widget {
     return this.templatesList;
   };
 
+  /**
+   * Shuts down the helper kernels along with the sidebar.
+   */
+  public dispose(): void {
+    KernelPool.disposePool();
+    super.dispose();
+  }
+
   @boundMethod
   public setPlotExists(plotExists: boolean): void {
     this._plotExists = plotExists;
@@ -247,6 +292,7 @@ export default class LeftSideBarWidget extends Widget {
 
       // Update current notebook
       this._notebookPanel = notebookPanel;
+      this.plotExistsVersion = null;
 
       await this.vcsMenuRef.setState({
         notebookPanel,
@@ -282,6 +328,7 @@ export default class LeftSideBarWidget extends Widget {
             this.kernels.push(
               this.notebookPanel.sessionContext.session.kernel.id
             );
+            await this.startPushUpdates();
             // Update state
             this.state = NOTEBOOK_STATE.VCSReady;
           } else {
@@ -422,6 +469,7 @@ export default class LeftSideBarWidget extends Widget {
 
       // Update kernel list to identify this kernel is ready
       this.kernels.push(this.notebookPanel.sessionContext.session.kernel.id);
+      await this.startPushUpdates();
 
       // Save the notebook
       NotebookUtilities.saveNotebook(this.notebookPanel);
@@ -490,14 +538,21 @@ export default class LeftSideBarWidget extends Widget {
 
   /**
    * This updates the current graphics methods list by sending a command to the kernel directly.
+   * The list is cached for each kernel, and only sent again if vcs elements were added or removed.
    */
   @boundMethod
   public async refreshGraphicsList(): Promise<void> {
     if (this.state === NOTEBOOK_STATE.VCSReady) {
+      const kernelId: string = this.notebookPanel.sessionContext.session.kernel
+        .id;
+      const cached = this.getKernelList(kernelId, "graphics");
       // Refresh the graphic methods
-      const output: string = await Utilities.sendSimpleKernelRequest(
+      const output: any = await Utilities.sendDataRequest(
         this.notebookPanel,
-        REFRESH_GRAPHICS_CMD
+        refreshGraphicsCommand(cached ? cached.version : null),
+        REQUEST_PRIORITY.Background,
+        "graphics-list",
+        { command: "graphics-list" }
       );
 
       // Exit if result is blank
@@ -506,9 +561,7 @@ export default class LeftSideBarWidget extends Widget {
       }
 
       // Update the list of latest variables and data
-      this.graphicsMethods = output
-        ? JSON.parse(output.slice(1, output.length - 1))
-        : BASE_GRAPHICS;
+      this.setKernelList(kernelId, "graphics", output);
     } else {
       this.graphicsMethods = BASE_GRAPHICS;
     }
@@ -516,18 +569,27 @@ export default class LeftSideBarWidget extends Widget {
 
   /**
    * This updates the current templates methods list by sending a command to the kernel directly.
+   * The list is cached for each kernel, and only sent again if templates were added or removed.
    */
   @boundMethod
   public async refreshTemplatesList(): Promise<void> {
     try {
       if (this.state === NOTEBOOK_STATE.VCSReady) {
+        const kernelId: string = this.notebookPanel.sessionContext.session
+          .kernel.id;
+        const cached = this.getKernelList(kernelId, "templates");
         // Refresh the graphic methods
-        const output: string = await Utilities.sendSimpleKernelRequest(
+        const output: any = await Utilities.sendDataRequest(
           this.notebookPanel,
-          REFRESH_TEMPLATES_CMD
+          refreshTemplatesCommand(cached ? cached.version : null),
+          REQUEST_PRIORITY.Background,
+          "templates-list",
+          { command: "templates-list" }
         );
         // Update the list of latest variables and data
-        this.templatesList = Utilities.strToArray(output);
+        if (output) {
+          this.setKernelList(kernelId, "templates", output);
+        }
       } else {
         this.templatesList = BASE_TEMPLATES;
       }
@@ -536,6 +598,84 @@ export default class LeftSideBarWidget extends Widget {
     }
   }
 
+  /**
+   * Updates the graphics methods, templates, variables and plot status with one kernel request.
+   * Only the pieces that changed since the last update are sent back.
+   */
+  @boundMethod
+  public async refreshSidebarState(): Promise<void> {
+    if (this.state !== NOTEBOOK_STATE.VCSReady) {
+      return;
+    }
+    // Cells that run during an update are covered by one more update after it
+    if (this.sidebarRefreshing) {
+      this.sidebarRefreshQueued = true;
+      return;
+    }
+    this.sidebarRefreshing = true;
+    try {
+      const snapshot: any = await Utilities.sendDataRequest(
+        this.notebookPanel,
+        getSidebarSnapshotCommand(
+          this.getSidebarVersions(),
+          this.varTracker.refreshToken
+        ),
+        REQUEST_PRIORITY.Background,
+        undefined,
+        { command: "sidebar-snapshot" }
+      );
+      await this.applySidebarSnapshot(snapshot);
+    } catch (error) {
+      console.error(error);
+    } finally {
+      this.sidebarRefreshing = false;
+    }
+
+    if (this.sidebarRefreshQueued) {
+      this.sidebarRefreshQueued = false;
+      await this.refreshSidebarState();
+    }
+  }
+
+  /**
+   * Has the notebook's kernel push sidebar updates after each cell, if enabled in the settings.
+   * The hook is installed again whenever the imports cell runs, since a restart removes it.
+   * Kernels which can't install the hook keep using refreshSidebarState after each cell.
+   */
+  @boundMethod
+  public async startPushUpdates(): Promise<void> {
+    if (!this.notebookPanel || !this.appSettings.getPushUpdates()) {
+      return;
+    }
+    const kernel: Kernel.IKernelConnection = this.notebookPanel.sessionContext
+      .session.kernel;
+    kernel.registerCommTarget(
+      PUSH_CHANNEL_TARGET,
+      (comm: Kernel.IComm, msg: KernelMessage.ICommOpenMsg) => {
+        // Updates from kernels of other notebooks are picked up when switching to them
+        if (
+          this.notebookPanel &&
+          this.notebookPanel.sessionContext.session.kernel === kernel
+        ) {
+          const data: any = msg.content.data;
+          this.applySidebarSnapshot(data.snapshot);
+        }
+      }
+    );
+    try {
+      const installed: string = await Utilities.sendSimpleKernelRequest(
+        this.notebookPanel,
+        INSTALL_PUSH_HOOK_CMD
+      );
+      if (installed === "True" && this.pushKernels.indexOf(kernel.id) < 0) {
+        this.pushKernels.push(kernel.id);
+        kernel.statusChanged.connect(this.handleKernelStatusChanged, this);
+      }
+    } catch (error) {
+      console.error(error);
+    }
+  }
+
   /**
    * Will update the state of the widget's current notebook panel.
    * This serves other functions that base their action on the notebook's current state
@@ -604,8 +744,12 @@ export default class LeftSideBarWidget extends Widget {
     this.preparing = true;
 
     try {
-      // Check the file can be opened with cdms2
-      if (!(await Utilities.tryFilePath(this.application, currentFile))) {
+      // Without a notebook, check the file opens before creating one. Otherwise
+      // the variable scan below reports the error in the same request.
+      if (
+        !this.notebookPanel &&
+        !(await Utilities.tryFilePath(this.application, currentFile))
+      ) {
         NotebookUtilities.showMessage(
           "Notice",
           "The file could not be opened. Check the path is valid."
@@ -632,9 +776,16 @@ export default class LeftSideBarWidget extends Widget {
       currentIdx = await this.codeInjector.injectImportsCode();
 
       // Open the variable launcher modal
-      const fileVars: Variable[] = await this.varTracker.getFileVariables(
-        currentFile
-      );
+      let fileVars: Variable[];
+      try {
+        fileVars = await this.varTracker.getFileVariables(currentFile);
+      } catch (error) {
+        await this.loadingModalRef.hide();
+        NotebookUtilities.showMessage(error.ename, error.evalue);
+        console.error(`File could not be opened: ${currentFile}`);
+        this.varTracker.currentFile = "";
+        return;
+      }
 
       // Stop load screen
       await this.loadingModalRef.hide();
@@ -659,6 +810,7 @@ export default class LeftSideBarWidget extends Widget {
 
       // Update kernel list to identify this kernel is ready
       this.kernels.push(this.notebookPanel.sessionContext.session.kernel.id);
+      await this.startPushUpdates();
 
       // Save the notebook to preserve the cell metadata, update state
       this.state = NOTEBOOK_STATE.VCSReady;
@@ -858,24 +1010,134 @@ export default class LeftSideBarWidget extends Widget {
     this.updateActiveSidecar();
   }
 
+  // The sidebar asks for updates again once a kernel restarts, until the hook is installed again
   @boundMethod
-  private async handleNotebookCellRun(): Promise<void> {
-    if (this.state !== NOTEBOOK_STATE.VCSReady) {
+  private handleKernelStatusChanged(
+    kernel: Kernel.IKernelConnection,
+    status: Kernel.Status
+  ): void {
+    if (status !== "restarting" && status !== "autorestarting") {
       return;
     }
-    try {
-      this.refreshGraphicsList();
-      this.refreshTemplatesList();
-      await this.varTracker.refreshVariables();
-      const plotExists = await this.checkPlotExists();
-      this.setPlotExists(plotExists);
+    const idx: number = this.pushKernels.indexOf(kernel.id);
+    if (idx >= 0) {
+      this.pushKernels.splice(idx, 1);
+    }
+  }
 
-      // Prevent sidebar from opening unless plot to sidecar is active
-      this.setSidecarPanel(
-        this.vcsMenuRef.state.currentDisplayMode === DISPLAY_MODE.Sidecar
-      );
-    } catch (error) {
-      console.error(error);
+  // The version of each piece of sidebar state shown, to send with a snapshot request
+  @boundMethod
+  private getSidebarVersions(): { [piece: string]: string } {
+    const versions: { [piece: string]: string } = {};
+    const kernelId: string = this.notebookPanel.sessionContext.session.kernel
+      .id;
+    ["graphics", "templates"].forEach((list: string) => {
+      const cached = this.getKernelList(kernelId, list);
+      if (cached) {
+        versions[list] = cached.version;
+      }
+    });
+    if (this.plotExistsVersion) {
+      versions.plotExists = this.plotExistsVersion;
+    }
+    return versions;
+  }
+
+  @boundMethod
+  private getKernelList(
+    kernelId: string,
+    list: string
+  ): { version: string; value: any } {
+    const lists = this.kernelLists[kernelId];
+    return lists ? lists[list] : undefined;
+  }
+
+  /**
+   * Stores a graphics method or template list the kernel sent and shows it.
+   * If the kernel replied that the list is unchanged, the cached copy is shown.
+   * @param kernelId The kernel the list came from
+   * @param list Which list, 'graphics' or 'templates'
+   * @param reply The kernel's reply: {version, value} or {version, unchanged: true}
+   */
+  @boundMethod
+  private setKernelList(kernelId: string, list: string, reply: any): void {
+    if (!this.kernelLists[kernelId]) {
+      this.kernelLists[kernelId] = {};
+    }
+    if (!reply.unchanged) {
+      this.kernelLists[kernelId][list] = {
+        value: reply.value,
+        version: reply.version,
+      };
+    }
+    const cached = this.kernelLists[kernelId][list];
+    if (!cached) {
+      return;
+    }
+    // An unchanged list keeps the same object, so the menus see no change
+    if (list === "graphics") {
+      this.graphicsMethods = cached.value;
+    } else {
+      this.templatesList = cached.value;
+    }
+  }
+
+  // Updates the sidebar with the state the kernel sent, which holds only the pieces that changed
+  @boundMethod
+  private async applySidebarSnapshot(snapshot: any): Promise<void> {
+    if (!snapshot) {
+      return;
+    }
+    // Lists that weren't sent are unchanged, use the kernel's cached copy
+    const kernelId: string = this.notebookPanel.sessionContext.session.kernel
+      .id;
+    this.setKernelList(
+      kernelId,
+      "graphics",
+      snapshot.graphics ? snapshot.graphics : { unchanged: true }
+    );
+    this.setKernelList(
+      kernelId,
+      "templates",
+      snapshot.templates ? snapshot.templates : { unchanged: true }
+    );
+    await this.varTracker.applyVariableChanges(snapshot.variables);
+    if (snapshot.plotExists) {
+      this.plotExistsVersion = snapshot.plotExists.version;
+      this.setPlotExists(snapshot.plotExists.value);
+    } else {
+      this.setPlotExists(this.plotExists);
+    }
+
+    // Prevent sidebar from opening unless plot to sidecar is active
+    this.setSidecarPanel(
+      this.vcsMenuRef.state.currentDisplayMode === DISPLAY_MODE.Sidecar
+    );
+  }
+
+  @boundMethod
+  private handleNotebookCellRun(
+    sender: any,
+    args: { notebook: Notebook; cell: Cell }
+  ): void {
+    if (this.state !== NOTEBOOK_STATE.VCSReady) {
+      return;
+    }
+    const kernel: Kernel.IKernelConnection = this.notebookPanel.sessionContext
+      .session.kernel;
+    // A restart drops the kernel's hook, so it's installed again with the imports
+    if (args.cell.model.metadata.has(IMPORT_CELL_KEY)) {
+      this.startPushUpdates();
     }
+    // The kernel sends its own updates
+    if (this.pushKernels.indexOf(kernel.id) >= 0) {
+      return;
+    }
+    // Wait for cells to stop running, so a burst of runs (like Run All) causes one update
+    window.clearTimeout(this.sidebarRefreshTimer);
+    this.sidebarRefreshTimer = window.setTimeout(
+      this.refreshSidebarState,
+      SIDEBAR_REFRESH_DELAY
+    );
   }
 }
@@ -54,6 +54,28 @@ export default class NotebookUtilities {
     return false;
   }
 
+  /**
+   * Opens a pop-up dialog in JupyterLab with a button for each choice and a cancel button.
+   * @param title The title for the message popup
+   * @param msg The message
+   * @param choices The labels of the choice buttons
+   * @param cancelLabel The label to use for the cancel button. Default is 'Cancel'
+   * @returns Promise<string> - A promise containing the label of the choice, or empty string if cancelled.
+   */
+  public static async showChoiceDialog(
+    title: string,
+    msg: string,
+    choices: string[],
+    cancelLabel = "Cancel"
+  ): Promise<string> {
+    const buttons: readonly Dialog.IButton[] = [
+      ...choices.map((label: string) => Dialog.okButton({ label })),
+      Dialog.cancelButton({ label: cancelLabel }),
+    ];
+    const result = await showDialog({ title, buttons, body: msg });
+    return result.button.accept ? result.button.label : "";
+  }
+
   /**
    * @description Creates a new JupyterLab notebook for use by the application
    * @param command The command registry
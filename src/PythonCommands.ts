@@ -1,7 +1,9 @@
 import {
+  DATA_CHANNEL_TARGET,
   DISPLAY_MODE,
-  MAX_DIM_LENGTH,
+  EXTENSIONS,
   OUTPUT_RESULT_NAME,
+  PUSH_CHANNEL_TARGET,
   REQUIRED_MODULES,
 } from "./constants";
 
@@ -10,6 +12,17 @@ function safe(baseName: string): string {
   return `${baseName}_F9FY9AE028RRF982`;
 }
 
+// Calls a function of the vcdat_kernel package and stores its result in the output variable
+function kernelCall(funcName: string, ...args: string[]): string {
+  return `import vcdat_kernel\n\
+${OUTPUT_RESULT_NAME} = vcdat_kernel.${funcName}(${args.join(", ")})\n`;
+}
+
+// Converts a string to a python string literal, or None if it's null
+function pyString(value: string | null): string {
+  return value === null || value === undefined ? "None" : JSON.stringify(value);
+}
+
 // PYTHON COMMAND CONSTANTS
 export const CANVAS_DIMENSIONS_CMD = `${OUTPUT_RESULT_NAME}=[canvas.width,canvas.height]`;
 
@@ -35,18 +48,11 @@ export const CHECK_SIDECAR_EXISTS_CMD = `try:\n\
 except NameError:\n\
 	${OUTPUT_RESULT_NAME}=False\n`;
 
-export const REFRESH_GRAPHICS_CMD = `import __main__\n\
-import json\n\
-def graphic_methods():\n\
-	out = {}\n\
-	for type in vcs.graphicsmethodlist():\n\
-		out[type] = vcs.listelements(type)\n\
-	return out\n\
-${OUTPUT_RESULT_NAME} = json.dumps(graphic_methods())\n`;
-
-export const REFRESH_TEMPLATES_CMD = `import __main__\n\
-import json\n\
-${OUTPUT_RESULT_NAME} = json.dumps(vcs.listelements('template'))\n`;
+// Run by helper kernels when they start, so requests don't wait on these imports
+export const WARM_KERNEL_CMD = `import cdms2\n\
+import vcs\n\
+import numpy\n\
+import vcdat_kernel\n`;
 
 export const CHECK_MODULES_CMD = `import types\n\
 import json\n\
@@ -70,187 +76,154 @@ def canvases():\n\
 	return out\n\
 ${OUTPUT_RESULT_NAME} = json.dumps(canvases())\n`;
 
-const AXIS_INFO_CODE = `\n\
-	${safe("first")} = float(${safe("axis")}[:].min())\n\
-	${safe("last")} = float(${safe("axis")}[:].max())\n\
-	if len(${safe("axis")}) < ${MAX_DIM_LENGTH}:\n\
-		${safe("axis_data")} = ${safe("axis")}[:].tolist()\n\
-	else:\n\
-		${safe("axis_data")} = vcs.utils.mkscale(${safe("first")},${safe(
-  "last"
-)},${MAX_DIM_LENGTH})\n\
-	# Get a displayable name for the variable\n\
-	if hasattr(${safe("axis")}, 'id'):\n\
-		${safe("name")} = ${safe("axis")}.id\n\
-	else:\n\
-		${safe("name")} = ${safe("aname")}\n\
-	if hasattr(${safe("axis")}, 'units'):\n\
-		${safe("units")} = ${safe("axis")}.units\n\
-	else:\n\
-		${safe("units")} = 'Unknown'\n\
-	${safe("outAxes")}[${safe("aname")}] = {\n\
-		'name': ${safe("name")},\n\
-		'shape': ${safe("axis")}.shape,\n\
-		'units': ${safe("units")},\n\
-		'modulo': ${safe("axis")}.getModulo(),\n\
-		'moduloCycle': ${safe("axis")}.getModuloCycle(),\n\
-		'data': ${safe("axis_data")},\n\
-		'first': ${safe("first")},\n\
-		'last': ${safe("last")},\n\
-		'isTime': ${safe("axis")}.isTime()\n\
-	}\n`;
-
-const VAR_INFO_CODE = `# Get a displayable name for the variable\n\
-	if hasattr(${safe("var")}, 'long_name'):\n\
-		${safe("name")} = ${safe("var")}.long_name\n\
-	elif hasattr(${safe("var")}, 'title'):\n\
-		${safe("name")} = ${safe("var")}.title\n\
-	elif hasattr(${safe("var")}, 'id'):\n\
-		${safe("name")} = ${safe("var")}.id\n\
-	else:\n\
-		${safe("name")} = ${safe("vname")}\n\
-	if hasattr(${safe("var")}, 'units'):\n\
-		${safe("units")} = ${safe("var")}.units\n\
-	else:\n\
-		${safe("units")} = 'Unknown'\n\
-	${safe("axisList")} = []\n\
-	for ${safe("axis")} in ${safe("var")}.getAxisList():\n\
-		${safe("axisList")}.append(${safe("axis")}.id)\n\
-	${safe("lonLat")} = None\n\
-	if ${safe("var")}.getLongitude() and ${safe("var")}.getLatitude() and \
-		not isinstance(${safe("var")}.getGrid(), cdms2.grid.AbstractRectGrid):\n\
-		# for curvilinear and generic grids\n\
-		# 1. getAxisList() returns the axes and\n\
-		# 2. getLongitude() and getLatitude() return the lon,lat variables\n\
-		lonName = ${safe("var")}.getLongitude().id\n\
-		latName = ${safe("var")}.getLatitude().id\n\
-		${safe("lonLat")} = [lonName, latName]\n\
-		# add min/max for longitude/latitude\n\
-		if (lonName not in ${safe("outVars")}):\n\
-			${safe("outVars")}[lonName] = {}\n\
-		lonData =${safe("var")}.getLongitude()[:]\n\
-		${safe("outVars")}[lonName]['bounds'] = \
-		[float(numpy.amin(lonData)), float(numpy.amax(lonData))]\n\
-		if (latName not in ${safe("outVars")}):\n\
-			${safe("outVars")}[latName] = {}\n\
-		latData =${safe("var")}.getLatitude()[:]\n\
-		${safe("outVars")}[latName]['bounds'] = \
-		[float(numpy.amin(latData)), float(numpy.amax(latData))]\n\
-	if (isinstance(${safe("var")}.getGrid(), cdms2.grid.AbstractRectGrid)):\n\
-		gridType = 'rectilinear'\n\
-	elif (isinstance(${safe("var")}.getGrid(), cdms2.hgrid.AbstractCurveGrid)):\n\
-		gridType = 'curvilinear'\n\
-	elif (isinstance(${safe(
-    "var"
-  )}.getGrid(), cdms2.gengrid.AbstractGenericGrid)):\n\
-		gridType = 'generic'\n\
-	else:\n\
-		gridType = None\n\
-	if (${safe("vname")} not in ${safe("outVars")}):\n\
-		${safe("outVars")}[${safe("vname")}] = {}\n\
-	${safe("outVars")}[${safe("vname")}]['name'] = ${safe("name")}\n\
-	${safe("outVars")}[${safe("vname")}]['pythonID'] = id(${safe("var")})\n\
-	${safe("outVars")}[${safe("vname")}]['shape'] =${safe("var")}.shape\n\
-	${safe("outVars")}[${safe("vname")}]['units'] = ${safe("units")}\n\
-	${safe("outVars")}[${safe("vname")}]['axisList'] = ${safe("axisList")}\n\
-	${safe("outVars")}[${safe("vname")}]['lonLat'] = ${safe("lonLat")}\n\
-	${safe("outVars")}[${safe("vname")}]['gridType'] = gridType\n\
-	if ('bounds' not in ${safe("outVars")}[${safe("vname")}]):\n\
-		${safe("outVars")}[${safe("vname")}]['bounds'] = None\n`;
-
-export const REFRESH_VAR_CMD = `import __main__\n\
-import json\n\
-import cdms2\n\
-import numpy\n\
-def variables():\n\
-	out = []\n\
-	for nm, obj in __main__.__dict__.items():\n\
-		if isinstance(obj, cdms2.MV2.TransientVariable):\n\
-			out+=[nm]\n\
-	return out\n\
-${safe("vars")} = variables()\n\
-${safe("outVars")} = {}\n\
-for ${safe("vname")} in ${safe("vars")}:\n\
-	${safe("var")} = __main__.__dict__[${safe("vname")}]\n\
-	${VAR_INFO_CODE}\
-${OUTPUT_RESULT_NAME} = json.dumps(${safe("outVars")})\n\
-${safe("var")} = None`;
+// Installs a post_run_cell hook which sends changes to the sidebar state over a comm after each cell.
+// Cells that don't change any CDAT objects send nothing. Outputs False if the kernel isn't IPython.
+export const INSTALL_PUSH_HOOK_CMD = kernelCall(
+  "install_push_hook",
+  `'${PUSH_CHANNEL_TARGET}'`,
+  `'${OUTPUT_RESULT_NAME}'`
+);
 
 // FUNCTIONS THAT GENERATE PYTHON COMMANDS
 export function checkCDMS2FileOpens(filename: string): string {
-  const command = `import cdms2\n\
-try:\n\
-	file=cdms2.open("${filename}")\n\
-	file.close()\n\
-	${OUTPUT_RESULT_NAME} = True\n\
-except:\n\
-	${OUTPUT_RESULT_NAME} = False`;
-  return command;
+  return kernelCall("file_opens", pyString(filename));
+}
+
+/**
+ * Wraps export code so the kernel sends the info of the exported file over the data channel
+ * as soon as the code has run, even if other cells run between the injection and the export.
+ * @param code The code that writes the file
+ * @param filename The name of the exported file, in the notebook's directory
+ * @param requestId The data channel id to send the info with
+ */
+export function reportExportCommand(
+  code: string,
+  filename: string,
+  requestId: string
+): string {
+  const header = `with vcdat_kernel.report_export(${pyString(
+    filename
+  )}, ${pyString(requestId)}, '${DATA_CHANNEL_TARGET}'):`;
+  const body: string = code
+    .split("\n")
+    .map((line: string) => `\t${line}`)
+    .join("\n");
+  return `${header}\n${body}`;
 }
 
-export function checkForExportedFileCommand(filename: string): string {
-  return `import os\n\
-import time\n\
-def check_for_exported_file():\n\
-	exported_file_path = os.path.join(os.getcwd(), '${filename}')\n\
-	counter = 0\n\
-	while not os.path.exists(exported_file_path):\n\
-		time.sleep(1)\n\
-		counter +=1\n\
-		if counter == 15:\n\
-			return False\n\
-	return True\n\
-${OUTPUT_RESULT_NAME}=check_for_exported_file()\n`;
+// Gets the path and byte size of an exported file, or an error if it doesn't exist
+export function exportInfoCommand(filename: string): string {
+  return kernelCall("export_info", pyString(filename));
 }
 
+/**
+ * Gets the info of the variables in a file and a summary of its axes, from the metadata cache if
+ * the file hasn't changed since it was last read.
+ * @param relativePath The path of the file
+ */
 export function getFileVarsCommand(relativePath: string): string {
-  return `import json\n\
-import cdms2\n\
-import vcs\n\
-import numpy\n\
-${safe("reader")} = cdms2.open('${relativePath}')\n\
-${safe("outVars")} = {}\n\
-for ${safe("vname")} in ${safe("reader")}.variables:\n\
-	${safe("var")} = ${safe("reader")}.variables[${safe("vname")}]\n\
-	${VAR_INFO_CODE}\
-${safe("outAxes")} = {}\n\
-for ${safe("aname")} in ${safe("reader")}.axes:\n\
-	${safe("axis")} = ${safe("reader")}.axes[${safe("aname")}]\n\
-	${AXIS_INFO_CODE}\
-${safe("reader")}.close()\n\
-${OUTPUT_RESULT_NAME} = json.dumps({\n\
-	'vars': ${safe("outVars")},\n\
-	'axes': ${safe("outAxes")}\n\
-})\n\
-${safe("var")} = None\n`;
+  return kernelCall("scan_file", pyString(relativePath));
 }
 
-export function getAxisInfoFromFileCommand(relativePath: string): string {
-  return `import json\n\
-import cdms2\n\
-import vcs\n\
-${safe("reader")} = cdms2.open('${relativePath}')\n\
-${safe("outAxes")} = {}\n\
-for ${safe("aname")} in ${safe("reader")}.axes:\n\
-	${safe("axis")} = ${safe("reader")}.axes[${safe("aname")}]\n\
-	${AXIS_INFO_CODE}\
-${safe("reader")}.close()\n\
-${OUTPUT_RESULT_NAME} = json.dumps(${safe("outAxes")})\n`;
+/**
+ * Gets the full axis info (values, first/last, modulo) for axes in a file.
+ * Each axis is cached on disk separately, so the file is only read for axes not seen before.
+ * @param relativePath The path of the file containing the axes
+ * @param axisNames The axes to get info for. If left out, all axes in the file are used.
+ */
+export function getAxisInfoFromFileCommand(
+  relativePath: string,
+  axisNames?: string[]
+): string {
+  return kernelCall(
+    "file_axes_info",
+    pyString(relativePath),
+    axisNames ? JSON.stringify(axisNames) : "None"
+  );
+}
+
+/**
+ * Estimates the bytes the selected regions of variables take, and the kernel's available memory,
+ * without reading any values. Regions too large to load get strides that subsample them.
+ * @param requests The alias, file path, name and axis selection keyword arguments of each variable
+ */
+export function estimateLoadCommand(
+  requests: [string, string, string, string][]
+): string {
+  const requestList: string[] = requests.map(
+    ([alias, path, name, axisArgs]: [string, string, string, string]) =>
+      `(${pyString(alias)}, ${pyString(path)}, ${pyString(name)}, dict(${axisArgs}))`
+  );
+  return kernelCall("estimate_load", `[${requestList.join(", ")}]`);
 }
 
 export function getAxisInfoFromVariableCommand(varName: string): string {
-  return `import json\n\
-import cdms2\n\
-import vcs\n\
-${safe("outAxes")} = {}\n\
-${safe("names")} = ${varName}.getAxisIds()\n\
-for idx in ${varName}.getAxisListIndex():\n\
-	${safe("aname")} = ${safe("names")}[idx]\n\
-	${safe("axis")} = ${varName}.getAxis(idx)\n\
-	${AXIS_INFO_CODE}\
-${OUTPUT_RESULT_NAME} = json.dumps(${safe("outAxes")})\n`;
+  return kernelCall("variable_axes_info", varName);
+}
+
+/**
+ * Gets the axis info needed after a variable refresh in one request.
+ * Each file is opened at most once, and only for axes that aren't cached on disk.
+ * @param fileAxes The axes needed from each file, keyed by the file's relative path
+ * @param varNames The names of the notebook variables (with no file) that need their axis info
+ * @returns A command which outputs {files: {path: axes}, variables: {name: axes}}
+ */
+export function getRefreshAxesInfoCommand(
+  fileAxes: { [relativePath: string]: string[] },
+  varNames: string[]
+): string {
+  return kernelCall(
+    "refresh_axes_info",
+    JSON.stringify(fileAxes),
+    JSON.stringify(varNames)
+  );
+}
+
+/**
+ * Gets the info of the variables in the notebook which changed since the last refresh.
+ * If the token given isn't the kernel's latest (or the kernel restarted), every variable is sent.
+ * @param sinceToken The token of the refresh the frontend last applied, or null to get all variables
+ */
+export function refreshVariablesCommand(sinceToken: string | null): string {
+  return kernelCall("refresh_variables", pyString(sinceToken));
+}
+
+/**
+ * Gets the state shown in the sidebar after a cell runs, in one request: the graphics methods,
+ * templates, changed variables and whether a plot exists. The kernel gives each piece a version
+ * which changes when its value does, and only pieces newer than the versions given are sent.
+ * @param versions The version of each piece the frontend has, keyed by the piece's name
+ * @param sinceToken The token of the variable refresh the frontend last applied, or null
+ * @returns A command which outputs {variables: changes, [piece]: {version, value}}
+ */
+export function getSidebarSnapshotCommand(
+  versions: { [piece: string]: string },
+  sinceToken: string | null
+): string {
+  return kernelCall(
+    "sidebar_snapshot",
+    JSON.stringify(versions),
+    pyString(sinceToken)
+  );
 }
 
+/**
+ * Gets the graphics methods of each type, unless the vcs registry's hash matches the version given.
+ * @param version The version (registry hash) of the list the frontend has, or null
+ * @returns A command which outputs {version, value} or {version, unchanged: true}
+ */
+export function refreshGraphicsCommand(version: string | null): string {
+  return kernelCall("element_list", "'graphics'", pyString(version));
+}
+
+/**
+ * Gets the template names, unless the vcs registry's hash matches the version given.
+ * @param version The version (registry hash) of the list the frontend has, or null
+ * @returns A command which outputs {version, value} or {version, unchanged: true}
+ */
+export function refreshTemplatesCommand(version: string | null): string {
+  return kernelCall("element_list", "'templates'", pyString(version));
+}
 export function getSidecarDisplayCommand(
   displayMode: DISPLAY_MODE,
   sidecarReady: boolean,
@@ -273,3 +246,53 @@ except NameError:\n\
 	sidecar = Sidecar(title='${sidecarTitle}')\n\
 	canvas._display_target = sidecar\n`;
 }
+
+/**
+ * Sends the object in the output variable to the frontend over the data channel comm.
+ * Numeric lists and 1D arrays are sent as binary float64 buffers instead of JSON.
+ * If comms aren't available, the output is replaced with its JSON string instead.
+ * @param requestId The id the frontend uses to match the reply to its request
+ */
+export function sendDataCommand(requestId: string): string {
+  return `import vcdat_kernel\n\
+${OUTPUT_RESULT_NAME} = vcdat_kernel.send_data(${OUTPUT_RESULT_NAME}, '${requestId}', '${DATA_CHANNEL_TARGET}')\n`;
+}
+
+/**
+ * Adds new and modified data files in a directory tree to the catalog and drops deleted ones.
+ * @param directory The directory to index, relative to the kernel's working directory
+ */
+export function catalogDirectoryCommand(directory: string): string {
+  return `import json\n\
+import vcdat_kernel\n\
+${OUTPUT_RESULT_NAME} = json.dumps(vcdat_kernel.catalog_directory(${pyString(
+    directory
+  )}, ${JSON.stringify(EXTENSIONS)}))\n`;
+}
+
+/**
+ * Searches the catalog for variables in a directory tree by name, long name or file path.
+ * @param directory The directory that was indexed
+ * @param query The text to search for
+ */
+export function searchCatalogCommand(directory: string, query: string): string {
+  return `import json\n\
+import vcdat_kernel\n\
+${OUTPUT_RESULT_NAME} = json.dumps(vcdat_kernel.catalog_search(${pyString(
+    directory
+  )}, ${pyString(query)}))\n`;
+}
+
+/**
+ * Combines files split along time into one dataset, using cdscan to write a CDML (XML) file.
+ * The CDML maps each time range to the file holding it, so reading a time range only opens the
+ * files that overlap it. The CDML is reused until one of the files changes.
+ * @param filePaths The paths of the files to combine
+ */
+export function aggregateFilesCommand(filePaths: string[]): string {
+  return `import json\n\
+import vcdat_kernel\n\
+${OUTPUT_RESULT_NAME} = json.dumps(vcdat_kernel.aggregate_files(${JSON.stringify(
+    filePaths
+  )}))\n`;
+}
@@ -0,0 +1,216 @@
+import { PageConfig } from "@jupyterlab/coreutils";
+import { ISignal, Signal } from "@lumino/signaling";
+import { boundMethod } from "autobind-decorator";
+import { METRICS_MAX_SAMPLES } from "./constants";
+
+export interface IRequestTag {
+  command: string; // the kind of request, like "plot" or "file-scan"
+  detail?: string; // what the request was about, like the path of the file scanned
+}
+
+export interface IRequestSample extends IRequestTag {
+  time: string; // when the request was made, as an ISO timestamp
+  queueMs: number; // how long the request waited behind other kernel requests
+  totalMs: number; // how long the caller waited for the result, including the queue
+  requestBytes: number; // the size of the code sent
+  responseBytes: number; // the size of the result as JSON, null if not measured
+  ok: boolean; // false if the request failed
+}
+
+export interface ICommandSummary {
+  command: string;
+  count: number;
+  errors: number;
+  p50: number; // median total time in ms
+  p95: number;
+  max: number;
+  requestBytes: number; // mean request size
+  responseBytes: number; // mean size of the responses measured, or null
+}
+
+/**
+ * Records how long each kernel request and injected cell takes, and the size of what was
+ * sent and received, tagged with the kind of command. Only the last METRICS_MAX_SAMPLES
+ * requests are kept. Measuring the size of a result means serializing it again, so results
+ * are only measured while measureSizes is set, when the metrics are being looked at.
+ */
+export default class RequestMetrics {
+  /**
+   * Gets the metrics recorded by this JupyterLab page.
+   */
+  public static getMetrics(): RequestMetrics {
+    if (!RequestMetrics.metrics) {
+      RequestMetrics.metrics = new RequestMetrics();
+    }
+    return RequestMetrics.metrics;
+  }
+
+  private static metrics: RequestMetrics = null;
+
+  private _samples: IRequestSample[];
+  private _changed: Signal<this, void>;
+  private _measureSizes: boolean;
+
+  constructor() {
+    this._samples = Array<IRequestSample>();
+    this._changed = new Signal<this, void>(this);
+    this._measureSizes = false;
+  }
+
+  get samples(): IRequestSample[] {
+    return this._samples;
+  }
+
+  get changed(): ISignal<this, void> {
+    return this._changed;
+  }
+
+  get measureSizes(): boolean {
+    return this._measureSizes;
+  }
+
+  set measureSizes(measure: boolean) {
+    this._measureSizes = measure;
+  }
+
+  /**
+   * Times a request and records it with its tag.
+   * @param tag The kind of request, requests without a tag are recorded as "other"
+   * @param code The code that is sent to the kernel
+   * @param send Sends the request, calling started once the request leaves the queue
+   * @returns Promise<T> - The result of the request
+   */
+  @boundMethod
+  public async measure<T>(
+    tag: IRequestTag,
+    code: string,
+    send: (started: () => void) => Promise<T>
+  ): Promise<T> {
+    const time: string = new Date().toISOString();
+    const start: number = performance.now();
+    let sent: number = null;
+    let result: T;
+    let ok = true;
+    try {
+      result = await send(() => {
+        sent = performance.now();
+      });
+      return result;
+    } catch (error) {
+      ok = false;
+      throw error;
+    } finally {
+      const end: number = performance.now();
+      this.record({
+        command: tag ? tag.command : "other",
+        detail: tag ? tag.detail : undefined,
+        ok,
+        // Requests replaced by a newer one were never sent, they only waited
+        queueMs: (sent === null ? end : sent) - start,
+        requestBytes: RequestMetrics.sizeOf(code),
+        responseBytes: !ok
+          ? 0
+          : this._measureSizes
+          ? RequestMetrics.sizeOf(result)
+          : null,
+        time,
+        totalMs: end - start,
+      });
+    }
+  }
+
+  @boundMethod
+  public record(sample: IRequestSample): void {
+    this._samples.push(sample);
+    if (this._samples.length > METRICS_MAX_SAMPLES) {
+      this._samples.splice(0, this._samples.length - METRICS_MAX_SAMPLES);
+    }
+    this._changed.emit();
+  }
+
+  /**
+   * Summarizes the recorded requests of each command, slowest median first.
+   */
+  @boundMethod
+  public summarize(): ICommandSummary[] {
+    const groups: { [command: string]: IRequestSample[] } = {};
+    this._samples.forEach((sample: IRequestSample) => {
+      if (!groups[sample.command]) {
+        groups[sample.command] = Array<IRequestSample>();
+      }
+      groups[sample.command].push(sample);
+    });
+
+    return Object.keys(groups)
+      .map((command: string) => {
+        const samples: IRequestSample[] = groups[command];
+        const times: number[] = samples
+          .map((sample: IRequestSample) => sample.totalMs)
+          .sort((a: number, b: number) => a - b);
+        const mean = (values: number[]): number =>
+          values.reduce((sum: number, value: number) => sum + value, 0) /
+          values.length;
+        const responseSizes: number[] = samples
+          .map((sample: IRequestSample) => sample.responseBytes)
+          .filter((size: number) => size !== null);
+        return {
+          command,
+          count: samples.length,
+          errors: samples.filter((sample: IRequestSample) => !sample.ok)
+            .length,
+          max: times[times.length - 1],
+          p50: RequestMetrics.percentile(times, 50),
+          p95: RequestMetrics.percentile(times, 95),
+          requestBytes: mean(
+            samples.map((sample: IRequestSample) => sample.requestBytes)
+          ),
+          responseBytes: responseSizes.length > 0 ? mean(responseSizes) : null,
+        };
+      })
+      .sort((a: ICommandSummary, b: ICommandSummary) => b.p50 - a.p50);
+  }
+
+  /**
+   * Gets the summary and every recorded request as JSON, to analyse elsewhere.
+   */
+  @boundMethod
+  public exportJSON(): string {
+    return JSON.stringify(
+      {
+        exported: new Date().toISOString(),
+        samples: this._samples,
+        summary: this.summarize(),
+        user: PageConfig.getOption("hubUser"),
+        userAgent: navigator.userAgent,
+      },
+      null,
+      2
+    );
+  }
+
+  @boundMethod
+  public clear(): void {
+    this._samples = Array<IRequestSample>();
+    this._changed.emit();
+  }
+
+  // The nearest rank percentile of sorted values
+  private static percentile(sorted: number[], percent: number): number {
+    const rank: number = Math.ceil((percent / 100) * sorted.length);
+    return sorted[Math.max(rank - 1, 0)];
+  }
+
+  // The size in bytes of a value sent to or received from the kernel
+  private static sizeOf(value: any): number {
+    if (value === undefined || value === null) {
+      return 0;
+    }
+    try {
+      const text: string =
+        typeof value === "string" ? value : JSON.stringify(value);
+      return new TextEncoder().encode(text).length;
+    } catch (error) {
+      return 0;
+    }
+  }
+}
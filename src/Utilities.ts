@@ -1,10 +1,29 @@
 import { MainMenu } from "@jupyterlab/mainmenu";
-import { KernelMessage } from "@jupyterlab/services";
+import { Kernel, KernelMessage, Session } from "@jupyterlab/services";
 import { NotebookPanel } from "@jupyterlab/notebook";
 import { JupyterFrontEnd } from "@jupyterlab/application";
-import { OUTPUT_RESULT_NAME } from "./constants";
-import { checkCDMS2FileOpens } from "./PythonCommands";
-import { ISessionOptions } from "@jupyterlab/services/lib/session/session";
+import {
+  DATA_REPLY_TIMEOUT,
+  OUTPUT_RESULT_NAME,
+  REQUEST_PRIORITY,
+} from "./constants";
+import {
+  checkCDMS2FileOpens,
+  exportInfoCommand,
+  sendDataCommand,
+} from "./PythonCommands";
+import DataChannel from "./DataChannel";
+import KernelPool from "./KernelPool";
+import KernelScheduler from "./KernelScheduler";
+import RequestMetrics, { IRequestTag } from "./RequestMetrics";
+
+// The info the kernel reports for an exported file
+export interface IExportInfo {
+  path: string;
+  size?: number;
+  elapsedMs?: number;
+  error?: string;
+}
 
 export default class Utilities {
   /**
@@ -62,6 +81,40 @@ export default class Utilities {
     return path.replace(regEx, "");
   }
 
+  /**
+   * Formats a number of bytes with the largest unit that keeps it at least 1.
+   * Example: 512 => 512 B, 2048 => 2.0 KB, 3221225472 => 3.0 GB
+   * @param bytes The number of bytes
+   */
+  public static formatBytes(bytes: number): string {
+    const units: string[] = ["KB", "MB", "GB", "TB"];
+    if (bytes < 1024) {
+      return `${Math.round(bytes)} B`;
+    }
+    let value: number = bytes / 1024;
+    let unit = 0;
+    while (value >= 1024 && unit < units.length - 1) {
+      value /= 1024;
+      unit += 1;
+    }
+    return `${value.toFixed(1)} ${units[unit]}`;
+  }
+
+  /**
+   * Parses the repr'd JSON string returned by sendSimpleKernelRequest.
+   * json.dumps only outputs ASCII, so repr only adds quotes and escapes backslashes and quotes.
+   * @param result The result text, for example: '{"name": "Earth\\'s radius"}'
+   * @returns any - The parsed object, or null if the result is empty
+   */
+  public static parseJSONResult(result: string): any {
+    if (!result) {
+      return null;
+    }
+    return JSON.parse(
+      result.slice(1, result.length - 1).replace(/\\(['\\])/g, "$1")
+    );
+  }
+
   /**
    * Return the relative file path from source to target (if needed). If an absolute path
    * starting with '/' is passed, then it will be returned directly.
@@ -206,7 +259,10 @@ export default class Utilities {
           (await Utilities.sendSimpleKernelRequest(
             sessionSource,
             checkCDMS2FileOpens(filePath),
-            false
+            false,
+            REQUEST_PRIORITY.Normal,
+            undefined,
+            { command: "file-check", detail: filePath }
           )) === "True"
         );
       }
@@ -214,7 +270,10 @@ export default class Utilities {
         (await Utilities.sendSimpleKernelRequest(
           sessionSource,
           checkCDMS2FileOpens(filePath),
-          false
+          false,
+          REQUEST_PRIORITY.Normal,
+          undefined,
+          { command: "file-check", detail: filePath }
         )) === "True"
       );
     } catch (error) {
@@ -224,6 +283,47 @@ export default class Utilities {
     return false;
   }
 
+  /**
+   * @description Runs an export and gets the info of the exported file. The export's code reports the
+   * file over the data channel as soon as it has run, so there's no need to poll for the file.
+   * @param notebookPanel The notebook whose kernel runs the export.
+   * @param filename The name of the exported file, in the notebook's directory.
+   * @param runExport Injects and runs the cell that writes the file, given the id to report it with.
+   * @returns Promise<IExportInfo> - The path, byte size and duration of the export. Or an error if
+   * the file wasn't written.
+   */
+  public static async watchExport(
+    notebookPanel: NotebookPanel,
+    filename: string,
+    runExport: (requestId: string) => Promise<void>
+  ): Promise<IExportInfo> {
+    await notebookPanel.sessionContext.ready;
+    const kernel: Kernel.IKernelConnection =
+      notebookPanel.sessionContext.session.kernel;
+    const channel: DataChannel = DataChannel.getChannel(kernel);
+    const [requestId, reply] = channel.expectReply();
+
+    try {
+      await runExport(requestId);
+    } catch (error) {
+      channel.cancel(requestId);
+      throw error;
+    }
+
+    try {
+      return await Utilities.awaitDataReply(kernel, channel, requestId, reply);
+    } catch (error) {
+      // Without comm support in the kernel, check the file once the export has finished
+      return Utilities.sendDataRequest(
+        notebookPanel,
+        exportInfoCommand(filename),
+        REQUEST_PRIORITY.Interactive,
+        undefined,
+        { command: "export-check", detail: filename }
+      );
+    }
+  }
+
   /**
    * @description This function runs code directly in the notebook's kernel and then evaluates the
    * result and returns it as a promise.
@@ -234,13 +334,19 @@ export default class Utilities {
    *  Multilines: "a = [1,2,3]\nb = [4,5,6]\nfor idx, val in enumerate(a):\n\tb[idx]+=val\noutput = b"
    * @param storeHistory Default is false. If true, the code executed will be stored in the kernel's history
    * and the counter which is shown in the cells will be incremented to reflect code was run.
+   * @param priority The priority of the request in the notebook kernel's queue, see sendKernelRequest.
+   * @param key If given, a queued notebook request with the same key is replaced by this one.
+   * @param tag The kind of request, used to group its timing in the request metrics.
    * @returns Promise<string> - A promise containing the execution results of the code as a string.
    * Or an empty string if there were no results.
    */
   public static async sendSimpleKernelRequest(
     sessionSource: NotebookPanel | JupyterFrontEnd,
     code: string,
-    storeHistory = false
+    storeHistory = false,
+    priority: REQUEST_PRIORITY = REQUEST_PRIORITY.Normal,
+    key?: string,
+    tag?: IRequestTag
   ): Promise<string> {
     let result: any;
     if (sessionSource instanceof NotebookPanel) {
@@ -252,7 +358,10 @@ export default class Utilities {
         false,
         storeHistory,
         false,
-        false
+        false,
+        priority,
+        key,
+        tag
       );
     } else {
       // Send request to kernel with pre-filled parameters
@@ -263,21 +372,76 @@ export default class Utilities {
         false,
         storeHistory,
         false,
-        false
+        false,
+        tag
       );
     }
 
-    // Get results from the request for validation
-    const output: any = result.result;
-
-    if (!output || output.data === undefined) {
-      // Output was empty
-      return "";
-    }
+    return Utilities.readTextResult(result);
+  }
 
-    // Output has data, return it
-    const execResult: string = output.data["text/plain"];
-    return execResult;
+  /**
+   * @description Runs code in the notebook's kernel and returns the object it stores in the output
+   * variable. The object is sent back over the data channel comm, with numeric lists as binary buffers,
+   * so it doesn't need to be converted to a JSON string and repr'd.
+   * @param notebookPanel The notebook to run the code in.
+   * @param code The code to run in the kernel, it needs to store a JSON serializable object in the output variable.
+   * @param priority The priority of the request in the kernel's queue, see sendKernelRequest.
+   * @param key If given, a queued request with the same key is replaced by this one.
+   * @param tag The kind of request, used to group its timing in the request metrics.
+   * @returns Promise<any> - A promise containing the object that the code stored in the output variable.
+   */
+  public static async sendDataRequest(
+    notebookPanel: NotebookPanel,
+    code: string,
+    priority: REQUEST_PRIORITY = REQUEST_PRIORITY.Normal,
+    key?: string,
+    tag?: IRequestTag
+  ): Promise<any> {
+    // Wait for kernel to be ready before registering the channel
+    await notebookPanel.sessionContext.ready;
+    const kernel: Kernel.IKernelConnection =
+      notebookPanel.sessionContext.session.kernel;
+
+    // The reply id is only created once the request is sent, so a replaced request has none
+    return RequestMetrics.getMetrics().measure(tag, code, (started) =>
+      KernelScheduler.getScheduler(kernel).schedule(
+        async () => {
+          started();
+          const channel: DataChannel = DataChannel.getChannel(kernel);
+          const [requestId, reply] = channel.expectReply();
+
+          let result: string;
+          try {
+            result = Utilities.readTextResult(
+              await Utilities.runKernelRequest(kernel, {
+                /* eslint-disable  @typescript-eslint/camelcase */
+                allow_stdin: false,
+                code: `${code}\n${sendDataCommand(requestId)}`,
+                silent: false,
+                stop_on_error: false,
+                store_history: false,
+                user_expressions: { result: OUTPUT_RESULT_NAME },
+                /* eslint-enable  @typescript-eslint/camelcase */
+              })
+            );
+          } catch (error) {
+            channel.cancel(requestId);
+            throw error;
+          }
+
+          // Without comm support in the kernel, the output came back as a JSON string
+          if (result !== "None") {
+            channel.cancel(requestId);
+            return Utilities.parseJSONResult(result);
+          }
+
+          return Utilities.awaitDataReply(kernel, channel, requestId, reply);
+        },
+        priority,
+        key
+      )
+    );
   }
 
   /**
@@ -294,6 +458,11 @@ export default class Utilities {
    * an input_request message.
    * @param stopOnError Default is false. If True, does not abort the execution queue, if an exception is encountered.
    * This allows the queued execution of multiple execute_requests, even if they generate exceptions.
+   * @param priority Default is Normal. The notebook's requests are sent to the kernel one at a time,
+   * and queued requests with a lower priority are sent first.
+   * @param key If given, a queued request with the same key is dropped and its caller gets the result
+   * of this request instead. Queued requests with a key can also be cancelled by the KernelScheduler.
+   * @param tag The kind of request, used to group its timing in the request metrics.
    * @returns Promise<any> - A promise containing the execution results of the code as an object with
    * keys based on the user_expressions.
    * @example
@@ -319,7 +488,10 @@ export default class Utilities {
     runSilent = false,
     storeHistory = false,
     allowStdIn = false,
-    stopOnError = false
+    stopOnError = false,
+    priority: REQUEST_PRIORITY = REQUEST_PRIORITY.Normal,
+    key?: string,
+    tag?: IRequestTag
   ): Promise<any> {
     // Check notebook panel is ready
     if (notebookPanel === null) {
@@ -330,41 +502,31 @@ export default class Utilities {
     await notebookPanel.context.ready;
     await notebookPanel.sessionContext.ready;
 
-    const message: KernelMessage.IShellMessage = await notebookPanel.sessionContext.session.kernel.requestExecute(
-      {
-        /* eslint-disable  @typescript-eslint/camelcase */
-        allow_stdin: allowStdIn,
-        code: runCode,
-        silent: runSilent,
-        stop_on_error: stopOnError,
-        store_history: storeHistory,
-        user_expressions: userExpressions,
-        /* eslint-enable  @typescript-eslint/camelcase */
-      }
-    ).done;
-
-    const content: any = message.content;
-
-    if (content.status !== "ok") {
-      // If cdat is requesting user input, return nothing
-      if (
-        content.status === "error" &&
-        content.ename === "StdinNotImplementedError"
-      ) {
-        return "";
-      }
-
-      // If response is not 'ok', throw contents as error, log code
-      const msg = `Code caused an error:\n${runCode}`;
-      console.error(msg);
-      throw content;
-    }
-    // Return user_expressions of the content
-    return content.user_expressions;
+    const kernel: Kernel.IKernelConnection =
+      notebookPanel.sessionContext.session.kernel;
+    return RequestMetrics.getMetrics().measure(tag, runCode, (started) =>
+      KernelScheduler.getScheduler(kernel).schedule(
+        () => {
+          started();
+          return Utilities.runKernelRequest(kernel, {
+            /* eslint-disable  @typescript-eslint/camelcase */
+            allow_stdin: allowStdIn,
+            code: runCode,
+            silent: runSilent,
+            stop_on_error: stopOnError,
+            store_history: storeHistory,
+            user_expressions: userExpressions,
+            /* eslint-enable  @typescript-eslint/camelcase */
+          });
+        },
+        priority,
+        key
+      )
+    );
   }
 
   /**
-   * @description This function starts a kernel in Jupyter lab and then evaluates the
+   * @description This function runs code in a helper kernel from the kernel pool and then evaluates the
    * result and returns it as a promise.
    * @param app The jupyter lab frontend object
    * @param runCode The code to run in the kernel.
@@ -377,6 +539,7 @@ export default class Utilities {
    * an input_request message.
    * @param stopOnError Default is false. If True, does not abort the execution queue, if an exception is encountered.
    * This allows the queued execution of multiple execute_requests, even if they generate exceptions.
+   * @param tag The kind of request, used to group its timing in the request metrics.
    * @returns Promise<any> - A promise containing the execution results of the code as an object with
    * keys based on the user_expressions.
    * @example
@@ -402,53 +565,108 @@ export default class Utilities {
     runSilent = false,
     storeHistory = false,
     allowStdIn = false,
-    stopOnError = false
+    stopOnError = false,
+    tag?: IRequestTag
   ): Promise<any> {
-    // Use service manager, wait for it to be ready
-    await app.serviceManager.sessions.ready;
-
-    // Start session and wait for it to be ready
-    const options: ISessionOptions = {
-      path: "",
-      type: "",
-      name: "TempSession",
-    };
+    // Use a warm helper kernel from the pool
+    return RequestMetrics.getMetrics().measure(tag, runCode, (started) =>
+      KernelPool.getPool(app).run((session: Session.ISessionConnection) => {
+        started();
+        return Utilities.runKernelRequest(session.kernel, {
+          /* eslint-disable  @typescript-eslint/camelcase */
+          allow_stdin: allowStdIn,
+          code: runCode,
+          silent: runSilent,
+          stop_on_error: stopOnError,
+          store_history: storeHistory,
+          user_expressions: userExpressions,
+          /* eslint-enable  @typescript-eslint/camelcase */
+        });
+      })
+    );
+  }
 
-    const session = await app.serviceManager.sessions.startNew(options);
+  // Waits for data the kernel sent over the channel before its execute reply. Stops waiting if
+  // the data hasn't come within DATA_REPLY_TIMEOUT or the kernel restarts, so a lost comm
+  // message can't hold up the kernel's request queue forever.
+  private static async awaitDataReply(
+    kernel: Kernel.IKernelConnection,
+    channel: DataChannel,
+    requestId: string,
+    reply: Promise<any>
+  ): Promise<any> {
+    const timer: number = window.setTimeout(() => {
+      channel.cancel(
+        requestId,
+        new Error("The kernel did not send the data of the request.")
+      );
+    }, DATA_REPLY_TIMEOUT);
+    const handleStatus = (
+      sender: Kernel.IKernelConnection,
+      status: Kernel.Status
+    ): void => {
+      if (
+        status === "restarting" ||
+        status === "autorestarting" ||
+        status === "dead"
+      ) {
+        channel.cancel(
+          requestId,
+          new Error("The kernel stopped before sending the data of the request.")
+        );
+      }
+    };
+    kernel.statusChanged.connect(handleStatus);
+    try {
+      return await reply;
+    } finally {
+      window.clearTimeout(timer);
+      kernel.statusChanged.disconnect(handleStatus);
+    }
+  }
 
-    // Send message to kernel
-    const message = await session.kernel.requestExecute({
-      /* eslint-disable  @typescript-eslint/camelcase */
-      allow_stdin: allowStdIn,
-      code: runCode,
-      silent: runSilent,
-      stop_on_error: stopOnError,
-      store_history: storeHistory,
-      user_expressions: userExpressions,
-      /* eslint-enable  @typescript-eslint/camelcase */
-    }).done;
+  // Runs an execute request and returns its user expressions, throwing the reply if it failed
+  private static async runKernelRequest(
+    kernel: Kernel.IKernelConnection,
+    content: KernelMessage.IExecuteRequestMsg["content"]
+  ): Promise<any> {
+    const message: KernelMessage.IExecuteReplyMsg = await kernel.requestExecute(
+      content
+    ).done;
 
-    const content: any = message.content;
+    const reply: any = message.content;
 
-    if (content.status !== "ok") {
+    if (reply.status !== "ok") {
       // If cdat is requesting user input, return nothing
       if (
-        content.status === "error" &&
-        content.ename === "StdinNotImplementedError"
+        reply.status === "error" &&
+        reply.ename === "StdinNotImplementedError"
       ) {
         return "";
       }
 
       // If response is not 'ok', throw contents as error, log code
-      const msg = `Code caused an error:\n${runCode}`;
+      const msg = `Code caused an error:\n${content.code}`;
       console.error(msg);
-      throw content;
+      throw reply;
     }
 
-    // Close the session once it's done
-    session.shutdown();
-
     // Return user_expressions of the content
-    return content.user_expressions;
+    return reply.user_expressions;
+  }
+
+  // Gets the text of the output variable from the user expressions of a request
+  private static readTextResult(userExpressions: any): string {
+    // Get results from the request for validation
+    const output: any = userExpressions.result;
+
+    if (!output || output.data === undefined) {
+      // Output was empty
+      return "";
+    }
+
+    // Output has data, return it
+    const execResult: string = output.data["text/plain"];
+    return execResult;
   }
 }
@@ -9,6 +9,7 @@ export default class Variable {
   public units: string; // the units this data is measured in
   public pythonID: number; // the id of the variable from the file
   public sourceName: string; // the name of the file that holds this variables' data
+  public preview: number[]; // the stride of each axis if this is a reduced resolution preview, otherwise null
   get varID(): string {
     return `${this.name}${this.alias}`;
   }
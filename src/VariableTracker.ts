@@ -5,15 +5,16 @@ import { ISignal, Signal } from "@lumino/signaling";
 // Project Components
 import {
   FILE_PATH_KEY,
+  REQUEST_PRIORITY,
   SELECTED_VARIABLES_KEY,
   VARIABLE_INFO_KEY,
   VARIABLES_LOADED_KEY,
 } from "./constants";
 import {
   getAxisInfoFromFileCommand,
-  getAxisInfoFromVariableCommand,
   getFileVarsCommand,
-  REFRESH_VAR_CMD,
+  getRefreshAxesInfoCommand,
+  refreshVariablesCommand,
 } from "./PythonCommands";
 import Utilities from "./Utilities";
 import NotebookUtilities from "./NotebookUtilities";
@@ -37,6 +38,11 @@ export default class VariableTracker {
   private _variablesChanged: Signal<this, Variable[]>;
   private _selectedVariables: string[];
   private _selectedVariablesChanged: Signal<this, string[]>;
+  // Full axis info already fetched for the variable loader, keyed by file path and axis name
+  private _axisDetails: { [pathAndAxis: string]: AxisInfo };
+  // The variables in the kernel as of the last refresh, and the kernel's token for that refresh
+  private _notebookVariables: Variable[];
+  private _refreshToken: string;
 
   constructor() {
     this._notebookPanel = null;
@@ -53,6 +59,9 @@ export default class VariableTracker {
     this._selectedVariablesChanged = new Signal<this, string[]>(this);
     this._variables = Array<Variable>();
     this._variablesChanged = new Signal<this, Variable[]>(this);
+    this._axisDetails = {};
+    this._notebookVariables = Array<Variable>();
+    this._refreshToken = null;
   }
 
   get isBusy(): boolean {
@@ -85,6 +94,11 @@ export default class VariableTracker {
     return this._variablesChanged;
   }
 
+  // The kernel's token for the last variable refresh that was applied
+  get refreshToken(): string {
+    return this._refreshToken;
+  }
+
   get currentFile(): string {
     return this._currentFile;
   }
@@ -136,6 +150,8 @@ export default class VariableTracker {
     this.variables = Array<Variable>();
     this._variableInfo = {};
     this._notebookPanel = null;
+    this._notebookVariables = Array<Variable>();
+    this._refreshToken = null;
   }
 
   @boundMethod
@@ -145,14 +161,17 @@ export default class VariableTracker {
       await this.saveMetaData();
     }
 
+    // File paths are relative to the notebook, so cached axis info no longer applies
+    this._axisDetails = {};
+
     // Update to new notebook
     if (notebookPanel) {
       this._notebookPanel = notebookPanel;
       // Load any relevant meta data from new notebook
       await this.loadMetaData();
 
-      // Refresh the notebook
-      await this.refreshVariables();
+      // Refresh the notebook, its kernel may hold a different set of variables
+      await this.refreshVariables(true);
     } else {
       this.resetVarTracker();
     }
@@ -259,6 +278,7 @@ export default class VariableTracker {
     newCopy.longName = variable.longName;
     newCopy.name = variable.name;
     newCopy.pythonID = variable.pythonID;
+    newCopy.preview = variable.preview;
     newCopy.sourceName = variable.sourceName;
     newCopy.units = variable.units;
 
@@ -411,6 +431,19 @@ export default class VariableTracker {
     this.selectedVariables = selection ? selection : Array<Variable>();
   }
 
+  /**
+   * Drops the cached axis info of a file, so its axes are read again after it changes.
+   * @param path The file's path, relative to the notebook
+   */
+  @boundMethod
+  public forgetFileAxes(path: string): void {
+    Object.keys(this._axisDetails).forEach((pathAndAxis: string) => {
+      if (pathAndAxis.startsWith(`${path}:`)) {
+        delete this._axisDetails[pathAndAxis];
+      }
+    });
+  }
+
   /**
    * Opens a '.nc' file to read in it's variables via a kernel request.
    * @param filePath The file to open for variable reading
@@ -428,30 +461,33 @@ export default class VariableTracker {
       const nbPath = `${this.notebookPanel.sessionContext.path}`;
       const path: string = Utilities.getUpdatedPath(nbPath, filePath);
 
-      this._isBusy = true;
+      // The file may have been rewritten since its axes were last read
+      this.forgetFileAxes(path);
 
-      // Try to open file in cdms, exit early if fails
-      if (!(await Utilities.tryFilePath(this.notebookPanel, path))) {
-        this._isBusy = false;
-        console.error(`Opening file failed. Path: ${path}`);
-        return Array<Variable>();
-      }
+      this._isBusy = true;
 
-      // File loaded successfully, pull variables from file
-      const result: string = await Utilities.sendSimpleKernelRequest(
+      // Open the file and pull its variables in a single request
+      const fileVariables: any = await Utilities.sendDataRequest(
         this.notebookPanel,
-        getFileVarsCommand(path)
+        getFileVarsCommand(path),
+        REQUEST_PRIORITY.Normal,
+        undefined,
+        { command: "file-scan", detail: path }
       );
       this._isBusy = false;
 
       // Exit if result is blank
-      if (!result) {
+      if (!fileVariables) {
         console.error(`File had no variables. Path: ${path}`);
         return Array<Variable>();
       }
 
-      // Parse the resulting output into an object
-      const fileVariables: any = JSON.parse(result.slice(1, result.length - 1));
+      // The file could not be opened, pass the error on to the caller
+      if (fileVariables.error) {
+        console.error(`Opening file failed. Path: ${path}`);
+        throw fileVariables.error;
+      }
+
       const newVars = Array<Variable>();
       Object.keys(fileVariables.vars).map((varName: string) => {
         const v = new Variable();
@@ -472,59 +508,72 @@ export default class VariableTracker {
       });
       return newVars;
     } catch (error) {
+      this._isBusy = false;
+      if (error.ename) {
+        throw error;
+      }
       return Array<Variable>();
     }
   }
 
   /**
    * This updates the current variable list by sending a command to the kernel directly.
+   * Only variables added, removed or reassigned since the last refresh are sent, and the
+   * list is patched with them.
+   * @param full Whether to get every variable, for example after switching notebooks
    */
   @boundMethod
-  public async refreshVariables(): Promise<void> {
+  public async refreshVariables(full = false): Promise<void> {
     if (!this.notebookPanel) {
       return;
     }
     this._isBusy = true;
-    // Get the variables info
-    const result: string = await Utilities.sendSimpleKernelRequest(
+    // Get the info of the variables that changed
+    const delta: any = await Utilities.sendDataRequest(
       this.notebookPanel,
-      REFRESH_VAR_CMD
+      refreshVariablesCommand(full ? null : this._refreshToken),
+      REQUEST_PRIORITY.Background,
+      // A full refresh can't be answered by an incremental one
+      full ? "refresh-variables-full" : "refresh-variables",
+      { command: "refresh-variables" }
     );
     this._isBusy = false;
 
+    await this.applyVariableChanges(delta);
+  }
+
+  /**
+   * Patches the variable list with the changes from a variable refresh in the kernel.
+   * @param delta The variables that were added or reassigned and the names of those removed
+   */
+  @boundMethod
+  public async applyVariableChanges(delta: any): Promise<void> {
     // Exit if result is blank
-    if (!result) {
+    if (!delta || !delta.changed) {
       return;
     }
+    this._refreshToken = delta.token;
 
     // A grouping object so that variables from each data source are updated together
     const varGroups: { [sourceName: string]: Variable[] } = {};
     // A grouping object for variables that are derived/have no source listed
     const derivedVars = Array<Variable>();
-    // Parse the resulting output into a list of variables with basic data
-    const notebookVariables: any = JSON.parse(
-      result.slice(1, result.length - 1)
-    );
-
-    // Exit early if no variables exist
-    if (Object.keys(notebookVariables).length < 1) {
-      this.variables = Array<Variable>();
-      return;
-    }
 
-    const newVars = Array<Variable>();
-    Object.keys(notebookVariables).map(async (varAlias: string) => {
+    // Create variables for those that were added or reassigned
+    const changedVars: { [alias: string]: Variable } = {};
+    Object.keys(delta.changed).forEach((varAlias: string) => {
       const v: Variable = new Variable();
       const existingInfo: { name: string; source: string } = this.variableInfo[
         varAlias
       ];
       v.name = existingInfo ? existingInfo.name : varAlias;
       v.alias = varAlias;
-      v.pythonID = notebookVariables[varAlias].pythonID;
-      v.longName = notebookVariables[varAlias].name;
-      v.axisList = notebookVariables[varAlias].axisList;
+      v.pythonID = delta.changed[varAlias].pythonID;
+      v.longName = delta.changed[varAlias].name;
+      v.axisList = delta.changed[varAlias].axisList;
       v.axisInfo = Array<AxisInfo>();
-      v.units = notebookVariables[varAlias].units;
+      v.units = delta.changed[varAlias].units;
+      v.preview = delta.changed[varAlias].preview || null;
 
       // Update the data source
       v.sourceName = existingInfo ? existingInfo.source : "";
@@ -540,110 +589,209 @@ export default class VariableTracker {
         derivedVars.push(v);
       }
 
-      newVars.push(v);
+      changedVars[varAlias] = v;
     });
 
-    // Update axis info for each group of file variables
-    if (varGroups) {
-      Object.keys(varGroups).forEach(async (sourceName: string) => {
-        await this.updateAxesInfoGroup(varGroups[sourceName]);
+    // Patch the list, keeping the order of the variables that were already there
+    const newVars = Array<Variable>();
+    if (!delta.full) {
+      this._notebookVariables.forEach((variable: Variable) => {
+        if (delta.removed.indexOf(variable.alias) >= 0) {
+          return;
+        }
+        if (changedVars[variable.alias]) {
+          newVars.push(changedVars[variable.alias]);
+          delete changedVars[variable.alias];
+        } else {
+          newVars.push(variable);
+        }
       });
     }
-    // Update axis info for each derived variable
-    derivedVars.forEach(async (variable: Variable) => {
-      await this.updateAxesInfoVariable(variable);
+    Object.keys(changedVars).forEach((varAlias: string) => {
+      newVars.push(changedVars[varAlias]);
     });
 
-    this.variables = newVars;
+    // Commit the list and token before any await, so changes applied meanwhile patch this list
+    this._notebookVariables = newVars;
+
+    // Get the axis info of the new variables before they are listed
+    await this.updateAxesInfo(varGroups, derivedVars);
+
+    this.variables = this._notebookVariables.slice();
   }
 
-  // Updates the axes information for each variable based on what source it came from
+  /**
+   * Fills in the full axis info (values, first/last, modulo) for a variable from the
+   * variable loader. The file scan only returns axis names, shapes and units, so this
+   * is called when the axes are first shown. Axes already fetched are reused.
+   * @param variable The file variable which needs its axis info
+   */
   @boundMethod
-  public async updateAxesInfoGroup(varGroup: Variable[]): Promise<void> {
-    // Get the filepath from the data readerlist
-    const sourceFile: string = varGroup[0].sourceName;
-
-    // Exit early if no source filepath exists
-    if (!sourceFile) {
+  public async loadAxisDetails(variable: Variable): Promise<void> {
+    if (!variable.sourceName || !variable.axisInfo) {
       return;
     }
 
     // Get relative path for the file
     const nbPath = `${this.notebookPanel.sessionContext.path}`;
-    const path: string = Utilities.getUpdatedPath(nbPath, sourceFile);
+    const path: string = Utilities.getUpdatedPath(nbPath, variable.sourceName);
 
-    this._isBusy = true;
+    // Find the axes which haven't been fetched yet
+    const missing = Array<string>();
+    variable.axisInfo.forEach((axis: AxisInfo) => {
+      if (!axis.data && !this._axisDetails[`${path}:${axis.name}`]) {
+        missing.push(axis.name);
+      }
+    });
 
-    // Try to open file in cdms, exit early if fails
-    if (!(await Utilities.tryFilePath(this.notebookPanel, path))) {
+    if (missing.length > 0) {
+      this._isBusy = true;
+      const axesInfo: any = await Utilities.sendDataRequest(
+        this.notebookPanel,
+        getAxisInfoFromFileCommand(path, missing),
+        REQUEST_PRIORITY.Normal,
+        undefined,
+        { command: "axis-info", detail: path }
+      );
       this._isBusy = false;
-      console.error(`File had no variables: ${path}`);
-      return;
-    }
 
-    // Get the variables info
-    const result: string = await Utilities.sendSimpleKernelRequest(
-      this.notebookPanel,
-      getAxisInfoFromFileCommand(path)
-    );
-    this._isBusy = false;
+      // Exit if result is blank
+      if (!axesInfo) {
+        return;
+      }
 
-    // Exit if result is blank
-    if (!result) {
-      return;
+      if (axesInfo.error) {
+        console.error(`Axis info could not be read. Path: ${path}`);
+        return;
+      }
+      Object.keys(axesInfo).forEach((axisName: string) => {
+        this._axisDetails[`${path}:${axisName}`] = axesInfo[axisName];
+      });
     }
 
-    // Parse the resulting output as file specific axes
-    const axesInfo: any = JSON.parse(result.slice(1, result.length - 1));
-
-    // Update axes info for each variable in the group
-    varGroup.forEach((variable: Variable) => {
-      if (variable.axisList) {
-        variable.axisList.map((item: any) => {
-          if (axesInfo[item] && axesInfo[item].data) {
-            axesInfo[item].first = axesInfo[item].data[0];
-            axesInfo[item].last =
-              axesInfo[item].data[axesInfo[item].data.length - 1];
-            variable.axisInfo.push(axesInfo[item]);
-          }
-        });
+    // Each variable gets its own copy, since first and last are set per variable
+    variable.axisInfo.forEach((axis: AxisInfo, axisIndex: number) => {
+      const details: AxisInfo = this._axisDetails[`${path}:${axis.name}`];
+      if (axis.data || !details || !details.data) {
+        return;
       }
+      variable.axisInfo[axisIndex] = {
+        ...details,
+        first: details.data[0],
+        last: details.data[details.data.length - 1],
+      };
     });
   }
 
-  // Add the axes information for each variable if it has no info
+  /**
+   * Adds the axes information to new variables with a single kernel request.
+   * Each source file is opened at most once, and axes already fetched are reused.
+   * @param varGroups The variables from files, grouped by their source file
+   * @param derivedVars The variables with no source file, read from the notebook
+   */
   @boundMethod
-  public async updateAxesInfoVariable(variable: Variable): Promise<void> {
-    // Exit early if axis info is present already
-    if (variable.axisInfo.length > 0) {
-      return;
-    }
-    this._isBusy = true;
-    // Get the variables info
-    const result: string = await Utilities.sendSimpleKernelRequest(
-      this.notebookPanel,
-      getAxisInfoFromVariableCommand(variable.alias)
+  public async updateAxesInfo(
+    varGroups: { [sourceName: string]: Variable[] },
+    derivedVars: Variable[]
+  ): Promise<void> {
+    const nbPath = `${this.notebookPanel.sessionContext.path}`;
+
+    // Only the axes used by the variables in each group are needed
+    const paths: { [sourceName: string]: string } = {};
+    const fileAxes: { [path: string]: string[] } = {};
+    Object.keys(varGroups).forEach((sourceName: string) => {
+      const path: string = Utilities.getUpdatedPath(nbPath, sourceName);
+      paths[sourceName] = path;
+      varGroups[sourceName].forEach((variable: Variable) => {
+        if (!variable.axisList) {
+          return;
+        }
+        variable.axisList.forEach((axisName: string) => {
+          if (this._axisDetails[`${path}:${axisName}`]) {
+            return;
+          }
+          if (!fileAxes[path]) {
+            fileAxes[path] = Array<string>();
+          }
+          if (fileAxes[path].indexOf(axisName) < 0) {
+            fileAxes[path].push(axisName);
+          }
+        });
+      });
+    });
+    const varNames: string[] = derivedVars.map(
+      (variable: Variable) => variable.alias
     );
-    this._isBusy = false;
 
-    // Exit if result is blank
-    if (!result) {
-      return;
+    let axesInfo: any = { files: {}, variables: {} };
+    if (Object.keys(fileAxes).length > 0 || varNames.length > 0) {
+      this._isBusy = true;
+      try {
+        axesInfo = await Utilities.sendDataRequest(
+          this.notebookPanel,
+          getRefreshAxesInfoCommand(fileAxes, varNames),
+          REQUEST_PRIORITY.Background,
+          undefined,
+          { command: "axis-info" }
+        );
+      } catch (error) {
+        console.error(error);
+        return;
+      } finally {
+        this._isBusy = false;
+      }
+
+      // Exit if result is blank
+      if (!axesInfo) {
+        return;
+      }
     }
 
-    // Parse the resulting output as file specific axes
-    const axesInfo: any = JSON.parse(result.slice(1, result.length - 1));
-
-    // Update axes info for the variable
-    if (variable.axisList) {
-      variable.axisList.map((item: any) => {
-        if (axesInfo[item] && axesInfo[item].data) {
-          axesInfo[item].first = axesInfo[item].data[0];
-          axesInfo[item].last =
-            axesInfo[item].data[axesInfo[item].data.length - 1];
-          variable.axisInfo.push(axesInfo[item]);
+    // Store the file axes, so the variable loader can reuse them
+    Object.keys(axesInfo.files).forEach((path: string) => {
+      const fileInfo: any = axesInfo.files[path];
+      if (fileInfo.error) {
+        console.error(`Axis info could not be read. Path: ${path}`);
+        return;
+      }
+      Object.keys(fileInfo).forEach((axisName: string) => {
+        this._axisDetails[`${path}:${axisName}`] = fileInfo[axisName];
+      });
+    });
+
+    // Each variable gets its own copy, since first and last are set per variable
+    const addAxes = (
+      variable: Variable,
+      getAxis: (axisName: string) => AxisInfo
+    ): void => {
+      if (!variable.axisList) {
+        return;
+      }
+      variable.axisList.forEach((axisName: string) => {
+        const axis: AxisInfo = getAxis(axisName);
+        if (axis && axis.data) {
+          variable.axisInfo.push({
+            ...axis,
+            first: axis.data[0],
+            last: axis.data[axis.data.length - 1],
+          });
         }
       });
-    }
+    };
+    Object.keys(varGroups).forEach((sourceName: string) => {
+      varGroups[sourceName].forEach((variable: Variable) => {
+        addAxes(
+          variable,
+          (axisName: string) =>
+            this._axisDetails[`${paths[sourceName]}:${axisName}`]
+        );
+      });
+    });
+    derivedVars.forEach((variable: Variable) => {
+      const varAxes: any = axesInfo.variables[variable.alias];
+      if (varAxes) {
+        addAxes(variable, (axisName: string) => varAxes[axisName]);
+      }
+    });
   }
 }
@@ -0,0 +1,335 @@
+// Dependencies
+import * as React from "react";
+import {
+  Button,
+  Input,
+  InputGroup,
+  InputGroupAddon,
+  ListGroup,
+  ListGroupItem,
+  Modal,
+  ModalBody,
+  ModalFooter,
+  ModalHeader,
+  Spinner,
+} from "reactstrap";
+import { NotebookPanel } from "@jupyterlab/notebook";
+import { JupyterFrontEnd } from "@jupyterlab/application";
+import { boundMethod } from "autobind-decorator";
+
+// Project Components
+import { REQUEST_PRIORITY } from "../constants";
+import {
+  aggregateFilesCommand,
+  catalogDirectoryCommand,
+  searchCatalogCommand,
+} from "../PythonCommands";
+import NotebookUtilities from "../NotebookUtilities";
+import Utilities from "../Utilities";
+
+const listGroupStyle: React.CSSProperties = {
+  marginTop: "10px",
+  maxHeight: "50vh",
+  overflowY: "auto",
+};
+
+const listGroupItemStyle: React.CSSProperties = {
+  cursor: "pointer",
+  overflowWrap: "break-word",
+};
+
+const inputGroupStyle: React.CSSProperties = {
+  marginTop: "10px",
+};
+
+const checkboxStyle: React.CSSProperties = {
+  float: "right",
+  position: "relative",
+};
+
+interface ICatalogEntry {
+  path: string; // the absolute path of the file holding the variable
+  name: string;
+  longName: string;
+  units: string;
+  shape: number[];
+  grid: string;
+  timeStart: string;
+  timeEnd: string;
+}
+
+interface ICatalogModalProps {
+  application: JupyterFrontEnd;
+  notebookPanel: NotebookPanel;
+  openFile: (filePath: string) => Promise<void>; // opens the variable loader for a file
+}
+
+interface ICatalogModalState {
+  modalOpen: boolean;
+  directory: string; // the directory tree to index and search, relative to the kernel directory
+  query: string;
+  results: ICatalogEntry[];
+  selectedFiles: string[]; // files picked to open together as one time series
+  status: string; // a summary of the last index or search
+  busy: boolean;
+}
+
+export default class CatalogModal extends React.Component<
+  ICatalogModalProps,
+  ICatalogModalState
+> {
+  constructor(props: ICatalogModalProps) {
+    super(props);
+    this.state = {
+      busy: false,
+      directory: "",
+      modalOpen: false,
+      query: "",
+      results: Array<ICatalogEntry>(),
+      selectedFiles: Array<string>(),
+      status: "",
+    };
+  }
+
+  @boundMethod
+  public async show(): Promise<void> {
+    await this.setState({ modalOpen: true });
+  }
+
+  @boundMethod
+  public async toggle(): Promise<void> {
+    await this.setState({ modalOpen: !this.state.modalOpen });
+  }
+
+  /**
+   * Adds new and modified files in the directory to the catalog. Files that haven't
+   * changed since they were last indexed are not opened again.
+   */
+  @boundMethod
+  public async indexDirectory(): Promise<void> {
+    this.setState({ busy: true, status: "Indexing files..." });
+    try {
+      const summary: any = await this.sendCatalogRequest(
+        catalogDirectoryCommand(this.state.directory || ".")
+      );
+      this.setState({
+        status: `Indexed ${summary.files} files in ${summary.directory} (${summary.scanned} scanned, ${summary.removed} removed, ${summary.errors} could not be opened).`,
+      });
+      await this.search();
+    } catch (error) {
+      console.error(error);
+      this.setState({ status: "The directory could not be indexed." });
+    } finally {
+      this.setState({ busy: false });
+    }
+  }
+
+  @boundMethod
+  public async search(): Promise<void> {
+    this.setState({ busy: true });
+    try {
+      const results: ICatalogEntry[] = await this.sendCatalogRequest(
+        searchCatalogCommand(this.state.directory || ".", this.state.query)
+      );
+      this.setState({ results: results ? results : Array<ICatalogEntry>() });
+    } catch (error) {
+      console.error(error);
+      this.setState({ status: "The catalog could not be searched." });
+    } finally {
+      this.setState({ busy: false });
+    }
+  }
+
+  /**
+   * Opens the selected files as one dataset, joined along time. Reading a time range
+   * from it only opens the files which overlap that range.
+   */
+  @boundMethod
+  public async openTimeSeries(): Promise<void> {
+    this.setState({ busy: true, status: "Combining files..." });
+    try {
+      const result: any = await this.sendCatalogRequest(
+        aggregateFilesCommand(this.state.selectedFiles)
+      );
+      if (result.error) {
+        this.setState({ status: "" });
+        NotebookUtilities.showMessage(result.error.ename, result.error.evalue);
+        return;
+      }
+      await this.setState({
+        modalOpen: false,
+        selectedFiles: Array<string>(),
+        status: "",
+      });
+      await this.props.openFile(result.path);
+    } catch (error) {
+      console.error(error);
+      this.setState({ status: "The files could not be combined." });
+    } finally {
+      this.setState({ busy: false });
+    }
+  }
+
+  public render(): JSX.Element {
+    return (
+      <Modal isOpen={this.state.modalOpen} toggle={this.toggle} size="lg">
+        <ModalHeader toggle={this.toggle}>Data Catalog</ModalHeader>
+        <ModalBody className={/* @tag<catalog-modal>*/ "catalog-modal-vcdat"}>
+          <InputGroup>
+            <InputGroupAddon addonType="prepend">Directory:</InputGroupAddon>
+            <Input
+              className={
+                /* @tag<catalog-directory-input>*/ "catalog-directory-input-vcdat"
+              }
+              onChange={this.handleDirectoryChange}
+              placeholder="data_directory"
+              value={this.state.directory}
+            />
+            <InputGroupAddon addonType="append">
+              <Button
+                className={
+                  /* @tag<catalog-index-btn>*/ "catalog-index-btn-vcdat"
+                }
+                color="info"
+                disabled={this.state.busy}
+                onClick={this.indexDirectory}
+                title="Index the data files in this directory and its subdirectories."
+              >
+                Index
+              </Button>
+            </InputGroupAddon>
+          </InputGroup>
+          <InputGroup style={inputGroupStyle}>
+            <InputGroupAddon addonType="prepend">Search:</InputGroupAddon>
+            <Input
+              className={
+                /* @tag<catalog-search-input>*/ "catalog-search-input-vcdat"
+              }
+              onChange={this.handleQueryChange}
+              onKeyPress={this.handleKeyPress}
+              placeholder="Variable name, long name or file name"
+              value={this.state.query}
+            />
+            <InputGroupAddon addonType="append">
+              <Button
+                color="info"
+                disabled={this.state.busy}
+                onClick={this.search}
+              >
+                Search
+              </Button>
+            </InputGroupAddon>
+          </InputGroup>
+          <div className="text-muted" style={inputGroupStyle}>
+            {this.state.busy && <Spinner color="info" size="sm" />}{" "}
+            {this.state.status}
+          </div>
+          {this.state.results.length > 0 && (
+            <ListGroup
+              style={listGroupStyle}
+              className={
+                /* @tag<catalog-results-list>*/ "catalog-results-list-vcdat"
+              }
+            >
+              {this.state.results.map((entry: ICatalogEntry) => {
+                const openEntry = async (): Promise<void> => {
+                  await this.setState({ modalOpen: false });
+                  await this.props.openFile(entry.path);
+                };
+                const toggleFile = (
+                  event: React.MouseEvent<HTMLInputElement>
+                ): void => {
+                  event.stopPropagation();
+                  const selectedFiles = this.state.selectedFiles.filter(
+                    (path: string) => path !== entry.path
+                  );
+                  if (selectedFiles.length === this.state.selectedFiles.length) {
+                    selectedFiles.push(entry.path);
+                  }
+                  this.setState({ selectedFiles });
+                };
+                return (
+                  <ListGroupItem
+                    key={`${entry.path}:${entry.name}`}
+                    style={listGroupItemStyle}
+                    title={`Load variables from ${entry.path}`}
+                    onClick={openEntry}
+                  >
+                    <Input
+                      type="checkbox"
+                      style={checkboxStyle}
+                      title="Select this file to open it as part of a time series."
+                      checked={this.state.selectedFiles.indexOf(entry.path) >= 0}
+                      onClick={toggleFile}
+                      readOnly={true}
+                    />
+                    <strong>{entry.name}</strong>
+                    {` ${entry.longName} [${entry.units}] (${entry.shape.join(
+                      ", "
+                    )})`}
+                    {entry.timeStart &&
+                      ` ${entry.timeStart} to ${entry.timeEnd}`}
+                    <div className="text-muted">{entry.path}</div>
+                  </ListGroupItem>
+                );
+              })}
+            </ListGroup>
+          )}
+        </ModalBody>
+        <ModalFooter>
+          <Button
+            className={
+              /* @tag<catalog-timeseries-btn>*/ "catalog-timeseries-btn-vcdat"
+            }
+            color="info"
+            disabled={this.state.busy || this.state.selectedFiles.length < 2}
+            onClick={this.openTimeSeries}
+            title="Open the selected files as one dataset joined along time."
+          >
+            {`Open ${this.state.selectedFiles.length} Files as Time Series`}
+          </Button>
+          <Button outline={true} color="primary" onClick={this.toggle}>
+            Close
+          </Button>
+        </ModalFooter>
+      </Modal>
+    );
+  }
+
+  // Uses the notebook's kernel if there is one, otherwise a helper kernel from the pool
+  @boundMethod
+  private async sendCatalogRequest(code: string): Promise<any> {
+    const result: string = await Utilities.sendSimpleKernelRequest(
+      this.props.notebookPanel
+        ? this.props.notebookPanel
+        : this.props.application,
+      code,
+      false,
+      REQUEST_PRIORITY.Normal,
+      undefined,
+      { command: "catalog" }
+    );
+    return Utilities.parseJSONResult(result);
+  }
+
+  @boundMethod
+  private handleDirectoryChange(
+    event: React.ChangeEvent<HTMLInputElement>
+  ): void {
+    this.setState({ directory: event.target.value });
+  }
+
+  @boundMethod
+  private handleQueryChange(event: React.ChangeEvent<HTMLInputElement>): void {
+    this.setState({ query: event.target.value });
+  }
+
+  @boundMethod
+  private async handleKeyPress(
+    event: React.KeyboardEvent<HTMLInputElement>
+  ): Promise<void> {
+    if (event.key === "Enter") {
+      await this.search();
+    }
+  }
+}
@@ -16,9 +16,8 @@ import {
 } from "reactstrap";
 
 // Project Components
-import { checkForExportedFileCommand } from "../PythonCommands";
 import CodeInjector from "../CodeInjector";
-import Utilities from "../Utilities";
+import Utilities, { IExportInfo } from "../Utilities";
 import { ExportFormat, ImageUnit } from "../types";
 import { boundMethod } from "autobind-decorator";
 
@@ -150,21 +149,23 @@ export default class ExportPlotModal extends React.Component<
 
     this.props.setPlotInfo(plotName, fileFormat);
     this.props.exportAlerts();
-    await this.props.codeInjector.exportPlot(
-      fileFormat,
-      plotName,
-      this.state.width,
-      this.state.height,
-      this.state.plotUnits,
-      this.state.captureProvenance
-    );
     const plotFileName = `${plotName}.${fileFormat}`;
     try {
-      const result: string = await Utilities.sendSimpleKernelRequest(
+      const info: IExportInfo = await Utilities.watchExport(
         this.props.notebookPanel,
-        checkForExportedFileCommand(plotFileName)
+        plotFileName,
+        (exportId: string) =>
+          this.props.codeInjector.exportPlot(
+            fileFormat,
+            plotName,
+            this.state.width,
+            this.state.height,
+            this.state.plotUnits,
+            this.state.captureProvenance,
+            exportId
+          )
       );
-      if (result === "True") {
+      if (!info.error) {
         this.props.showExportSuccessAlert();
       }
 
@@ -52,8 +52,10 @@ interface IGraphicsMenuProps {
   updateGraphicsOptions: (group: string, name: string) => Promise<void>;
   updateColormap: (name: string) => Promise<void>;
   overlayMode: boolean;
+  previewMode: boolean; // whether plots are thinned to the canvas size
   shouldAnimate: boolean;
   toggleOverlayMode: () => void;
+  togglePreviewMode: () => void;
   toggleSidecar: () => {};
   toggleAnimate: () => void;
   toggleAnimateInverse: () => void;
@@ -231,6 +233,24 @@ export default class GraphicsMenu extends React.Component<
                     />
                   </Col>
                 </Row>
+                <Row>
+                  <Col xs="auto">
+                    <CustomInput
+                      type="switch"
+                      id={
+                        /* @tag<graphics-preview-switch>*/ "graphics-preview-switch-vcdat"
+                      }
+                      name="previewModeSwitch"
+                      label="Preview Plot"
+                      title="Plot the variables thinned to the size of the canvas"
+                      disabled={
+                        !this.state.plotReady || this.props.shouldAnimate
+                      }
+                      checked={this.props.previewMode}
+                      onChange={this.props.togglePreviewMode}
+                    />
+                  </Col>
+                </Row>
                 <Row>
                   <Col xs="auto">
                     <CustomInput
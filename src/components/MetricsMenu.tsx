@@ -0,0 +1,185 @@
+// Dependencies
+import * as React from "react";
+import {
+  Button,
+  ButtonGroup,
+  Card,
+  CardBody,
+  CardTitle,
+  Collapse,
+  Table,
+} from "reactstrap";
+import { boundMethod } from "autobind-decorator";
+
+// Project Components
+import RequestMetrics, { ICommandSummary } from "../RequestMetrics";
+import Utilities from "../Utilities";
+
+const tableStyle: React.CSSProperties = {
+  fontSize: "small",
+  marginTop: "10px",
+};
+
+interface IMetricsMenuState {
+  showMenu: boolean;
+  summary: ICommandSummary[];
+}
+
+export default class MetricsMenu extends React.Component<
+  {},
+  IMetricsMenuState
+> {
+  private updateTimer: number; // the summary is updated at most once a second
+
+  constructor(props: {}) {
+    super(props);
+    this.state = {
+      showMenu: false,
+      summary: RequestMetrics.getMetrics().summarize(),
+    };
+    this.updateTimer = null;
+  }
+
+  public componentDidMount(): void {
+    RequestMetrics.getMetrics().changed.connect(this.handleMetricsChanged);
+  }
+
+  public componentWillUnmount(): void {
+    RequestMetrics.getMetrics().changed.disconnect(this.handleMetricsChanged);
+    RequestMetrics.getMetrics().measureSizes = false;
+    window.clearTimeout(this.updateTimer);
+  }
+
+  @boundMethod
+  public toggleMenu(): void {
+    // Results are only measured while their sizes are shown
+    RequestMetrics.getMetrics().measureSizes = !this.state.showMenu;
+    this.setState({
+      showMenu: !this.state.showMenu,
+      summary: RequestMetrics.getMetrics().summarize(),
+    });
+  }
+
+  /**
+   * Downloads the summary and every recorded request as a JSON file.
+   */
+  @boundMethod
+  public exportMetrics(): void {
+    const blob = new Blob([RequestMetrics.getMetrics().exportJSON()], {
+      type: "application/json",
+    });
+    const url: string = URL.createObjectURL(blob);
+    const link: HTMLAnchorElement = document.createElement("a");
+    link.href = url;
+    link.download = `vcdat-metrics-${new Date().toISOString()}.json`;
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+    URL.revokeObjectURL(url);
+  }
+
+  @boundMethod
+  public clearMetrics(): void {
+    RequestMetrics.getMetrics().clear();
+  }
+
+  public render(): JSX.Element {
+    return (
+      <div>
+        <Card>
+          <CardBody
+            className={/* @tag<metricsmenu-main>*/ "metricsmenu-main-vcdat"}
+          >
+            <CardTitle>Request Timings</CardTitle>
+            <ButtonGroup>
+              <Button
+                className={
+                  /* @tag<metricsmenu-toggle-btn>*/ "metricsmenu-toggle-btn-vcdat"
+                }
+                color="info"
+                outline={!this.state.showMenu}
+                onClick={this.toggleMenu}
+                size="sm"
+              >
+                {this.state.showMenu ? "Hide" : "Show"}
+              </Button>
+              <Button
+                className={
+                  /* @tag<metricsmenu-export-btn>*/ "metricsmenu-export-btn-vcdat"
+                }
+                color="info"
+                outline={true}
+                onClick={this.exportMetrics}
+                size="sm"
+                title="Download every recorded request as JSON."
+              >
+                Export JSON
+              </Button>
+              <Button
+                color="info"
+                outline={true}
+                onClick={this.clearMetrics}
+                size="sm"
+              >
+                Clear
+              </Button>
+            </ButtonGroup>
+            <Collapse isOpen={this.state.showMenu}>
+              {this.state.summary.length > 0 ? (
+                <Table size="sm" style={tableStyle}>
+                  <thead>
+                    <tr>
+                      <th>Command</th>
+                      <th>Count</th>
+                      <th>p50 (ms)</th>
+                      <th>p95 (ms)</th>
+                      <th>Sent</th>
+                      <th>Received</th>
+                    </tr>
+                  </thead>
+                  <tbody>
+                    {this.state.summary.map((row: ICommandSummary) => (
+                      <tr
+                        key={row.command}
+                        title={`${row.errors} failed, slowest ${Math.round(
+                          row.max
+                        )} ms`}
+                      >
+                        <td>{row.command}</td>
+                        <td>{row.count}</td>
+                        <td>{Math.round(row.p50)}</td>
+                        <td>{Math.round(row.p95)}</td>
+                        <td>{Utilities.formatBytes(row.requestBytes)}</td>
+                        <td>
+                          {row.responseBytes === null
+                            ? "-"
+                            : Utilities.formatBytes(row.responseBytes)}
+                        </td>
+                      </tr>
+                    ))}
+                  </tbody>
+                </Table>
+              ) : (
+                <div className="text-muted" style={tableStyle}>
+                  No requests have been recorded yet.
+                </div>
+              )}
+            </Collapse>
+          </CardBody>
+        </Card>
+      </div>
+    );
+  }
+
+  @boundMethod
+  private handleMetricsChanged(): void {
+    // Only the open table needs updating, it's summarized again when shown
+    if (!this.state.showMenu || this.updateTimer !== null) {
+      return;
+    }
+    this.updateTimer = window.setTimeout(() => {
+      this.updateTimer = null;
+      this.setState({ summary: RequestMetrics.getMetrics().summarize() });
+    }, 1000);
+  }
+}
@@ -19,9 +19,11 @@ import NotebookUtilities from "../NotebookUtilities";
 import ExportPlotModal from "./ExportPlotModal";
 import GraphicsMenu from "./GraphicsMenu";
 import TemplateMenu from "./TemplateMenu";
+import MetricsMenu from "./MetricsMenu";
 import Variable from "../Variable";
 import VarMenu from "./VarMenu";
 import InputModal from "./InputModal";
+import CatalogModal from "./CatalogModal";
 import VariableTracker from "../VariableTracker";
 import Utilities from "../Utilities";
 import LeftSideBarWidget from "../LeftSideBarWidget";
@@ -81,6 +83,7 @@ interface IVCSMenuState {
   plotName: string;
   plotFormat: string;
   overlayMode: boolean;
+  previewMode: boolean; // plot the variables thinned to the canvas size
   plotReady: boolean;
   plotExists: boolean;
   previousDisplayMode: DISPLAY_MODE;
@@ -99,6 +102,7 @@ export default class VCSMenu extends React.Component<
   public graphicsMenuRef: GraphicsMenu;
   public templateMenuRef: TemplateMenu;
   public filePathInputRef: InputModal;
+  public catalogModalRef: CatalogModal;
   constructor(props: IVCSMenuProps) {
     super(props);
     this.state = {
@@ -115,6 +119,7 @@ export default class VCSMenu extends React.Component<
       plotFormat: "",
       plotName: "",
       plotReady: this.props.plotReady,
+      previewMode: false,
       previousDisplayMode: DISPLAY_MODE.None,
       savePlotAlert: false,
       selectedColormap: "",
@@ -128,6 +133,7 @@ export default class VCSMenu extends React.Component<
     this.graphicsMenuRef = (React as any).createRef();
     this.templateMenuRef = (React as any).createRef();
     this.filePathInputRef = (React as any).createRef();
+    this.catalogModalRef = (React as any).createRef();
 
     // Close sidecar panel at startup
     if (this.props.openSidecarPanel) {
@@ -224,6 +230,11 @@ export default class VCSMenu extends React.Component<
     this.filePathInputRef.show();
   }
 
+  @boundMethod
+  public showCatalogModal(): void {
+    this.catalogModalRef.show();
+  }
+
   @boundMethod
   public exportPlotAlerts(): void {
     this.setState({ savePlotAlert: true });
@@ -234,6 +245,11 @@ export default class VCSMenu extends React.Component<
     this.setState({ isModalOpen: !this.state.isModalOpen });
   }
 
+  @boundMethod
+  public togglePreviewMode(): void {
+    this.setState({ previewMode: !this.state.previewMode });
+  }
+
   @boundMethod
   public async toggleOverlayMode(): Promise<void> {
     this.setState({ overlayMode: !this.state.overlayMode });
@@ -551,7 +567,8 @@ export default class VCSMenu extends React.Component<
             this.state.selectedTemplate,
             this.state.overlayMode,
             this.state.previousDisplayMode,
-            this.state.currentDisplayMode
+            this.state.currentDisplayMode,
+            this.state.previewMode
           );
         }
         this.setState({ previousDisplayMode: this.state.currentDisplayMode });
@@ -575,10 +592,12 @@ export default class VCSMenu extends React.Component<
       overlayMode: this.state.overlayMode,
       plotReady: this.state.plotReady,
       plotReadyChanged: this.props.plotReadyChanged,
+      previewMode: this.state.previewMode,
       shouldAnimate: this.state.shouldAnimate,
       toggleAnimate: this.toggleAnimate,
       toggleAnimateInverse: this.toggleAnimateAxisInvert,
       toggleOverlayMode: this.toggleOverlayMode,
+      togglePreviewMode: this.togglePreviewMode,
       toggleSidecar: this.toggleSidecar,
       updateAnimateAxis: this.updateAnimateAxisId,
       updateAnimateRate: this.updateAnimateRate,
@@ -595,6 +614,7 @@ export default class VCSMenu extends React.Component<
       notebookPanel: this.state.notebookPanel,
       saveNotebook: this.saveNotebook,
       setPlotInfo: this.setPlotInfo,
+      showCatalogModal: this.showCatalogModal,
       showExportSuccessAlert: this.showExportSuccessAlert,
       showInputModal: this.showInputModal,
       syncNotebook: this.props.syncNotebook,
@@ -636,6 +656,12 @@ export default class VCSMenu extends React.Component<
       title: "Load Variables from Path",
     };
 
+    const catalogModalProps = {
+      application: this.props.application,
+      notebookPanel: this.state.notebookPanel,
+      openFile: this.props.prepareNotebookFromPath,
+    };
+
     return (
       <Card style={{ ...centered, ...sidebarOverflow }}>
         <Card>
@@ -710,11 +736,16 @@ export default class VCSMenu extends React.Component<
           {...templateMenuProps}
           ref={(loader): TemplateMenu => (this.templateMenuRef = loader)}
         />
+        <MetricsMenu />
         <ExportPlotModal {...exportPlotModalProps} />
         <InputModal
           {...inputModalProps}
           ref={(loader): InputModal => (this.filePathInputRef = loader)}
         />
+        <CatalogModal
+          {...catalogModalProps}
+          ref={(loader): CatalogModal => (this.catalogModalRef = loader)}
+        />
         <div>
           <Alert
             color="info"
@@ -51,6 +51,7 @@ interface IVarCardProps {
   selectVariable: (variable: Variable) => void; // method to call to add this variable to the list to get loaded
   deselectVariable: (variable: Variable) => void; // method to call to remove a variable from the list
   updateDimInfo: (newInfo: any, varID: string) => void; // method passed by the parent to update their copy of the variables dimension info
+  loadAxisDetails: (variable: Variable) => Promise<void>; // method to fetch the full axis info before the axes are shown
   isSelected: (varAlias: string) => boolean; // method to check if this variable is selected in parent
   selected: boolean; // should the axis be hidden by default
 }
@@ -119,10 +120,12 @@ export default class VarCard extends React.Component<
    * @description open the menu if its closed
    */
   @boundMethod
-  public openMenu(): void {
+  public async openMenu(): Promise<void> {
     if (!this.state.showAxis && this.state.selected) {
+      await this.props.loadAxisDetails(this.state.variable);
       this.setState({
         showAxis: true,
+        variable: this.state.variable,
       });
     }
   }
@@ -317,8 +320,14 @@ export default class VarCard extends React.Component<
   }
 
   @boundMethod
-  private handleAxesClick(): void {
-    this.setState({ showAxis: !this.state.showAxis });
+  private async handleAxesClick(): Promise<void> {
+    if (!this.state.showAxis) {
+      await this.props.loadAxisDetails(this.state.variable);
+    }
+    this.setState({
+      showAxis: !this.state.showAxis,
+      variable: this.state.variable,
+    });
   }
 
   @boundMethod
@@ -24,7 +24,10 @@ const noScroll: React.CSSProperties = {
 };
 
 interface IVarLoaderProps {
-  loadSelectedVariables: (variables: Variable[]) => Promise<void>; // function to call when user hits load
+  loadSelectedVariables: (
+    variables: Variable[],
+    preview?: boolean
+  ) => Promise<void>; // function to call when user hits load or preview
   varTracker: VariableTracker;
 }
 interface IVarLoaderState {
@@ -92,9 +95,12 @@ export default class VarLoader extends React.Component<
     );
   }
 
-  // Loads all the selected variables into the notebook, returns the number loaded
+  // Loads all the selected variables into the notebook, as previews that fit the canvas if preview is true
   @boundMethod
-  public async loadSelectedVariables(varsToLoad: Variable[]): Promise<void> {
+  public async loadSelectedVariables(
+    varsToLoad: Variable[],
+    preview = false
+  ): Promise<void> {
     // Exit early if no variable selected for loading
     if (this.selections.length === 0) {
       this.selections = Array<Variable>();
@@ -129,7 +135,7 @@ export default class VarLoader extends React.Component<
     // Reset the state of the var loader when done
     await this.reset();
 
-    await this.props.loadSelectedVariables(varsToLoad);
+    await this.props.loadSelectedVariables(varsToLoad, preview);
 
     // Save the notebook after variables have been added
     await this.props.varTracker.saveMetaData();
@@ -305,6 +311,7 @@ export default class VarLoader extends React.Component<
                       varAliasExists={this.varAliasExists}
                       varSelectionChanged={this.selectionChanged}
                       updateDimInfo={this.updateDimInfo}
+                      loadAxisDetails={this.props.varTracker.loadAxisDetails}
                       isSelected={this.isSelected}
                       selected={this.isSelected(item.varID)}
                       key={item.name}
@@ -317,6 +324,18 @@ export default class VarLoader extends React.Component<
             </div>
           </ModalBody>
           <ModalFooter>
+            <Button
+              className={
+                /* @tag<var-loader-preview-btn>*/ "var-loader-preview-btn-vcdat"
+              }
+              outline={true}
+              active={this.selections.length > 0}
+              color="secondary"
+              title="Load the variables at the resolution of the canvas, they can be loaded in full later"
+              onClick={this.handlePreviewClick}
+            >
+              Preview
+            </Button>
             <Button
               className={
                 /* @tag<var-loader-load-btn>*/ "var-loader-load-btn-vcdat"
@@ -339,4 +358,10 @@ export default class VarLoader extends React.Component<
     this.setState({ show: false });
     this.loadSelectedVariables(this.selections);
   }
+
+  @boundMethod
+  private handlePreviewClick(): void {
+    this.setState({ show: false });
+    this.loadSelectedVariables(this.selections, true);
+  }
 }
@@ -43,6 +43,7 @@ interface IVarMenuProps {
   dismissSavePlotSpinnerAlert: () => void;
   showExportSuccessAlert: () => void;
   showInputModal: () => void;
+  showCatalogModal: () => void;
   notebookPanel: NotebookPanel;
 }
 
@@ -96,6 +97,14 @@ export default class VarMenu extends React.Component<
     this.props.showInputModal();
   }
 
+  /**
+   * @description launches the catalog so the user can search indexed data files
+   */
+  @boundMethod
+  public async launchCatalogModal(): Promise<void> {
+    this.props.showCatalogModal();
+  }
+
   /**
    * @description launches the notebooks filebrowser so the user can select a data file
    */
@@ -187,6 +196,17 @@ export default class VarMenu extends React.Component<
                     >
                       Path
                     </Button>
+                    <Button
+                      className={
+                        /* @tag<varmenu-load-variables-catalog-btn>*/ "varmenu-load-variables-catalog-btn-vcdat"
+                      }
+                      color="info"
+                      onClick={this.launchCatalogModal}
+                      style={varButtonStyle}
+                      title="Index a directory of data files and search it for variables."
+                    >
+                      Catalog
+                    </Button>
                   </ButtonGroup>
                 </Col>
                 {this.props.syncNotebook() && (
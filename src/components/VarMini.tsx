@@ -21,12 +21,11 @@ import {
 
 // Project Components
 import CodeInjector from "../CodeInjector";
-import Utilities from "../Utilities";
+import Utilities, { IExportInfo } from "../Utilities";
 import AxisInfo from "../AxisInfo";
 import DimensionSlider from "./DimensionSlider";
 import Variable from "../Variable";
 import NotebookUtilities from "../NotebookUtilities";
-import { checkForExportedFileCommand } from "../PythonCommands";
 import VariableTracker from "../VariableTracker";
 import { boundMethod } from "autobind-decorator";
 
@@ -258,25 +257,27 @@ export default class VarMini extends React.Component<
       return;
     }
     this.setState({ validateFileName: false });
-    await this.props.codeInjector.saveNetCDFFile(
-      this.state.filename,
-      this.state.variable.alias,
-      this.state.newVariableSaveName,
-      this.state.activateAppend,
-      this.state.activateShuffle,
-      this.state.activateDeflate,
-      this.state.deflateValue
-    );
     this.toggleSaveModal();
     this.props.setPlotInfo(splitFileName[0], splitFileName[1]);
     this.props.exportAlerts();
 
     try {
-      const result: string = await Utilities.sendSimpleKernelRequest(
+      const info: IExportInfo = await Utilities.watchExport(
         this.props.notebookPanel,
-        checkForExportedFileCommand(this.state.filename)
+        this.state.filename,
+        (exportId: string) =>
+          this.props.codeInjector.saveNetCDFFile(
+            this.state.filename,
+            this.state.variable.alias,
+            this.state.newVariableSaveName,
+            this.state.activateAppend,
+            this.state.activateShuffle,
+            this.state.activateDeflate,
+            this.state.deflateValue,
+            exportId
+          )
       );
-      if (result === "True") {
+      if (!info.error) {
         this.props.dismissSavePlotSpinnerAlert();
         this.props.showExportSuccessAlert();
       }
@@ -334,6 +335,21 @@ export default class VarMini extends React.Component<
                 {Utilities.numToOrdStr(this.props.selectOrder)}
               </Button>
             )}
+            {this.props.variable.preview && (
+              <Button
+                className={
+                  /* @tag<varmini-full-res-btn>*/ "varmini-full-res-btn-vcdat"
+                }
+                outline={true}
+                title={`This is a preview read with strides of ${this.props.variable.preview.join(
+                  ", "
+                )}. Click to load it at full resolution.`}
+                color={"warning"}
+                onClick={this.handleFullResolutionClick}
+              >
+                full res
+              </Button>
+            )}
             <Button
               className={/* @tag<varmini-edit-btn>*/ "varmini-edit-btn-vcdat"}
               outline={true}
@@ -528,6 +544,14 @@ export default class VarMini extends React.Component<
     await this.props.codeInjector.loadVariable(copy);
   }
 
+  @boundMethod
+  private async handleFullResolutionClick(
+    clickEvent: React.MouseEvent<HTMLButtonElement>
+  ): Promise<void> {
+    clickEvent.stopPropagation();
+    await this.props.codeInjector.promoteVariable(this.props.variable);
+  }
+
   @boundMethod
   private async handleDeleteClick(
     clickEvent: React.MouseEvent<HTMLButtonElement>
@@ -6,9 +6,14 @@ export const OLD_VCDAT_VERSION = "<=2.0";
 export const VCDAT_VERSION = "2.3";
 export const VCDAT_VERSION_KEY = "vcdat_version";
 export const MAX_SLABS = 2;
-export const MAX_DIM_LENGTH = 1000;
+export const SIDEBAR_REFRESH_DELAY = 250; // ms without cell runs before the sidebar is updated
+export const KERNEL_POOL_SIZE = 2; // helper kernels for requests not tied to a notebook
+export const KERNEL_POOL_IDLE_TIMEOUT = 600000; // ms a helper kernel is kept while unused
+export const DATA_REPLY_TIMEOUT = 10000; // ms to wait for channel data after the request's reply
+export const METRICS_MAX_SAMPLES = 5000; // kernel request timings kept for the metrics panel
+export const DEFAULT_CANVAS_WIDTH = 800; // canvas size used for previews when there is no canvas
+export const DEFAULT_CANVAS_HEIGHT = 600;
 export const BASE_URL = "/vcs";
-export const BASE_DATA_READER_NAME = "file_data";
 export const READY_KEY = "vcdat_ready";
 export const EXTENSIONS: string[] = [
   ".nc",
@@ -22,6 +27,8 @@ export const EXTENSIONS: string[] = [
 ];
 
 export const OUTPUT_RESULT_NAME = "_private_vcdat_output";
+export const DATA_CHANNEL_TARGET = "vcdat_data";
+export const PUSH_CHANNEL_TARGET = "vcdat_push";
 export const FILE_PATH_KEY = "vcdat_file_path";
 export const IMPORT_CELL_KEY = "vcdat_imports";
 export const CANVAS_CELL_KEY = "vcdat_canvases";
@@ -31,7 +38,7 @@ export const GRAPHICS_METHOD_KEY = "graphics_method_selected";
 export const PLOT_OPTIONS_KEY = "vcdat_plot_options";
 export const TEMPLATE_KEY = "template_selected";
 export const VARIABLES_LOADED_KEY = "vcdat_loaded_variables";
-export const REQUIRED_MODULES = '["cdms2","vcs","numpy","os"]';
+export const REQUIRED_MODULES = '["cdms2","vcs","numpy","os","vcdat_kernel"]';
 
 export const BASE_GRAPHICS: { [dataName: string]: string[] } = {
   "1d": [
@@ -230,6 +237,13 @@ export enum DISPLAY_MODE {
   None,
 }
 
+// Specifies the order in which queued kernel requests are sent, lowest first
+export enum REQUEST_PRIORITY {
+  Interactive, // Actions the user is waiting on, like plotting
+  Normal,
+  Background, // Updates of the sidebar lists
+}
+
 // Note: Using reactHtmlParser function, tutorial steps can be rendered as HTML
 export const GETTING_STARTED: Step[] = [
   {
@@ -118,6 +118,7 @@ function activate(
   app.restored
     .then(() => {
       Utilities.addHelpMenuItem(mainMenu, {}, "vcdat-show-about");
+      mainMenu.kernelMenu.addGroup([{ command: "vcdat-cancel-requests" }]);
       Utilities.addHelpReference(
         mainMenu,
         "VCS Basic Tutorial",
@@ -4,6 +4,9 @@ export type ExportFormat = "png" | "pdf" | "svg" | "ps" | "";
 // Specifies accepted units for plots
 export type ImageUnit = "px" | "in" | "cm" | "mm" | "dot";
 
+// Specifies how variables are loaded from a file
+export type LoadMode = "full" | "lazy" | "subsample" | "cancel";
+
 // Specifies valid data types for settings validation
 export type ValidTypes =
   | "array"
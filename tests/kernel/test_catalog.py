@@ -0,0 +1,81 @@
+"""Tests of the catalog of the variables in a directory tree."""
+import os
+
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+pytest.importorskip('cdms2')
+
+from vcdat_kernel import catalog, parallel  # noqa: E402
+
+
+def _entry(path, *names):
+    return {'path': path, 'error': None, 'axes': [('time', 12, 'days since 2000')],
+            'variables': [(name, name.upper() + ' long name', 'K', '[12]', '["time"]',
+                           None, None, None) for name in names]}
+
+
+def _no_pool():
+    raise OSError('no process pool')
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    root = tmp_path / 'data_100%'
+    (root / 'tas_dir').mkdir(parents=True)
+    files = {
+        str(root / 'tas_dir' / 'model_a.nc'): ('pr',),
+        str(root / 'tas_dir' / 'x%y.nc'): ('ts', 'sea_ice'),
+        str(root / 'seaXice.nc'): ('clt',),
+    }
+    for path in files:
+        with open(path, 'wb') as out:
+            out.write(b'data')
+    monkeypatch.setattr(catalog, 'scan_header', lambda path: _entry(path, *files[path]))
+    # Without a process pool the files are scanned in this process, by the scan_header above
+    monkeypatch.setattr(parallel, 'get_context', _no_pool)
+    return str(root)
+
+
+def _found(directory, query):
+    return sorted((os.path.basename(entry['path']), entry['name'])
+                  for entry in catalog.catalog_search(directory, query))
+
+
+def test_catalog_directory_scans_changed_files(tree):
+    assert catalog.catalog_directory(tree, ['.nc'])['scanned'] == 3
+    assert catalog.catalog_directory(tree, ['.nc'])['scanned'] == 0
+    os.remove(os.path.join(tree, 'seaXice.nc'))
+    summary = catalog.catalog_directory(tree, ['.nc'])
+    assert (summary['files'], summary['removed']) == (2, 1)
+    assert _found(tree, 'clt') == []
+
+
+def test_search_names_and_long_names(tree):
+    catalog.catalog_directory(tree, ['.nc'])
+    assert _found(tree, 'pr') == [('model_a.nc', 'pr')]
+    assert _found(tree, 'TS LONG') == [('x%y.nc', 'ts')]
+
+
+def test_search_file_names_not_directories(tree):
+    catalog.catalog_directory(tree, ['.nc'])
+    assert _found(tree, 'model_') == [('model_a.nc', 'pr')]
+    # Every file is under data_100% and some under tas_dir, neither is matched
+    assert _found(tree, 'tas_dir') == []
+    assert _found(tree, '100') == []
+
+
+def test_search_wildcards_matched_literally(tree):
+    catalog.catalog_directory(tree, ['.nc'])
+    # _ would match the X of seaXice.nc, and % would match every file
+    assert _found(tree, 'sea_ice') == [('x%y.nc', 'sea_ice')]
+    assert _found(tree, 'x%y') == [('x%y.nc', 'sea_ice'), ('x%y.nc', 'ts')]
+    assert _found(tree, '\\') == []
+
+
+def test_search_limited_to_directory(tree):
+    catalog.catalog_directory(tree, ['.nc'])
+    assert _found(os.path.join(tree, 'tas_dir'), 'clt') == []
+    assert _found(os.path.join(tree, 'tas_dir'), 'pr') == [('model_a.nc', 'pr')]
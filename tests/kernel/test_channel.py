@@ -0,0 +1,46 @@
+"""Tests of the encoding of results sent over the data channel."""
+import numpy
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+pytest.importorskip('cdms2')
+
+from vcdat_kernel.channel import encode  # noqa: E402
+from vcdat_kernel.constants import DATA_CHANNEL_MIN_BUFFER  # noqa: E402
+
+
+def _decode(buffer):
+    return numpy.frombuffer(buffer, dtype='<f8').tolist()
+
+
+def test_encode_long_lists_as_buffers():
+    values = list(range(DATA_CHANNEL_MIN_BUFFER))
+    buffers = []
+    payload = encode({'axis': {'data': values, 'name': 'lat'}}, buffers)
+    assert payload == {'axis': {'data': {'vcdatBuffer': 0}, 'name': 'lat'}}
+    assert _decode(buffers[0]) == values
+
+
+def test_encode_arrays():
+    buffers = []
+    payload = encode([numpy.arange(DATA_CHANNEL_MIN_BUFFER, dtype='int32'),
+                      numpy.linspace(0, 1, DATA_CHANNEL_MIN_BUFFER)], buffers)
+    assert payload == [{'vcdatBuffer': 0}, {'vcdatBuffer': 1}]
+    assert _decode(buffers[0]) == list(range(DATA_CHANNEL_MIN_BUFFER))
+    assert _decode(buffers[1]) == numpy.linspace(0, 1, DATA_CHANNEL_MIN_BUFFER).tolist()
+
+
+@pytest.mark.parametrize('value', [
+    list(range(DATA_CHANNEL_MIN_BUFFER - 1)),
+    [True] * DATA_CHANNEL_MIN_BUFFER,
+    ['a'] * DATA_CHANNEL_MIN_BUFFER,
+    [1] * (DATA_CHANNEL_MIN_BUFFER - 1) + [None],
+    'text',
+    3.5,
+    None,
+])
+def test_encode_leaves_other_values(value):
+    buffers = []
+    assert encode(value, buffers) == value
+    assert buffers == []
@@ -0,0 +1,77 @@
+"""Tests of the block-at-a-time reductions, against numpy's masked reductions."""
+import numpy
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+cdms2 = pytest.importorskip('cdms2')
+
+from vcdat_kernel.chunked import REDUCTIONS, block_shape, chunked_reduce, iter_blocks  # noqa: E402
+
+
+@pytest.mark.parametrize('shape, itemsize, max_bytes, expected', [
+    # Fits whole
+    ((10, 20, 30), 8, 10 ** 9, [10, 20, 30]),
+    # Whole slabs of the trailing axes
+    ((10, 20, 30), 8, 8 * 20 * 30 * 3, [3, 20, 30]),
+    # Leading axis down to one, then rows of the last axis
+    ((10, 20, 30), 8, 8 * 30 * 7, [1, 7, 30]),
+    # Smaller than one value
+    ((10, 20, 30), 8, 4, [1, 1, 1]),
+    # Empty axes still get a block of one
+    ((10, 0, 30), 8, 10 ** 9, [10, 1, 30]),
+])
+def test_block_shape(shape, itemsize, max_bytes, expected):
+    assert block_shape(shape, itemsize, max_bytes) == expected
+
+
+@pytest.mark.parametrize('shape, block', [
+    ((5, 7), (2, 3)),
+    ((4, 6, 3), (1, 6, 3)),
+    ((3,), (5,)),
+])
+def test_iter_blocks_covers_each_index_once(shape, block):
+    seen = numpy.zeros(shape, dtype=int)
+    for index in iter_blocks(shape, block):
+        assert all(part.stop - part.start <= size for part, size in zip(index, block))
+        seen[index] += 1
+    assert (seen == 1).all()
+
+
+def _sample(dtype):
+    rng = numpy.random.RandomState(0)
+    values = rng.randint(0, 100, size=(6, 5, 4)).astype(dtype)
+    mask = rng.rand(6, 5, 4) < 0.2
+    # A row where every value is missing, so reductions along it are masked
+    mask[:, 2, :] = True
+    return numpy.ma.array(values, mask=mask)
+
+
+@pytest.mark.parametrize('dtype', ['int16', 'int64', 'uint8', 'float32', 'float64'])
+@pytest.mark.parametrize('op', REDUCTIONS)
+@pytest.mark.parametrize('axis', [None, 0, 1, 2])
+def test_chunked_reduce_matches_numpy(dtype, op, axis):
+    values = _sample(dtype)
+    var = cdms2.createVariable(values, id='v')
+    # A few values a block, so every reduction is merged from several blocks
+    result = chunked_reduce(var, op, axis=axis, max_bytes=3 * values.itemsize)
+    expected = getattr(values, op)(axis=axis)
+    assert numpy.asarray(result).dtype == numpy.asarray(expected).dtype
+    numpy.testing.assert_array_equal(numpy.ma.getmaskarray(result),
+                                     numpy.ma.getmaskarray(expected))
+    assert numpy.ma.allclose(result, expected)
+
+
+def test_chunked_reduce_integers_are_exact():
+    values = numpy.ma.array([[2 ** 62 + 1, 1], [2 ** 62 + 3, 5]], dtype='int64')
+    var = cdms2.createVariable(values, id='v')
+    for op in ('sum', 'min', 'max'):
+        result = chunked_reduce(var, op, axis=0, max_bytes=8)
+        numpy.testing.assert_array_equal(numpy.asarray(result),
+                                         getattr(values, op)(axis=0))
+
+
+def test_chunked_reduce_unknown_op():
+    var = cdms2.createVariable(numpy.ma.zeros((2, 2)), id='v')
+    with pytest.raises(ValueError):
+        chunked_reduce(var, 'median')
@@ -0,0 +1,74 @@
+"""Tests of the axis info and coordinate bounds shown in the sidebar."""
+import numpy
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+cdms2 = pytest.importorskip('cdms2')
+
+from vcdat_kernel import info  # noqa: E402
+
+
+def _axis_info(values, monkeypatch, max_length=10):
+    monkeypatch.setattr(info, 'MAX_DIM_LENGTH', max_length)
+    axis = cdms2.createAxis(numpy.asarray(values, dtype='float64'), id='x')
+    out_axes = {}
+    info.add_axis_info('x', axis, out_axes)
+    return out_axes['x']
+
+
+def test_short_axis_kept_whole(monkeypatch):
+    out = _axis_info([3, 1, 2], monkeypatch)
+    assert out['data'] == [3, 1, 2]
+    assert (out['first'], out['last']) == (1, 3)
+
+
+@pytest.mark.parametrize('length', [11, 19, 20, 28, 100])
+def test_long_axis_sampled(monkeypatch, length):
+    out = _axis_info(range(length), monkeypatch)
+    assert len(out['data']) <= 10
+    assert out['data'][0] == 0
+    assert out['data'][-1] == length - 1
+    assert (out['first'], out['last']) == (0, length - 1)
+
+
+def test_decreasing_axis(monkeypatch):
+    out = _axis_info(range(50, 0, -1), monkeypatch)
+    assert (out['first'], out['last']) == (1, 50)
+
+
+def test_non_monotonic_extremes_outside_sample(monkeypatch):
+    # Monotonic at the sampled indices, with the extremes between them
+    values = numpy.arange(100, dtype='float64')
+    values[5] = -7
+    values[94] = 200
+    out = _axis_info(values, monkeypatch)
+    assert -7 not in out['data'] and 200 not in out['data']
+    assert (out['first'], out['last']) == (-7, 200)
+
+
+def test_empty_axis(monkeypatch):
+    out = _axis_info([], monkeypatch)
+    assert out['data'] == []
+    assert 'first' not in out and 'last' not in out
+
+
+@pytest.mark.parametrize('chunk', [1, 5, 1000])
+def test_coord_bounds_2d(monkeypatch, chunk):
+    monkeypatch.setattr(info, 'BOUNDS_CHUNK_SIZE', chunk)
+    coord = numpy.arange(24, dtype='float64').reshape(4, 6) - 5
+    assert info.coord_bounds(coord) == [-5, 18]
+
+
+def test_coord_bounds_skip_missing_values(monkeypatch):
+    monkeypatch.setattr(info, 'BOUNDS_CHUNK_SIZE', 3)
+    coord = numpy.ma.array([[1e20, 2, 3], [numpy.nan, numpy.nan, numpy.nan],
+                            [-4, 5, numpy.inf]], mask=[[True, False, False],
+                                                       [False, False, False],
+                                                       [False, False, False]])
+    assert info.coord_bounds(coord) == [-4, 5]
+
+
+def test_coord_bounds_all_missing():
+    coord = numpy.full((2, 2), numpy.nan)
+    assert info.coord_bounds(coord) == [None, None]
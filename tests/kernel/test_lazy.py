@@ -0,0 +1,29 @@
+"""Tests of the index arithmetic of lazy variables, against Python's slicing."""
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+pytest.importorskip('cdms2')
+
+from vcdat_kernel.lazy import _as_slice, _compose  # noqa: E402
+
+REGIONS = [(0, 1, 10), (3, 2, 6), (9, 1, 0), (20, -3, 7), (5, 1, 1)]
+KEYS = [slice(None), slice(2, 5), slice(None, None, 2), slice(-3, None),
+        slice(None, None, -1), slice(4, 1, -2), slice(8, 2)]
+
+
+def _indices(region):
+    start, step, count = region
+    return [start + step * number for number in range(count)]
+
+
+@pytest.mark.parametrize('region', REGIONS)
+def test_as_slice(region):
+    assert list(range(100))[_as_slice(region)] == _indices(region)
+
+
+@pytest.mark.parametrize('region', REGIONS)
+@pytest.mark.parametrize('key', KEYS)
+def test_compose(region, key):
+    composed = _compose(region, key)
+    assert _indices(composed) == _indices(region)[key]
@@ -0,0 +1,43 @@
+"""Tests of the subsampling strides offered for loads too big for memory."""
+import numpy
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+pytest.importorskip('cdms2')
+
+from vcdat_kernel.memory import subsample_strides  # noqa: E402
+
+
+def _strided_bytes(shape, itemsize, strides):
+    return itemsize * int(numpy.prod([-(-length // stride)
+                                      for length, stride in zip(shape, strides)]))
+
+
+def test_subsample_strides_fits_already():
+    assert subsample_strides((10, 20), 8, 8 * 200) == [1, 1]
+
+
+@pytest.mark.parametrize('shape, itemsize, target', [
+    ((1000, 1000), 8, 8 * 1000),
+    ((12, 180, 360), 4, 4 * 10000),
+    ((5000,), 8, 8 * 7),
+    ((3, 4000, 10), 8, 8 * 300),
+])
+def test_subsample_strides_fit_target(shape, itemsize, target):
+    strides = subsample_strides(shape, itemsize, target)
+    assert len(strides) == len(shape)
+    assert all(stride >= 1 for stride in strides)
+    assert _strided_bytes(shape, itemsize, strides) <= target
+
+
+def test_subsample_strides_keep_axes_alike():
+    # Square regions are thinned evenly, not one axis down to a single value
+    strides = subsample_strides((1000, 1000), 8, 8 * 10000)
+    assert max(strides) <= 2 * min(strides)
+
+
+def test_subsample_strides_stop_at_one_value():
+    # Nothing fits in less than one value, each axis is thinned to one
+    strides = subsample_strides((4, 6), 8, 1)
+    assert [-(-length // stride) for length, stride in zip((4, 6), strides)] == [1, 1]
@@ -0,0 +1,66 @@
+"""Tests of the on-disk cache of file metadata."""
+import os
+
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+pytest.importorskip('cdms2')
+
+from vcdat_kernel import metadata_cache  # noqa: E402
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    paths = []
+    for number in range(4):
+        path = tmp_path / 'file{}.nc'.format(number)
+        path.write_bytes(b'data')
+        paths.append(str(path))
+    return paths
+
+
+def _entries():
+    return os.listdir(metadata_cache.cache_dir())
+
+
+def test_cached_text_returned(files):
+    assert metadata_cache.cache_get(files[0], 'vars') is None
+    metadata_cache.cache_put(files[0], 'vars', '{"tas": 1}')
+    assert metadata_cache.cache_get(files[0], 'vars') == '{"tas": 1}'
+    # Each kind of info is kept apart
+    assert metadata_cache.cache_get(files[0], 'axes') is None
+
+
+def test_changed_file_misses(files):
+    metadata_cache.cache_put(files[0], 'vars', 'old')
+    with open(files[0], 'wb') as out:
+        out.write(b'more data')
+    assert metadata_cache.cache_get(files[0], 'vars') is None
+
+
+def test_least_recently_used_entry_evicted(files, monkeypatch):
+    monkeypatch.setattr(metadata_cache, 'METADATA_CACHE_MAX_ENTRIES', 2)
+    metadata_cache.cache_put(files[0], 'vars', 'first')
+    metadata_cache.cache_put(files[1], 'vars', 'second')
+    # Written a while ago, in order
+    for number in range(2):
+        entry = os.path.join(metadata_cache.cache_dir(),
+                             metadata_cache._cache_key(files[number], 'vars') + '.json')
+        os.utime(entry, (number, number))
+    # Using the first entry makes the second the least recently used
+    assert metadata_cache.cache_get(files[0], 'vars') == 'first'
+    metadata_cache.cache_put(files[2], 'vars', 'third')
+    assert len(_entries()) == 2
+    assert metadata_cache.cache_get(files[1], 'vars') is None
+    assert metadata_cache.cache_get(files[0], 'vars') == 'first'
+    assert metadata_cache.cache_get(files[2], 'vars') == 'third'
+
+
+def test_unwritable_cache_ignored(files, tmp_path, monkeypatch):
+    blocked = tmp_path / 'blocked'
+    blocked.write_bytes(b'')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(blocked))
+    metadata_cache.cache_put(files[0], 'vars', 'text')
+    assert metadata_cache.cache_get(files[0], 'vars') is None
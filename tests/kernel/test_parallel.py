@@ -0,0 +1,114 @@
+"""Tests of loading variables from several files at once.
+
+The workers run in threads of the test's process, so they use the fake files.
+"""
+import __main__
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+pytest.importorskip('cdms2')
+
+from vcdat_kernel import parallel  # noqa: E402
+
+FILES = {
+    ('a.nc', 'tas'): numpy.ma.array(numpy.arange(6.).reshape(2, 3),
+                                    mask=[[0, 1, 0], [0, 0, 0]]),
+    ('a.nc', 'pr'): numpy.ma.array(numpy.arange(4.)),
+    ('b.nc', 'clt'): numpy.ma.array(numpy.ones((3, 2), dtype='float32')),
+}
+
+
+class FakeLazy(object):
+    """Stands in for a LazyVariable of one of FILES."""
+
+    def __init__(self, path, name, **selection):
+        if (path, name) not in FILES:
+            raise IOError('{} has no variable {}'.format(path, name))
+        self.values = FILES[path, name]
+        self.shape = self.values.shape
+        self.attributes = {'units': 'K'}
+
+    def getAxisList(self):
+        return None
+
+    def load(self):
+        return self.values.copy()
+
+
+class FakeExecutor(ThreadPoolExecutor):
+    def shutdown(self, wait=True, **kwargs):
+        FakeExecutor.stopped = True
+        super(FakeExecutor, self).shutdown(wait, **kwargs)
+
+
+@pytest.fixture
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(parallel, 'LazyVariable', FakeLazy)
+    monkeypatch.setattr(parallel, '_spill_dir', lambda: str(tmp_path))
+    FakeExecutor.stopped = False
+    monkeypatch.setattr(parallel, '_workers', [FakeExecutor(2), 0])
+    for alias in ('x', 'y', 'z'):
+        monkeypatch.delattr(__main__, alias, raising=False)
+    yield str(tmp_path)
+    if parallel._workers[0] is not None:
+        parallel._workers[0].shutdown()
+
+
+def _check_loaded(loads):
+    for alias, path, name in loads:
+        values = FILES[path, name]
+        loaded = getattr(__main__, alias)
+        numpy.testing.assert_array_equal(numpy.ma.getdata(loaded), numpy.ma.getdata(values))
+        numpy.testing.assert_array_equal(numpy.ma.getmaskarray(loaded),
+                                         numpy.ma.getmaskarray(values))
+        assert numpy.asarray(loaded).dtype == values.dtype
+
+
+def _load(loads):
+    parallel.load_variables([(alias, path, name, {}) for alias, path, name in loads])
+
+
+LOADS = [('x', 'a.nc', 'tas'), ('y', 'b.nc', 'clt'), ('z', 'a.nc', 'pr')]
+
+
+def test_files_loaded_by_workers(spill_dir):
+    _load(LOADS)
+    _check_loaded(LOADS)
+    # The spilled values were mapped and their files removed
+    assert os.listdir(spill_dir) == []
+
+
+def test_values_sent_through_pool_without_spill_dir(spill_dir, monkeypatch):
+    monkeypatch.setattr(parallel, '_spill_dir', lambda: None)
+    _load(LOADS)
+    _check_loaded(LOADS)
+
+
+def test_one_file_loaded_without_workers(spill_dir, monkeypatch):
+    monkeypatch.setattr(parallel, '_workers', [None, 0])
+    monkeypatch.setattr(parallel, '_executor', None)
+    loads = [('x', 'a.nc', 'tas'), ('z', 'a.nc', 'pr')]
+    _load(loads)
+    _check_loaded(loads)
+
+
+def test_failed_load_assigns_nothing(spill_dir):
+    with pytest.raises(IOError):
+        _load([('x', 'a.nc', 'tas'), ('y', 'b.nc', 'missing')])
+    assert not hasattr(__main__, 'x') and not hasattr(__main__, 'y')
+    assert os.listdir(spill_dir) == []
+
+
+def test_idle_workers_stopped(spill_dir):
+    _load(LOADS)
+    last_used = parallel._workers[1]
+    parallel.close_idle_workers(now=last_used + 1)
+    assert not FakeExecutor.stopped
+    parallel.close_idle_workers(now=last_used + parallel.LOAD_WORKER_IDLE_SECONDS + 1)
+    assert FakeExecutor.stopped
+    assert parallel._workers[0] is None
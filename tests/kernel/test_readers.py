@@ -0,0 +1,70 @@
+"""Tests of the pool of open file readers."""
+import os
+
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+pytest.importorskip('cdms2')
+
+from vcdat_kernel import readers  # noqa: E402
+
+
+class FakeReader(object):
+    """Stands in for an open cdms2 file, recording whether it was closed."""
+    opened = []
+
+    def __init__(self, path):
+        self.path = path
+        self.closed = False
+        FakeReader.opened.append(self)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    FakeReader.opened = []
+    monkeypatch.setattr(readers.cdms2, 'open', FakeReader)
+    monkeypatch.setattr(readers, 'READER_POOL_SIZE', 3)
+    readers.close_readers()
+    paths = []
+    for number in range(5):
+        path = tmp_path / 'file{}.nc'.format(number)
+        path.write_bytes(b'')
+        paths.append(str(path))
+    yield paths
+    readers.close_readers()
+
+
+def test_reader_reused(pool):
+    assert readers.get_reader(pool[0]) is readers.get_reader(pool[0])
+    assert len(FakeReader.opened) == 1
+
+
+def test_least_recently_used_reader_closed(pool):
+    first, second, third = [readers.get_reader(path) for path in pool[:3]]
+    # Using the first file again makes the second the least recently used
+    readers.get_reader(pool[0])
+    fourth = readers.get_reader(pool[3])
+    assert second.closed
+    assert not first.closed and not third.closed and not fourth.closed
+    assert list(readers._readers) == [os.path.abspath(path) for path in
+                                      (pool[2], pool[0], pool[3])]
+
+
+def test_changed_file_reopened(pool):
+    reader = readers.get_reader(pool[0])
+    with open(pool[0], 'wb') as out:
+        out.write(b'changed')
+    assert readers.get_reader(pool[0]) is not reader
+    assert reader.closed
+
+
+def test_idle_readers_closed(pool):
+    reader = readers.get_reader(pool[0])
+    readers.close_idle_readers(now=readers._readers[os.path.abspath(pool[0])][2]
+                               + readers.READER_IDLE_SECONDS + 1)
+    assert reader.closed
+    assert not readers._readers
@@ -0,0 +1,98 @@
+"""Tests of the slab cache shared by the kernels on a node."""
+import os
+
+import numpy
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+pytest.importorskip('cdms2')
+
+from vcdat_kernel import shared  # noqa: E402
+
+
+class FakeLazy(object):
+    """Stands in for a LazyVariable of a file, counting how often it's read."""
+    values = None
+    dtype = None
+    loads = 0
+
+    def __init__(self, path, name, **selection):
+        self.path = path
+        self.name = name
+        self.regions = [(0, 1, length) for length in FakeLazy.values.shape]
+        self.shape = FakeLazy.values.shape
+        self.dtype = FakeLazy.dtype or FakeLazy.values.dtype
+        self.attributes = {'units': 'K'}
+
+    def getAxisList(self):
+        return None
+
+    def load(self):
+        FakeLazy.loads += 1
+        return FakeLazy.values.copy()
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    FakeLazy.values = numpy.ma.arange(12, dtype='float64').reshape(3, 4)
+    FakeLazy.dtype = None
+    FakeLazy.loads = 0
+    monkeypatch.setattr(shared, 'LazyVariable', FakeLazy)
+    cache = tmp_path / 'cache'
+    monkeypatch.setenv('VCDAT_SHARED_CACHE_DIR', str(cache))
+    path = tmp_path / 'data.nc'
+    path.write_bytes(b'version 1')
+    return str(path)
+
+
+def _slabs():
+    return sorted(os.listdir(shared.cache_dir()))
+
+
+def test_slab_read_once(source):
+    first = shared.shared_variable(source, 'tas')
+    second = shared.shared_variable(source, 'tas')
+    assert FakeLazy.loads == 1
+    numpy.testing.assert_array_equal(first, FakeLazy.values)
+    numpy.testing.assert_array_equal(second, FakeLazy.values)
+    assert not numpy.asarray(second).flags.writeable
+
+
+def test_changed_file_read_again(source):
+    shared.shared_variable(source, 'tas')
+    with open(source, 'wb') as out:
+        out.write(b'version 2, longer')
+    shared.shared_variable(source, 'tas')
+    assert FakeLazy.loads == 2
+
+
+def test_masked_slab_keeps_mask(source):
+    FakeLazy.values[1, 2] = numpy.ma.masked
+    shared.shared_variable(source, 'tas')
+    slab = shared.shared_variable(source, 'tas')
+    assert FakeLazy.loads == 1
+    assert [name.split('.', 1)[1] for name in _slabs()] == ['mask.npy', 'masked.npy']
+    numpy.testing.assert_array_equal(numpy.ma.getmaskarray(slab),
+                                     numpy.ma.getmaskarray(FakeLazy.values))
+
+
+def test_slab_with_other_dtype_reused(source):
+    # A file variable may be read with a dtype other than the one it declares
+    FakeLazy.dtype = numpy.dtype('float32')
+    shared.shared_variable(source, 'tas')
+    slab = shared.shared_variable(source, 'tas')
+    assert FakeLazy.loads == 1
+    assert numpy.asarray(slab).dtype == numpy.dtype('float64')
+
+
+def test_slabs_evicted_past_limit(source, monkeypatch):
+    shared.shared_variable(source, 'tas')
+    # Room for two slabs like the first, with their .npy headers
+    slab_bytes = os.path.getsize(os.path.join(shared.cache_dir(), _slabs()[0]))
+    monkeypatch.setattr(shared, 'SHARED_CACHE_MAX_BYTES', 2 * slab_bytes)
+    shared.shared_variable(source, 'pr')
+    first = _slabs()
+    shared.shared_variable(source, 'ts')
+    assert len(_slabs()) == 2
+    assert first[0] not in _slabs() or first[1] not in _slabs()
@@ -0,0 +1,74 @@
+"""Tests of the notebook variable changes sent to the sidebar."""
+import __main__
+
+import numpy
+import pytest
+
+# Importing vcdat_kernel imports CDAT
+pytest.importorskip('vcs')
+cdms2 = pytest.importorskip('cdms2')
+
+from vcdat_kernel import sidebar  # noqa: E402
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Clears the notebook's variables, and records the variables scanned."""
+    scanned = []
+
+    def add_var_info(name, var, out_vars, grid_bounds):
+        scanned.append(name)
+        out_vars[name] = {'shape': var.shape}
+
+    for name, obj in list(__main__.__dict__.items()):
+        if isinstance(obj, cdms2.MV2.TransientVariable):
+            monkeypatch.delattr(__main__, name)
+    monkeypatch.setattr(sidebar, 'add_var_info', add_var_info)
+    monkeypatch.setattr(sidebar, '_var_state', None)
+    return scanned
+
+
+def _variable(shape):
+    return cdms2.createVariable(numpy.zeros(shape), id='v')
+
+
+def test_first_refresh_is_full(scans, monkeypatch):
+    monkeypatch.setattr(__main__, 'tas', _variable((2, 3)), raising=False)
+    out = sidebar.refresh_variables(None)
+    assert out['full']
+    assert out['changed'] == {'tas': {'shape': (2, 3)}}
+    assert scans == ['tas']
+
+
+def test_unchanged_variables_not_scanned_again(scans, monkeypatch):
+    monkeypatch.setattr(__main__, 'tas', _variable((2, 3)), raising=False)
+    token = sidebar.refresh_variables(None)['token']
+    out = sidebar.refresh_variables(token)
+    assert not out['full']
+    assert out['changed'] == {} and out['removed'] == []
+    assert scans == ['tas']
+
+
+def test_changes_since_token(scans, monkeypatch):
+    monkeypatch.setattr(__main__, 'tas', _variable((2, 3)), raising=False)
+    monkeypatch.setattr(__main__, 'pr', _variable((4,)), raising=False)
+    token = sidebar.refresh_variables(None)['token']
+    # Reassigned, added and removed variables
+    monkeypatch.setattr(__main__, 'tas', _variable((5, 3)))
+    monkeypatch.setattr(__main__, 'clt', _variable((1,)), raising=False)
+    monkeypatch.delattr(__main__, 'pr')
+    out = sidebar.refresh_variables(token)
+    assert not out['full']
+    assert sorted(out['changed']) == ['clt', 'tas']
+    assert out['changed']['tas'] == {'shape': (5, 3)}
+    assert out['removed'] == ['pr']
+    assert scans == ['tas', 'pr', 'tas', 'clt']
+
+
+def test_stale_token_gets_everything_without_scanning(scans, monkeypatch):
+    monkeypatch.setattr(__main__, 'tas', _variable((2, 3)), raising=False)
+    sidebar.refresh_variables(None)
+    out = sidebar.refresh_variables('an older token')
+    assert out['full']
+    assert sorted(out['changed']) == ['tas']
+    assert scans == ['tas']
@@ -0,0 +1,52 @@
+"""Kernel side of jupyter-vcdat.
+
+The sidebar calls these functions in the notebook's kernel, so its requests
+are short calls instead of the source of the functions.
+"""
+from .catalog import aggregate_files, catalog_directory, catalog_search
+from .channel import send_data
+from .chunked import chunked_reduce
+from .exports import export_info, report_export
+from .files import file_axes_info, file_opens, refresh_axes_info, scan_file
+from .info import variable_axes_info
+from .lazy import LazyVariable, lazy_variable, plot_data
+from .memory import available_memory, estimate_load, write_data
+from .parallel import load_variables
+from .preview import full_resolution, preview_data, preview_variable
+from .readers import close_readers, get_reader, read_variable
+from .shared import shared_variable
+from .sidebar import (element_list, install_push_hook, refresh_variables,
+                      sidebar_snapshot)
+
+__all__ = [
+    'LazyVariable',
+    'aggregate_files',
+    'available_memory',
+    'catalog_directory',
+    'catalog_search',
+    'chunked_reduce',
+    'close_readers',
+    'element_list',
+    'estimate_load',
+    'export_info',
+    'file_axes_info',
+    'file_opens',
+    'full_resolution',
+    'get_reader',
+    'install_push_hook',
+    'lazy_variable',
+    'load_variables',
+    'plot_data',
+    'preview_data',
+    'preview_variable',
+    'read_variable',
+    'refresh_axes_info',
+    'refresh_variables',
+    'report_export',
+    'scan_file',
+    'send_data',
+    'shared_variable',
+    'sidebar_snapshot',
+    'variable_axes_info',
+    'write_data',
+]
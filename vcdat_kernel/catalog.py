@@ -0,0 +1,203 @@
+"""A SQLite index of the variables and axes in the data files of a directory tree."""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import sqlite3
+import subprocess
+
+import cdms2
+import cdtime
+
+from .constants import CATALOG_SEARCH_LIMIT
+from .metadata_cache import cache_dir
+
+
+def _connect():
+    db = sqlite3.connect(os.path.join(os.path.dirname(cache_dir()),
+                                      'catalog.sqlite'))
+    db.create_function('basename', 1, os.path.basename)
+    db.execute('CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL, size INTEGER, error TEXT)')
+    db.execute('CREATE TABLE IF NOT EXISTS variables (path TEXT, name TEXT, long_name TEXT, units TEXT, shape TEXT, axes TEXT, grid TEXT, time_start TEXT, time_end TEXT)')
+    db.execute('CREATE TABLE IF NOT EXISTS axes (path TEXT, name TEXT, length INTEGER, units TEXT)')
+    db.execute('CREATE INDEX IF NOT EXISTS variables_path ON variables (path)')
+    db.execute('CREATE INDEX IF NOT EXISTS axes_path ON axes (path)')
+    return db
+
+
+def _prefix(directory):
+    return os.path.join(os.path.abspath(directory), '')
+
+
+def scan_header(path):
+    """Reads the variables and axes of a file, without reading any data."""
+    entry = {'path': path, 'variables': [], 'axes': [], 'error': None}
+    try:
+        reader = cdms2.open(path)
+    except Exception as error:
+        entry['error'] = str(error)
+        return entry
+    try:
+        for name, axis in reader.axes.items():
+            entry['axes'].append((name, len(axis), getattr(axis, 'units', '')))
+        for name, var in reader.variables.items():
+            grid = var.getGrid()
+            time = var.getTime()
+            start = None
+            end = None
+            if time is not None and len(time) > 0:
+                try:
+                    start = str(cdtime.reltime(float(time[0]), time.units)
+                                .tocomp(time.getCalendar()))
+                    end = str(cdtime.reltime(float(time[len(time) - 1]), time.units)
+                              .tocomp(time.getCalendar()))
+                except Exception:
+                    pass
+            entry['variables'].append((
+                name,
+                getattr(var, 'long_name', name),
+                getattr(var, 'units', ''),
+                json.dumps(list(var.shape)),
+                json.dumps(var.getAxisIds()),
+                type(grid).__name__ if grid is not None else None,
+                start,
+                end
+            ))
+    except Exception as error:
+        entry['error'] = str(error)
+    finally:
+        reader.close()
+    return entry
+
+
+def catalog_directory(directory, extensions):
+    """Adds new and modified files in a directory tree to the catalog and drops deleted ones.
+
+    Headers of changed files are scanned in a process pool, whose workers are
+    started the same way as the parallel load's, never by forking the kernel.
+    """
+    prefix = _prefix(directory)
+    db = _connect()
+    known = {}
+    for path, mtime, size in db.execute(
+            'SELECT path, mtime, size FROM files WHERE substr(path, 1, ?) = ?',
+            (len(prefix), prefix)):
+        known[path] = (mtime, size)
+    found = {}
+    for root, dirs, files in os.walk(prefix):
+        dirs[:] = [name for name in dirs if not name.startswith('.')]
+        for name in files:
+            if os.path.splitext(name)[1].lower() not in extensions:
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            found[path] = (stat.st_mtime, stat.st_size)
+    changed = [path for path in found if known.get(path) != found[path]]
+    removed = [path for path in known if path not in found]
+    entries = None
+    if len(changed) > 1:
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+            from .parallel import get_context
+            workers = min(len(changed), os.cpu_count() or 1)
+            with ProcessPoolExecutor(workers, mp_context=get_context()) as pool:
+                entries = list(pool.map(
+                    scan_header, changed,
+                    chunksize=max(1, len(changed) // (workers * 4))))
+        except Exception:
+            entries = None
+    if entries is None:
+        entries = [scan_header(path) for path in changed]
+    for path in removed + changed:
+        db.execute('DELETE FROM files WHERE path = ?', (path,))
+        db.execute('DELETE FROM variables WHERE path = ?', (path,))
+        db.execute('DELETE FROM axes WHERE path = ?', (path,))
+    for entry in entries:
+        path = entry['path']
+        db.execute('INSERT INTO files VALUES (?, ?, ?, ?)',
+                   (path, found[path][0], found[path][1], entry['error']))
+        db.executemany('INSERT INTO variables VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                       [(path,) + row for row in entry['variables']])
+        db.executemany('INSERT INTO axes VALUES (?, ?, ?, ?)',
+                       [(path,) + row for row in entry['axes']])
+    db.commit()
+    db.close()
+    return {
+        'directory': prefix,
+        'files': len(found),
+        'scanned': len(changed),
+        'removed': len(removed),
+        'errors': len([entry for entry in entries if entry['error']])
+    }
+
+
+def catalog_search(directory, query):
+    """Searches the catalog for variables in a directory tree by name, long name or file name.
+
+    The directories above a file aren't searched, every file in the tree shares them.
+    """
+    prefix = _prefix(directory)
+    # The query is matched literally, so % and _ in it aren't wildcards
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    pattern = '%' + escaped + '%'
+    db = _connect()
+    rows = db.execute(
+        'SELECT path, name, long_name, units, shape, grid, time_start, time_end FROM variables '
+        "WHERE substr(path, 1, ?) = ? AND (name LIKE ? ESCAPE '\\' "
+        "OR long_name LIKE ? ESCAPE '\\' OR basename(path) LIKE ? ESCAPE '\\') "
+        'ORDER BY path, name LIMIT ?',
+        (len(prefix), prefix, pattern, pattern, pattern, CATALOG_SEARCH_LIMIT)).fetchall()
+    db.close()
+    return [{
+        'path': path,
+        'name': name,
+        'longName': long_name,
+        'units': units,
+        'shape': json.loads(shape),
+        'grid': grid,
+        'timeStart': time_start,
+        'timeEnd': time_end
+    } for path, name, long_name, units, shape, grid, time_start, time_end in rows]
+
+
+def aggregate_files(paths):
+    """Combines files split along time into one dataset, using cdscan to write a CDML (XML) file.
+
+    The CDML maps each time range to the file holding it, so reading a time
+    range only opens the files that overlap it. It's reused until one of the
+    files changes.
+    """
+    paths = sorted(os.path.abspath(path) for path in paths)
+    missing = [path for path in paths if not os.path.isfile(path)]
+    if missing:
+        return {'error': {'ename': 'Notice',
+                          'evalue': 'These files could not be found: ' + ', '.join(missing)}}
+    out_dir = os.path.join(os.path.dirname(cache_dir()), 'timeseries')
+    if not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    key = hashlib.sha1('|'.join(paths).encode('utf-8')).hexdigest()
+    xml_path = os.path.join(out_dir, key + '.xml')
+    newest = max(os.path.getmtime(path) for path in paths)
+    if os.path.isfile(xml_path) and os.path.getmtime(xml_path) >= newest:
+        return {'path': xml_path, 'files': len(paths)}
+    cdscan = shutil.which('cdscan') or os.path.join(
+        os.path.dirname(sys.executable), 'cdscan')
+    tmp_path = '{}.{}.tmp.xml'.format(xml_path[:-4], os.getpid())
+    try:
+        scan = subprocess.run([cdscan, '-x', tmp_path] + paths,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              universal_newlines=True)
+    except OSError as error:
+        return {'error': {'ename': 'Notice',
+                          'evalue': 'cdscan could not be run: {}'.format(error)}}
+    if scan.returncode != 0 or not os.path.isfile(tmp_path):
+        lines = [line for line in scan.stderr.splitlines() if line.strip()]
+        reason = lines[-1] if lines else 'cdscan exited with code {}'.format(scan.returncode)
+        return {'error': {'ename': 'Notice',
+                          'evalue': 'The files could not be combined: ' + reason}}
+    os.replace(tmp_path, xml_path)
+    return {'path': xml_path, 'files': len(paths)}
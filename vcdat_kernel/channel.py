@@ -0,0 +1,44 @@
+"""Sends results to the frontend over the data channel comm."""
+import json
+import numbers
+
+import numpy
+
+from .constants import DATA_CHANNEL_MIN_BUFFER
+
+
+def encode(obj, buffers):
+    """Replaces long numeric lists and 1D arrays in obj with placeholders.
+
+    The values are appended to buffers as float64 bytes, and each placeholder
+    holds the index of its buffer.
+    """
+    if isinstance(obj, dict):
+        return {key: encode(value, buffers) for key, value in obj.items()}
+    if isinstance(obj, numpy.ndarray) and obj.ndim == 1 and obj.dtype.kind in 'iuf':
+        obj = obj.tolist()
+    if isinstance(obj, (list, tuple)):
+        if (len(obj) >= DATA_CHANNEL_MIN_BUFFER
+                and all(isinstance(value, numbers.Real) and not isinstance(value, bool)
+                        for value in obj)):
+            buffers.append(numpy.asarray(obj, dtype='<f8').tobytes())
+            return {'vcdatBuffer': len(buffers) - 1}
+        return [encode(value, buffers) for value in obj]
+    return obj
+
+
+def send_data(obj, request_id, target):
+    """Sends obj to the frontend with the request's id and returns None.
+
+    If comms aren't available, returns obj as a JSON string instead.
+    """
+    try:
+        from ipykernel.comm import Comm
+    except ImportError:
+        return json.dumps(obj)
+    buffers = []
+    payload = encode(obj, buffers)
+    Comm(target_name=target,
+         data={'requestId': request_id, 'payload': payload},
+         buffers=buffers).close()
+    return None
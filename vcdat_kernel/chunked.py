@@ -0,0 +1,132 @@
+"""Reductions that read a variable a block at a time, so variables larger than
+the kernel's memory can be reduced."""
+import itertools
+import operator
+
+import numpy
+import cdms2
+
+from .constants import CHUNK_MAX_BYTES
+
+REDUCTIONS = ('sum', 'mean', 'min', 'max', 'std')
+
+
+def block_shape(shape, itemsize, max_bytes):
+    """Returns the shape of the largest block of a variable within max_bytes.
+
+    The leading axes are split first, so each block is a run of whole slabs
+    of the trailing axes, the order values are stored in the file.
+    """
+    block = [max(1, length) for length in shape]
+    for index in range(len(block)):
+        if itemsize * int(numpy.prod(block)) <= max_bytes:
+            break
+        rest = itemsize * int(numpy.prod(block[index + 1:]))
+        block[index] = max(1, min(block[index], max_bytes // rest))
+    return block
+
+
+def iter_blocks(shape, block):
+    """Yields the index slices of each block of a shape, in order."""
+    starts = [range(0, length, size) for length, size in zip(shape, block)]
+    for corner in itertools.product(*starts):
+        yield tuple(slice(start, min(start + size, length))
+                    for start, size, length in zip(corner, block, shape))
+
+
+def axis_index(var, axis):
+    """Converts an axis given by index, id or generic name like 'time' or
+    '(time)' to its index in var."""
+    if isinstance(axis, str):
+        index = var.getAxisIndex(axis.strip('()'))
+        if index < 0:
+            raise cdms2.CDMSError('{} has no axis {}'.format(var.id, axis))
+        return index
+    index = operator.index(axis)
+    rank = len(var.shape)
+    if not -rank <= index < rank:
+        raise cdms2.CDMSError('axis {} is out of range for a variable of rank {}'
+                              .format(axis, rank))
+    return index % rank
+
+
+def chunked_reduce(var, op, axis=None, max_bytes=CHUNK_MAX_BYTES):
+    """Reduces a variable over one axis, or all of them if axis is None.
+
+    op is one of REDUCTIONS. The variable is read a block of at most
+    max_bytes at a time, so only the blocks and the result are ever in
+    memory. Missing values are skipped, and the result is masked where
+    every value was missing. Returns a TransientVariable with the axes
+    that are left, or a scalar. Results have the dtype numpy's masked
+    reductions give, and integer sums, minima and maxima are exact.
+    """
+    if op not in REDUCTIONS:
+        raise ValueError('Unknown reduction {}, expected one of {}'
+                         .format(op, ', '.join(REDUCTIONS)))
+    shape = tuple(var.shape)
+    if axis is None:
+        reduced = tuple(range(len(shape)))
+    else:
+        reduced = (axis_index(var, axis),)
+    kept = [index for index in range(len(shape)) if index not in reduced]
+    out_shape = tuple(shape[index] for index in kept)
+    count = numpy.zeros(out_shape, dtype=numpy.int64)
+    dtype = numpy.dtype(var.dtype)
+    # Integers are reduced as integers, so large values don't lose precision as floats
+    if op == 'sum' and dtype.kind in 'biu':
+        exact = numpy.sum(numpy.zeros(1, dtype=dtype)).dtype
+        low = high = 0
+    elif op in ('min', 'max') and dtype.kind in 'iu':
+        exact = dtype
+        low, high = numpy.iinfo(dtype).min, numpy.iinfo(dtype).max
+    else:
+        exact = None
+        low, high = -numpy.inf, numpy.inf
+    if op == 'min':
+        total = numpy.full(out_shape, high, dtype=exact)
+    elif op == 'max':
+        total = numpy.full(out_shape, low, dtype=exact)
+    else:
+        total = numpy.zeros(out_shape, dtype=exact)
+    # Sum of squared deviations from the mean, merged between blocks for the std
+    squares = numpy.zeros(out_shape) if op == 'std' else None
+    for block in iter_blocks(shape, block_shape(shape, dtype.itemsize, max_bytes)):
+        values = numpy.ma.asarray(var[block])
+        if exact is None:
+            values = numpy.ma.masked_invalid(values.astype(numpy.float64))
+        target = tuple(block[index] for index in kept)
+        block_count = numpy.asarray(values.count(axis=reduced))
+        if op == 'min':
+            total[target] = numpy.minimum(
+                total[target], numpy.ma.filled(values.min(axis=reduced), high))
+        elif op == 'max':
+            total[target] = numpy.maximum(
+                total[target], numpy.ma.filled(values.max(axis=reduced), low))
+        elif op == 'std':
+            # Merges the block's mean and squared deviations into the totals (Chan et al.)
+            block_sum = numpy.ma.filled(values.sum(axis=reduced, keepdims=True), 0.0)
+            block_mean = block_sum / numpy.maximum(
+                values.count(axis=reduced, keepdims=True), 1)
+            block_squares = numpy.ma.filled(
+                ((values - block_mean) ** 2).sum(axis=reduced), 0.0)
+            block_mean = block_mean.reshape(block_count.shape)
+            seen = count[target]
+            merged = numpy.maximum(seen + block_count, 1)
+            delta = block_mean - total[target]
+            total[target] += delta * block_count / merged
+            squares[target] += block_squares + delta ** 2 * seen * block_count / merged
+        else:
+            total[target] += numpy.ma.filled(values.sum(axis=reduced, dtype=exact), 0)
+        count[target] += block_count
+    if op == 'mean':
+        total = total / numpy.maximum(count, 1)
+    elif op == 'std':
+        total = numpy.sqrt(squares / numpy.maximum(count, 1))
+    if op in ('min', 'max') or (op == 'sum' and dtype.kind == 'f'):
+        # Where every value was missing the total is an infinity, which is masked
+        total = numpy.where(count == 0, 0, total).astype(dtype)
+    result = numpy.ma.array(total, mask=count == 0)
+    if not kept:
+        return result[()]
+    return cdms2.createVariable(result, axes=[var.getAxis(index) for index in kept],
+                                id=var.id, attributes=dict(var.attributes))
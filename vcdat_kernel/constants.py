@@ -0,0 +1,36 @@
+# Tuning values for the kernel side of vcdat
+
+# Axes longer than this are sent as an evenly strided sample
+MAX_DIM_LENGTH = 1000
+
+# Values read at a time when finding lon/lat bounds
+BOUNDS_CHUNK_SIZE = 1048576
+
+# Limits of the on-disk file metadata cache, 100 MB and 500 entries
+METADATA_CACHE_MAX_BYTES = 104857600
+METADATA_CACHE_MAX_ENTRIES = 500
+
+# Most variables returned by one catalog search
+CATALOG_SEARCH_LIMIT = 200
+
+# Numeric lists at least this long are sent over the data channel as binary
+DATA_CHANNEL_MIN_BUFFER = 16
+
+# Loads bigger than this share of the kernel's available memory offer to
+# subsample or load lazily, leaving room for masks and copies
+LOAD_MEMORY_FRACTION = 0.5
+
+# Largest block of a variable read at a time when reducing it chunk by chunk, 64 MB
+CHUNK_MAX_BYTES = 67108864
+
+# Files kept open by the reader pool, and seconds an unused file stays open
+READER_POOL_SIZE = 8
+READER_IDLE_SECONDS = 300
+
+# Most bytes of slabs kept in the shared slab cache of a node, 4 GB
+SHARED_CACHE_MAX_BYTES = 4294967296
+
+# Worker processes reading files in parallel for multi-file loads, and
+# seconds they're kept after the last load
+LOAD_WORKERS = 4
+LOAD_WORKER_IDLE_SECONDS = 300
@@ -0,0 +1,46 @@
+"""Reports exported files as soon as the code that writes them has finished."""
+import contextlib
+import os
+import time
+
+from .channel import send_data
+
+
+def export_info(filename, since=None):
+    """Returns the path and byte size of an exported file in the working directory.
+
+    If the file is missing, or was last written before since, an error is
+    returned instead.
+    """
+    path = os.path.join(os.getcwd(), filename)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {'path': path, 'error': 'The file was not written.'}
+    # Allow for file systems that store modification times in whole seconds
+    if since is not None and stat.st_mtime < since - 1:
+        return {'path': path, 'error': 'The file was not updated.'}
+    return {'path': path, 'size': stat.st_size}
+
+
+@contextlib.contextmanager
+def report_export(filename, request_id, target):
+    """Sends the export_info of filename over a comm once the block that
+    writes it ends, so the report belongs to that block whatever else runs.
+
+    The info also has the time the block took in elapsedMs, and the block's
+    error if it failed, which is raised again after the info is sent.
+    """
+    started = time.time()
+    error = None
+    try:
+        yield
+    except Exception as failure:
+        error = failure
+        raise
+    finally:
+        out = export_info(filename, started)
+        out['elapsedMs'] = (time.time() - started) * 1000
+        if error is not None:
+            out['error'] = str(error)
+        send_data(out, request_id, target)
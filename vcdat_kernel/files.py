@@ -0,0 +1,102 @@
+"""Reads the variables and axes of data files, through the metadata cache."""
+import os
+import json
+
+import __main__
+
+from .info import add_axis_info, add_axis_summary, add_var_info, variable_axes_info
+from .metadata_cache import cache_get, cache_put
+from .readers import get_reader
+
+OPEN_ERROR = {
+    'ename': 'Notice',
+    'evalue': 'The file could not be opened. Check the path is valid.'
+}
+
+
+def file_opens(path):
+    """Returns whether cdms2 can open the file. The reader is kept in the pool
+    for the load that usually follows."""
+    try:
+        get_reader(path)
+        return True
+    except Exception:
+        return False
+
+
+def scan_file(path):
+    """Returns the info of the variables in a file and a summary of its axes.
+
+    The axis values aren't read, file_axes_info gets them when they're needed.
+    The pythonID of each variable belongs to this kernel's reader, so it isn't
+    cached and is set again after the info is read from the cache.
+    """
+    try:
+        reader = get_reader(path)
+    except Exception:
+        return {'error': OPEN_ERROR}
+    out_json = cache_get(path, 'vars')
+    if out_json is None:
+        out_vars = {}
+        grid_bounds = {}
+        for vname in reader.variables:
+            add_var_info(vname, reader.variables[vname], out_vars, grid_bounds)
+            out_vars[vname].pop('pythonID')
+        out_axes = {}
+        for aname in reader.axes:
+            add_axis_summary(aname, reader.axes[aname], out_axes)
+        out_json = json.dumps({'vars': out_vars, 'axes': out_axes})
+        cache_put(path, 'vars', out_json)
+    out = json.loads(out_json)
+    for vname, info in out['vars'].items():
+        if vname in reader.variables:
+            info['pythonID'] = id(reader.variables[vname])
+    return out
+
+
+def file_axes_info(path, names=None):
+    """Returns the full info of axes in a file, or of all its axes if names is None.
+
+    Each axis is cached on disk separately, so the file is only read for axes
+    not seen before.
+    """
+    reader = None
+    out_axes = {}
+    try:
+        if names is None:
+            out_json = cache_get(path, 'vars')
+            if out_json is not None:
+                names = list(json.loads(out_json)['axes'])
+            else:
+                reader = get_reader(path)
+                names = list(reader.axes)
+        for aname in names:
+            out_json = cache_get(path, 'axis:' + aname)
+            if out_json is not None:
+                out_axes[aname] = json.loads(out_json)
+                continue
+            if reader is None:
+                reader = get_reader(path)
+            if aname not in reader.axes:
+                continue
+            add_axis_info(aname, reader.axes[aname], out_axes)
+            cache_put(path, 'axis:' + aname, json.dumps(out_axes[aname]))
+    except Exception:
+        out_axes = {'error': OPEN_ERROR}
+    return out_axes
+
+
+def refresh_axes_info(files, names):
+    """Returns the axis info needed after a variable refresh.
+
+    files maps file paths to the axes needed from them, and names lists the
+    notebook variables (with no file) that need their axis info.
+    """
+    out = {'files': {}, 'variables': {}}
+    for path, axis_names in files.items():
+        out['files'][path] = file_axes_info(path, axis_names)
+    for name in names:
+        if name in __main__.__dict__:
+            out['variables'][name] = variable_axes_info(__main__.__dict__[name])
+    return out
+
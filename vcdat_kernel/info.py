@@ -0,0 +1,149 @@
+"""Describes variables and axes in the form the sidebar shows them."""
+import numpy
+import cdms2
+
+from .constants import BOUNDS_CHUNK_SIZE, MAX_DIM_LENGTH
+from .preview import preview_info
+
+
+def coord_bounds(coord):
+    """Finds the [min, max] of a coordinate, a chunk of rows at a time so
+    large 2D coordinates aren't read all at once."""
+    rows = coord.shape[0] if len(coord.shape) > 0 else 1
+    row_size = max(1, int(numpy.prod(coord.shape[1:])))
+    step = max(1, BOUNDS_CHUNK_SIZE // row_size)
+    low = None
+    high = None
+    for start in range(0, rows, step):
+        chunk = numpy.ma.masked_invalid(
+            numpy.ma.asarray(coord[start:start + step]))
+        if chunk.count() == 0:
+            continue
+        low = float(chunk.min()) if low is None else min(low, float(chunk.min()))
+        high = float(chunk.max()) if high is None else max(high, float(chunk.max()))
+    return [low, high]
+
+
+def add_var_info(vname, var, out_vars, grid_bounds):
+    """Adds the info of a variable to out_vars.
+
+    grid_bounds caches the lon/lat bounds of each grid, so variables on the
+    same grid only compute them once.
+    """
+    # Get a displayable name for the variable
+    if hasattr(var, 'long_name'):
+        name = var.long_name
+    elif hasattr(var, 'title'):
+        name = var.title
+    elif hasattr(var, 'id'):
+        name = var.id
+    else:
+        name = vname
+    if hasattr(var, 'units'):
+        units = var.units
+    else:
+        units = 'Unknown'
+    axis_list = [axis.id for axis in var.getAxisList()]
+    lon_lat = None
+    if (var.getLongitude() and var.getLatitude()
+            and not isinstance(var.getGrid(), cdms2.grid.AbstractRectGrid)):
+        # for curvilinear and generic grids
+        # 1. getAxisList() returns the axes and
+        # 2. getLongitude() and getLatitude() return the lon,lat variables
+        lon_name = var.getLongitude().id
+        lat_name = var.getLatitude().id
+        lon_lat = [lon_name, lat_name]
+        # add min/max for longitude/latitude, computed once for each grid
+        grid = var.getGrid()
+        source = getattr(getattr(var, 'parent', None), 'id', None)
+        if source:
+            grid_key = (source, grid.id)
+        else:
+            grid_key = (None, id(grid))
+        if grid_key not in grid_bounds:
+            grid_bounds[grid_key] = (coord_bounds(var.getLongitude()),
+                                     coord_bounds(var.getLatitude()))
+        out_vars.setdefault(lon_name, {})['bounds'] = grid_bounds[grid_key][0]
+        out_vars.setdefault(lat_name, {})['bounds'] = grid_bounds[grid_key][1]
+    if isinstance(var.getGrid(), cdms2.grid.AbstractRectGrid):
+        grid_type = 'rectilinear'
+    elif isinstance(var.getGrid(), cdms2.hgrid.AbstractCurveGrid):
+        grid_type = 'curvilinear'
+    elif isinstance(var.getGrid(), cdms2.gengrid.AbstractGenericGrid):
+        grid_type = 'generic'
+    else:
+        grid_type = None
+    info = out_vars.setdefault(vname, {})
+    info['name'] = name
+    info['pythonID'] = id(var)
+    info['shape'] = var.shape
+    info['units'] = units
+    info['axisList'] = axis_list
+    info['lonLat'] = lon_lat
+    info['gridType'] = grid_type
+    info['preview'] = preview_info(var)
+    info.setdefault('bounds', None)
+
+
+def _axis_name_units(aname, axis):
+    name = axis.id if hasattr(axis, 'id') else aname
+    units = axis.units if hasattr(axis, 'units') else 'Unknown'
+    return name, units
+
+
+def add_axis_info(aname, axis, out_axes):
+    """Adds the full info of an axis to out_axes, including its values.
+
+    first and last are the axis's smallest and largest values, and are left
+    out for an axis with no values.
+    """
+    name, units = _axis_name_units(aname, axis)
+    out_axes[aname] = {
+        'name': name,
+        'shape': axis.shape,
+        'units': units,
+        'modulo': axis.getModulo(),
+        'moduloCycle': axis.getModuloCycle(),
+        'data': [],
+        'isTime': axis.isTime()
+    }
+    # Read the axis once, the extremes of a monotonic axis are its endpoints
+    axis_len = len(axis)
+    if axis_len == 0:
+        return
+    values = numpy.asarray(axis[:])
+    steps = numpy.diff(values)
+    if (steps >= 0).all() or (steps <= 0).all():
+        first = float(min(values[0], values[-1]))
+        last = float(max(values[0], values[-1]))
+    else:
+        first = float(values.min())
+        last = float(values.max())
+    # Long axes are sampled with an even stride, always including the last value
+    if axis_len > MAX_DIM_LENGTH:
+        stride = -(-(axis_len - 1) // (MAX_DIM_LENGTH - 1))
+        indices = list(range(0, axis_len, stride))
+        if indices[-1] != axis_len - 1:
+            indices.append(axis_len - 1)
+        values = values[indices]
+    out_axes[aname].update(data=values.tolist(), first=first, last=last)
+
+
+def add_axis_summary(aname, axis, out_axes):
+    """Adds the attributes of an axis to out_axes, without reading its values."""
+    name, units = _axis_name_units(aname, axis)
+    out_axes[aname] = {
+        'name': name,
+        'shape': axis.shape,
+        'units': units,
+        'isTime': axis.isTime()
+    }
+
+
+def variable_axes_info(var):
+    """Returns the full info of each axis of a variable."""
+    out_axes = {}
+    names = var.getAxisIds()
+    for idx in var.getAxisListIndex():
+        add_axis_info(names[idx], var.getAxis(idx), out_axes)
+    return out_axes
@@ -0,0 +1,298 @@
+"""Variables that stay in their file until a region of them is used."""
+import operator
+import os
+
+import numpy
+import cdms2
+
+from .chunked import REDUCTIONS, chunked_reduce
+from .readers import get_reader
+
+# Names of the generic axis keywords cdms2 accepts, and the test for each
+_AXIS_KEYWORDS = {
+    'time': 'isTime',
+    'level': 'isLevel',
+    'latitude': 'isLatitude',
+    'longitude': 'isLongitude',
+}
+
+
+def _axis_matches(axis, key):
+    """Whether key names the axis, by its id or a generic name like 'latitude'."""
+    test = _AXIS_KEYWORDS.get(key)
+    return key == axis.id or (test is not None and getattr(axis, test)())
+
+
+def _selection_slice(axis, spec):
+    """Converts a cdms2 selector of an axis to a (start, step, count) of its indices.
+
+    A single value selects its nearest index. The start and stop may lie past
+    the ends of a circular axis, cdms2 wraps them when the region is read.
+    """
+    if spec is None or spec == ':':
+        return 0, 1, len(axis)
+    if isinstance(spec, slice):
+        return _compose((0, 1, len(axis)), spec)
+    if not isinstance(spec, (tuple, list)):
+        spec = (spec, spec, 'cob')
+    interval = axis.mapIntervalExt(tuple(spec))
+    if interval is None:
+        raise cdms2.CDMSError('No values of axis {} are within {}'.format(axis.id, spec))
+    start, stop, step = interval
+    return start, step, len(range(start, stop, step))
+
+
+def selection_regions(var, selection):
+    """Converts cdms2 selectors of a variable's axes, keyed by axis id or generic
+    name, to a (start, step, count) of indices for each axis."""
+    unknown = set(selection)
+    regions = []
+    for axis in var.getAxisList():
+        spec = None
+        for key, value in selection.items():
+            if _axis_matches(axis, key):
+                spec = value
+                unknown.discard(key)
+        regions.append(_selection_slice(axis, spec))
+    if unknown:
+        raise cdms2.CDMSError('{} has no axis {}'.format(var.id, ', '.join(sorted(unknown))))
+    return regions
+
+
+def _compose(base, key):
+    """Applies a slice to a (start, step, count) of indices, giving another one."""
+    start, step, count = base
+    first, stop, stride = key.indices(count)
+    return start + first * step, step * stride, len(range(first, stop, stride))
+
+
+def _as_slice(region):
+    start, step, count = region
+    stop = start + count * step
+    if count == 0:
+        stop = start
+    return slice(start, stop if stop >= 0 else None, step)
+
+
+class LazyVariable(object):
+    """A region of a file variable that is only read when it's indexed or computed with.
+
+    It has the shape, axes and attributes of the region, so it can be listed
+    and described without reading its data. Indexing or calling it reads just
+    the values selected. The sum, mean, min, max and std methods read it a
+    block at a time, so regions larger than memory can be reduced. Arithmetic
+    and other numpy functions read the whole region, but comparing with ==
+    still compares the objects. The file is read through the reader pool.
+    """
+
+    def __init__(self, path, name, **selection):
+        self.path = path if '://' in path else os.path.abspath(path)
+        self.name = name
+        var = get_reader(self.path)[name]
+        if var is None:
+            raise cdms2.CDMSError('The file {} has no variable {}'.format(path, name))
+        self.attributes = dict(var.attributes)
+        self.dtype = numpy.dtype(var.dtype)
+        grid = var.getGrid()
+        self._rect_grid = grid is None or isinstance(grid, cdms2.grid.AbstractRectGrid)
+        self._regions = selection_regions(var, selection)
+        self._axes = []
+        for axis, region in zip(var.getAxisList(), self._regions):
+            sub = _as_slice(region)
+            self._axes.append(axis.subaxis(sub.start, sub.stop, sub.step))
+        self.id = name
+
+    def __getattr__(self, name):
+        attributes = self.__dict__.get('attributes')
+        if attributes is None or name.startswith('__') or name not in attributes:
+            raise AttributeError(name)
+        return attributes[name]
+
+    @property
+    def shape(self):
+        return tuple(region[2] for region in self._regions)
+
+    @property
+    def regions(self):
+        """The (start, step, count) of the file variable's indices along each axis."""
+        return list(self._regions)
+
+    @property
+    def ndim(self):
+        return len(self._regions)
+
+    @property
+    def size(self):
+        return int(numpy.prod(self.shape))
+
+    def rank(self):
+        return len(self._regions)
+
+    def __len__(self):
+        return self.shape[0] if self._regions else 0
+
+    def __repr__(self):
+        return '<LazyVariable {} {} of {}>'.format(self.id, self.shape, self.path)
+
+    def getAxisList(self):
+        return list(self._axes)
+
+    def getAxis(self, index):
+        return self._axes[index]
+
+    def getAxisIds(self):
+        return [axis.id for axis in self._axes]
+
+    def getAxisListIndex(self):
+        return list(range(len(self._axes)))
+
+    def getAxisIndex(self, axis_spec):
+        """The index of the axis with the id or generic name given, or -1."""
+        for index, axis in enumerate(self._axes):
+            if _axis_matches(axis, axis_spec):
+                return index
+        return -1
+
+    def _find_axis(self, test):
+        for axis in self._axes:
+            if getattr(axis, test)():
+                return axis
+        return None
+
+    def getTime(self):
+        return self._find_axis('isTime')
+
+    def getLevel(self):
+        return self._find_axis('isLevel')
+
+    def getLatitude(self):
+        if not self._rect_grid:
+            return None
+        return self._find_axis('isLatitude')
+
+    def getLongitude(self):
+        if not self._rect_grid:
+            return None
+        return self._find_axis('isLongitude')
+
+    def getGrid(self):
+        """The rectilinear grid of the region. Curvilinear and generic grids
+        aren't kept, they come with the values when they're read."""
+        lat = self.getLatitude()
+        lon = self.getLongitude()
+        if lat is None or lon is None:
+            return None
+        order = 'yx' if self._axes.index(lat) < self._axes.index(lon) else 'xy'
+        return cdms2.createRectGrid(lat, lon, order)
+
+    def _read(self, regions):
+        var = get_reader(self.path)[self.name]
+        return var.subRegion(*[_as_slice(region) for region in regions])
+
+    def __getitem__(self, key):
+        """Reads the values at the indices in key, which may hold integers,
+        slices and an Ellipsis, as with a numpy array."""
+        if not isinstance(key, tuple):
+            key = (key,)
+        if any(item is Ellipsis for item in key):
+            at = [item is Ellipsis for item in key].index(True)
+            fill = (slice(None),) * (self.ndim - len(key) + 1)
+            key = key[:at] + fill + key[at + 1:]
+        if len(key) > self.ndim:
+            raise IndexError('too many indices for a variable of rank {}'.format(self.ndim))
+        key = key + (slice(None),) * (self.ndim - len(key))
+        regions = []
+        drop = []
+        dropped = False
+        for region, item in zip(self._regions, key):
+            if isinstance(item, slice):
+                regions.append(_compose(region, item))
+                drop.append(slice(None))
+                continue
+            index = operator.index(item)
+            if index < 0:
+                index += region[2]
+            if not 0 <= index < region[2]:
+                raise IndexError('index {} is out of bounds for an axis of length {}'
+                                 .format(item, region[2]))
+            regions.append(_compose(region, slice(index, index + 1)))
+            drop.append(0)
+            dropped = True
+        values = self._read(regions)
+        if dropped:
+            values = values[tuple(drop)]
+        return values
+
+    def __call__(self, *args, **selection):
+        """Reads a region given with cdms2 selectors, for example v(latitude=(-10, 10))."""
+        squeeze = selection.pop('squeeze', 0)
+        key = list(args) + [slice(None)] * (self.ndim - len(args))
+        for name, spec in selection.items():
+            for index, axis in enumerate(self._axes):
+                if _axis_matches(axis, name):
+                    key[index] = spec
+                    break
+            else:
+                raise cdms2.CDMSError('{} has no axis {}'.format(self.id, name))
+        for index, spec in enumerate(key):
+            if not isinstance(spec, slice):
+                key[index] = _as_slice(_selection_slice(self._axes[index], spec))
+        values = self[tuple(key)]
+        if squeeze:
+            values = values(squeeze=1)
+        return values
+
+    def load(self):
+        """Reads the whole region into a TransientVariable."""
+        return self[...]
+
+    def slab(self, rank=2):
+        """Reads the first values of the leading axes and all of the last rank
+        axes, the part vcs shows when the variable is plotted."""
+        if self.ndim <= rank:
+            return self.load()
+        lead = tuple(slice(0, 1) for _ in range(self.ndim - rank))
+        return self[lead + (slice(None),) * rank]
+
+    def __array__(self, dtype=None, copy=None):
+        return numpy.asarray(self.load(), dtype=dtype)
+
+
+def _load_operator(name):
+    def method(self, *args):
+        args = [arg.load() if isinstance(arg, LazyVariable) else arg for arg in args]
+        return getattr(self.load(), name)(*args)
+    method.__name__ = name
+    return method
+
+
+for _name in ('__add__', '__radd__', '__sub__', '__rsub__', '__mul__', '__rmul__',
+              '__truediv__', '__rtruediv__', '__floordiv__', '__rfloordiv__',
+              '__pow__', '__rpow__', '__mod__', '__neg__', '__abs__',
+              '__lt__', '__le__', '__gt__', '__ge__'):
+    setattr(LazyVariable, _name, _load_operator(_name))
+
+
+def _chunked_reduction(op):
+    def method(self, axis=None, **_):
+        return chunked_reduce(self, op, axis)
+    method.__name__ = op
+    method.__doc__ = ('The {} over axis, or all values if axis is None, read a block '
+                      'at a time.'.format(op))
+    return method
+
+
+for _name in REDUCTIONS:
+    setattr(LazyVariable, _name, _chunked_reduction(_name))
+
+
+def lazy_variable(path, name, **selection):
+    """Returns a LazyVariable of the region of a file variable in selection."""
+    return LazyVariable(path, name, **selection)
+
+
+def plot_data(var):
+    """The part of a variable vcs plots, only read from the file for a LazyVariable."""
+    if isinstance(var, LazyVariable):
+        return var.slab()
+    return var
@@ -0,0 +1,126 @@
+"""Estimates the memory a load takes before any values are read."""
+import numpy
+
+from .constants import LOAD_MEMORY_FRACTION
+from .lazy import LazyVariable, selection_regions
+from .readers import get_reader
+
+# Memory limits and usage of the kernel's cgroup, for cgroup v2 and v1
+_CGROUP_FILES = (
+    ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory.current'),
+    ('/sys/fs/cgroup/memory/memory.limit_in_bytes',
+     '/sys/fs/cgroup/memory/memory.usage_in_bytes'),
+)
+
+
+def _read_first(path):
+    with open(path) as source:
+        return source.read().strip()
+
+
+def available_memory():
+    """Returns the bytes of memory the kernel can still use, or None if it's unknown.
+
+    Uses psutil if it's installed, otherwise /proc/meminfo. The kernel's cgroup
+    limit is used instead when it's lower, as it is in most JupyterHub containers.
+    """
+    available = None
+    try:
+        import psutil
+        available = psutil.virtual_memory().available
+    except ImportError:
+        try:
+            with open('/proc/meminfo') as meminfo:
+                for line in meminfo:
+                    if line.startswith('MemAvailable:'):
+                        available = int(line.split()[1]) * 1024
+                        break
+        except (IOError, ValueError):
+            pass
+    for limit_path, usage_path in _CGROUP_FILES:
+        try:
+            limit = _read_first(limit_path)
+            usage = int(_read_first(usage_path))
+        except (IOError, ValueError):
+            continue
+        if limit != 'max':
+            left = max(0, int(limit) - usage)
+            if available is None or left < available:
+                available = left
+        break
+    return available
+
+
+def subsample_strides(shape, itemsize, target):
+    """Returns the stride of each axis that brings a region within target bytes.
+
+    The longest axis after striding is thinned first, so the axes keep similar
+    resolutions.
+    """
+    strides = [1] * len(shape)
+
+    def lengths():
+        return [-(-length // stride) for length, stride in zip(shape, strides)]
+
+    while itemsize * int(numpy.prod(lengths())) > target:
+        current = lengths()
+        axis = current.index(max(current))
+        if current[axis] <= 1:
+            break
+        # Shorten the axis by about a tenth each step
+        goal = max(1, current[axis] - max(1, current[axis] // 10))
+        strides[axis] = -(-shape[axis] // goal)
+    return strides
+
+
+def estimate_load(requests):
+    """Finds the bytes the selected region of each variable takes, without reading them.
+
+    requests holds an (alias, path, name, selection) for each variable. If the total
+    is more than LOAD_MEMORY_FRACTION of the kernel's available memory, each
+    variable also gets the strides that subsample it to its share of that.
+    """
+    available = available_memory()
+    limit = None if available is None else int(available * LOAD_MEMORY_FRACTION)
+    out_vars = {}
+    for alias, path, name, selection in requests:
+        var = get_reader(path)[name]
+        shape = [region[2] for region in selection_regions(var, selection)]
+        itemsize = numpy.dtype(var.dtype).itemsize
+        out_vars[alias] = {
+            'shape': shape,
+            'itemsize': itemsize,
+            'bytes': itemsize * int(numpy.prod(shape))
+        }
+    total = sum(info['bytes'] for info in out_vars.values())
+    if limit is not None and total > limit:
+        for info in out_vars.values():
+            strides = subsample_strides(info['shape'], info['itemsize'],
+                                        limit * info['bytes'] // total)
+            info['strides'] = strides
+            info['subsampledShape'] = [-(-length // stride)
+                                       for length, stride in zip(info['shape'], strides)]
+    return {
+        'variables': out_vars,
+        'totalBytes': total,
+        'availableBytes': available,
+        'limitBytes': limit
+    }
+
+
+def write_data(var):
+    """The values of a variable to write to a file.
+
+    A LazyVariable is read whole first. If its region is bigger than the memory
+    the kernel has left, MemoryError explains why instead of the kernel dying.
+    """
+    if not isinstance(var, LazyVariable):
+        return var
+    available = available_memory()
+    size = numpy.dtype(var.dtype).itemsize * int(numpy.prod(var.shape))
+    if available is not None and size > available:
+        raise MemoryError(
+            '{} is loaded lazily and takes {} bytes, more than the {} bytes of memory '
+            'the kernel has left. Select a smaller region or subsample it before '
+            'saving it.'.format(var.id, size, available))
+    return var.load()
@@ -0,0 +1,82 @@
+"""Stores file metadata on disk, keyed by the file's path, mtime and size.
+
+Entries are evicted least recently used first once the cache exceeds its size limits.
+An entry's modification time records when it was last used, so kernels sharing the
+cache never rewrite a common index.
+"""
+import os
+import hashlib
+
+from .constants import METADATA_CACHE_MAX_BYTES, METADATA_CACHE_MAX_ENTRIES
+
+# Part of every key, bump it when the info cached changes so older entries are not used
+CACHE_FORMAT = 3
+
+
+def cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME',
+                          os.path.join(os.path.expanduser('~'), '.cache'))
+    path = os.path.join(base, 'vcdat', 'metadata')
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    return path
+
+
+def _cache_key(file_path, kind):
+    stat = os.stat(file_path)
+    key = '{}|{}|{}|{}|{}'.format(CACHE_FORMAT, os.path.abspath(file_path),
+                                  stat.st_mtime_ns, stat.st_size, kind)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _write(file_path, text):
+    tmp_path = '{}.{}.tmp'.format(file_path, os.getpid())
+    with open(tmp_path, 'w') as tmp_file:
+        tmp_file.write(text)
+    os.replace(tmp_path, file_path)
+
+
+def _evict(directory):
+    """Removes the least recently used entries until the cache is within its limits."""
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.json'):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    count = len(entries)
+    for _, size, path in entries:
+        if total <= METADATA_CACHE_MAX_BYTES and count <= METADATA_CACHE_MAX_ENTRIES:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total -= size
+        count -= 1
+
+
+def cache_get(file_path, kind):
+    """Returns the cached text for the file, or None if the file changed or was never cached."""
+    try:
+        path = os.path.join(cache_dir(), _cache_key(file_path, kind) + '.json')
+        with open(path) as entry:
+            text = entry.read()
+        # Marks the entry as recently used
+        os.utime(path)
+        return text
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def cache_put(file_path, kind, text):
+    try:
+        directory = cache_dir()
+        _write(os.path.join(directory, _cache_key(file_path, kind) + '.json'), text)
+        _evict(directory)
+    except (IOError, OSError, ValueError):
+        pass
@@ -0,0 +1,188 @@
+"""Loads variables from several files at once, in worker processes.
+
+cdms2 holds one lock around every netCDF call, so threads would still read
+one file at a time. Each file is read by a worker process instead, and the
+values come back through files in /dev/shm, which the kernel maps without
+copying them. Without /dev/shm they are sent back through the pool.
+"""
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import __main__
+import numpy
+import cdms2
+
+from .constants import LOAD_WORKER_IDLE_SECONDS, LOAD_WORKERS
+from .lazy import LazyVariable
+from .shared import shared_variable
+
+# The worker processes, kept for later loads until they're idle: [executor, last used]
+_workers = [None, 0]
+
+
+def _spill_dir():
+    """The directory to pass values through, or None to send them through the pool."""
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return None
+
+
+def _spill(values, spill_dir):
+    """Writes an array to a temporary .npy file, returning its path."""
+    handle, path = tempfile.mkstemp(prefix='vcdat-load-', suffix='.npy', dir=spill_dir)
+    try:
+        with os.fdopen(handle, 'wb') as out:
+            numpy.lib.format.write_array(out, numpy.ascontiguousarray(values))
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def _read_file(path, requests, spill_dir, shared):
+    """Runs in a worker: reads the regions of the variables of one file.
+
+    Returns (alias, data, mask) for each request, where data and mask are
+    .npy paths if spill_dir is given and arrays otherwise. Shared loads are
+    only added to the shared slab cache, which the kernel then maps.
+    """
+    out = []
+    for alias, name, selection in requests:
+        if shared:
+            shared_variable(path, name, **selection)
+            out.append((alias, None, None))
+            continue
+        values = LazyVariable(path, name, **selection).load()
+        data = numpy.ma.getdata(values)
+        mask = numpy.ma.getmask(values)
+        if mask is numpy.ma.nomask or not mask.any():
+            mask = None
+        if spill_dir is not None:
+            try:
+                data = _spill(data, spill_dir)
+                mask = None if mask is None else _spill(mask, spill_dir)
+            except OSError:
+                # /dev/shm is full, send the arrays through the pool instead
+                if isinstance(data, str):
+                    os.remove(data)
+                    data = numpy.ma.getdata(values)
+        out.append((alias, data, mask))
+    return out
+
+
+def _unspill(value):
+    """Maps a spilled array copy-on-write and removes its file, the mapping keeps the values."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return numpy.load(value, mmap_mode='c')
+    finally:
+        os.remove(value)
+
+
+def _discard(results):
+    for _, data, mask in results:
+        for value in (data, mask):
+            if isinstance(value, str) and os.path.exists(value):
+                os.remove(value)
+
+
+def get_context():
+    """Returns the multiprocessing context the kernel's process pools start workers with.
+
+    Workers fork from a server which has imported cdms2 already, so they start
+    quickly. Where that isn't available each worker starts a new interpreter.
+    The kernel itself is never forked.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['vcdat_kernel'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _executor():
+    if _workers[0] is None:
+        _workers[0] = ProcessPoolExecutor(max_workers=LOAD_WORKERS, mp_context=get_context())
+    _workers[1] = time.time()
+    return _workers[0]
+
+
+def close_idle_workers(now=None):
+    """Stops the worker processes if no load used them in LOAD_WORKER_IDLE_SECONDS."""
+    if now is None:
+        now = time.time()
+    if _workers[0] is not None and now - _workers[1] > LOAD_WORKER_IDLE_SECONDS:
+        _workers[0].shutdown(wait=False)
+        _workers[0] = None
+
+
+def load_variables(requests, shared=False):
+    """Reads regions of file variables and binds them to their aliases in the
+    notebook all at once.
+
+    requests holds an (alias, path, name, selection) for each variable. The
+    files are read in parallel by worker processes, one file per worker, so
+    the load takes about as long as the slowest file. If any read fails, no
+    alias is assigned and the error is raised. With shared, the values are
+    mapped from the shared slab cache as shared_variable does.
+    """
+    files = OrderedDict()
+    for alias, path, name, selection in requests:
+        files.setdefault(path, []).append((alias, name, selection))
+    loaded = {}
+    if len(files) < 2 or LOAD_WORKERS < 2:
+        for path, file_requests in files.items():
+            for alias, name, selection in file_requests:
+                if shared:
+                    loaded[alias] = shared_variable(path, name, **selection)
+                else:
+                    loaded[alias] = LazyVariable(path, name, **selection).load()
+        __main__.__dict__.update(loaded)
+        return
+
+    spill_dir = None if shared else _spill_dir()
+    executor = _executor()
+    futures = [executor.submit(_read_file, path, file_requests, spill_dir, shared)
+               for path, file_requests in files.items()]
+    results = []
+    error = None
+    for future in futures:
+        try:
+            results.extend(future.result())
+        except Exception as failure:
+            if error is None:
+                error = failure
+    if error is not None:
+        _discard(results)
+        if isinstance(error, BrokenProcessPool):
+            # A worker died, start new ones for the next load
+            _workers[0] = None
+        raise error
+    # The axes and attributes come from the kernel's own pooled readers
+    selections = {alias: (path, name, selection)
+                  for path, file_requests in files.items()
+                  for alias, name, selection in file_requests}
+    try:
+        for alias, data, mask in results:
+            path, name, selection = selections[alias]
+            if shared:
+                loaded[alias] = shared_variable(path, name, **selection)
+                continue
+            lazy = LazyVariable(path, name, **selection)
+            values = numpy.ma.MaskedArray(
+                _unspill(data), mask=numpy.ma.nomask if mask is None else _unspill(mask),
+                copy=False)
+            if values.shape != lazy.shape:
+                raise cdms2.CDMSError('{} changed while it was read'.format(path))
+            loaded[alias] = cdms2.createVariable(
+                values, copy=0, axes=lazy.getAxisList(), id=name,
+                attributes=dict(lazy.attributes))
+    finally:
+        _discard(results)
+    __main__.__dict__.update(loaded)
@@ -0,0 +1,73 @@
+"""Reduced resolution previews of variables, sized to fit the canvas they're plotted on."""
+import weakref
+
+from .lazy import LazyVariable
+
+# The previews that are still alive, by id: (reference, path, name, selection, strides)
+_previews = {}
+
+
+def preview_strides(shape, width, height):
+    """Returns the strides that thin the last two axes, the ones vcs plots, to at most
+    height by width values."""
+    strides = [1] * len(shape)
+    if len(shape) >= 1:
+        strides[-1] = max(1, -(-shape[-1] // width))
+    if len(shape) >= 2:
+        strides[-2] = max(1, -(-shape[-2] // height))
+    return strides
+
+
+def _register(preview, path, name, selection, strides):
+    key = id(preview)
+
+    def forget(ref):
+        if _previews.get(key, (None,))[0] is ref:
+            del _previews[key]
+
+    _previews[key] = (weakref.ref(preview, forget), path, name, selection, strides)
+
+
+def _entry(var):
+    entry = _previews.get(id(var))
+    if entry is None or entry[0]() is not var:
+        return None
+    return entry
+
+
+def preview_variable(path, name, width, height, **selection):
+    """Reads the region of a file variable with its last two axes thinned to fit a
+    width by height canvas. full_resolution reads it again in full."""
+    lazy = LazyVariable(path, name, **selection)
+    strides = preview_strides(lazy.shape, width, height)
+    preview = lazy[tuple(slice(None, None, stride) for stride in strides)]
+    _register(preview, lazy.path, name, dict(selection), strides)
+    return preview
+
+
+def preview_info(var):
+    """Returns the strides a preview was read with, or None if var isn't a preview."""
+    entry = _entry(var)
+    return None if entry is None else entry[4]
+
+
+def full_resolution(var):
+    """Reads a preview again at full resolution. Other variables are returned as they are."""
+    entry = _entry(var)
+    if entry is None:
+        return var
+    _, path, name, selection, _ = entry
+    return LazyVariable(path, name, **selection).load()
+
+
+def preview_data(var, width, height):
+    """The part of a variable vcs plots, thinned to fit a width by height canvas.
+
+    Only the values used are read from the file for a LazyVariable.
+    """
+    shape = var.shape
+    strides = preview_strides(shape, width, height)
+    lead = max(0, len(shape) - 2)
+    key = tuple([slice(0, 1)] * lead
+                + [slice(None, None, stride) for stride in strides[lead:]])
+    return var[key]
@@ -0,0 +1,118 @@
+"""A pool of open file readers shared by loads, axis queries and metadata scans.
+
+Opening a netCDF or HDF5 file, on a parallel file system especially, can take
+longer than reading a small variable from it, so readers stay open between
+requests. The least recently used reader is closed when the pool is full,
+and readers are closed once idle or reopened when their file changes.
+In a kernel, idle readers are closed by a callback on its IOLoop, which only
+runs between cells. Elsewhere they're closed by the next access to the pool.
+"""
+import os
+import time
+from collections import OrderedDict
+
+import cdms2
+
+from .constants import READER_IDLE_SECONDS, READER_POOL_SIZE
+
+# The open readers by path, least recently used first: (reader, file stat, last used)
+_readers = OrderedDict()
+
+# The IOLoop callback that closes the readers once idle, while one is pending
+_idle_timer = None
+
+
+def _pool_key(path):
+    """URLs (OPeNDAP) are kept as they are, file paths are made absolute."""
+    return path if '://' in path else os.path.abspath(path)
+
+
+def _file_stat(key):
+    """The modification time and size of a file, or None for a URL."""
+    if '://' in key:
+        return None
+    stat = os.stat(key)
+    return stat.st_mtime, stat.st_size
+
+
+def _close(key):
+    reader = _readers.pop(key)[0]
+    try:
+        reader.close()
+    except Exception:
+        pass
+
+
+def close_idle_readers(now=None):
+    """Closes the readers that weren't used in the last READER_IDLE_SECONDS."""
+    if now is None:
+        now = time.time()
+    for key in [key for key, entry in _readers.items()
+                if now - entry[2] > READER_IDLE_SECONDS]:
+        _close(key)
+
+
+def _schedule_idle_close():
+    """Calls close_idle_readers when the least recently used reader becomes idle."""
+    global _idle_timer
+    if _idle_timer is not None or not _readers:
+        return
+    try:
+        from tornado.ioloop import IOLoop
+    except ImportError:
+        return
+    loop = IOLoop.current(instance=False)
+    if loop is None:
+        return
+
+    def close_idle():
+        global _idle_timer
+        _idle_timer = None
+        close_idle_readers()
+        _schedule_idle_close()
+
+    oldest = next(iter(_readers.values()))[2]
+    delay = max(0, oldest + READER_IDLE_SECONDS - time.time()) + 1
+    _idle_timer = loop.call_later(delay, close_idle)
+
+
+def close_readers(path=None):
+    """Closes the pooled reader of a file, or every pooled reader if path is None."""
+    keys = list(_readers) if path is None else [_pool_key(path)]
+    for key in keys:
+        if key in _readers:
+            _close(key)
+
+
+def get_reader(path):
+    """Returns an open cdms2 reader of a file, from the pool if it's there.
+
+    The file is opened again if it changed since it was opened. The reader
+    belongs to the pool, so callers must not close it.
+    """
+    key = _pool_key(path)
+    now = time.time()
+    close_idle_readers(now)
+    stat = _file_stat(key)
+    entry = _readers.get(key)
+    if entry is not None and entry[1] != stat:
+        _close(key)
+        entry = None
+    if entry is None:
+        reader = cdms2.open(key)
+        while len(_readers) >= READER_POOL_SIZE:
+            _close(next(iter(_readers)))
+    else:
+        reader = entry[0]
+    _readers[key] = (reader, stat, now)
+    _readers.move_to_end(key)
+    _schedule_idle_close()
+    return reader
+
+
+def read_variable(path, name, **selection):
+    """Reads the region of a file variable in selection, with a pooled reader."""
+    var = get_reader(path)[name]
+    if var is None:
+        raise cdms2.CDMSError('The file {} has no variable {}'.format(path, name))
+    return var(**selection)
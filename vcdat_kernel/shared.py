@@ -0,0 +1,174 @@
+"""An opt-in cache of loaded slabs shared by the kernels on a node.
+
+Each slab is written once to a .npy file, in /dev/shm when the node has it.
+Slabs with missing values keep them in <key>.masked.npy and their mask in
+<key>.mask.npy, so a masked slab is never mistaken for one without a mask.
+Kernels loading the same region of the same version of a file map that file
+read-only instead of reading the region and keeping their own copy, so the
+node holds one copy however many kernels use it.
+
+By default each user has their own directory, readable only by them, so
+only their own kernels share slabs. Anyone who can write to the directory
+can place slabs other kernels will load, so a directory shared by several
+users has to be set explicitly with VCDAT_SHARED_CACHE_DIR, for example a
+group directory for users who trust each other.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy
+import cdms2
+
+from .constants import SHARED_CACHE_MAX_BYTES
+from .lazy import LazyVariable
+
+
+def cache_dir():
+    """Returns the slab directory, creating it if needed.
+
+    The default directory is private to the user. Raises OSError if it
+    belongs to someone else or others can write to it.
+    """
+    directory = os.environ.get('VCDAT_SHARED_CACHE_DIR')
+    if directory:
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        return directory
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    directory = os.path.join(base, 'vcdat-slabs-{}'.format(os.getuid()))
+    try:
+        os.mkdir(directory, 0o700)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+    # Someone else may have made the directory first, to plant slabs in it
+    stat = os.lstat(directory)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+        raise OSError('{} is not private to this user'.format(directory))
+    return directory
+
+
+def slab_key(lazy):
+    """Names the region of a LazyVariable in a version of its file."""
+    version = None
+    if '://' not in lazy.path:
+        stat = os.stat(lazy.path)
+        version = [stat.st_mtime_ns, stat.st_size]
+    ident = [lazy.path, version, lazy.name, [list(region) for region in lazy.regions]]
+    return hashlib.sha1(json.dumps(ident).encode('utf-8')).hexdigest()
+
+
+def _map(path, shape, dtype=None):
+    """Maps a cached array read-only, or returns None if it's missing or doesn't match.
+
+    Without a dtype, the array keeps the one it was written with, which may
+    differ from the dtype the variable declares.
+    """
+    try:
+        values = numpy.load(path, mmap_mode='r')
+    except (IOError, ValueError):
+        return None
+    if values.shape != tuple(shape) or (dtype is not None and values.dtype != dtype):
+        return None
+    return values
+
+
+def _write(path, values):
+    """Writes an array under a temporary name and renames it, so other kernels
+    never map a partly written slab."""
+    temp = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(temp, 'wb') as out:
+            numpy.lib.format.write_array(out, numpy.ascontiguousarray(values))
+        os.chmod(temp, 0o444)
+        os.replace(temp, path)
+    except OSError:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+def _evict(directory, incoming):
+    """Removes the least recently used slabs until incoming bytes fit within
+    SHARED_CACHE_MAX_BYTES. Kernels that mapped them keep their copy."""
+    slabs = {}
+    for entry in os.scandir(directory):
+        if entry.name.endswith('.npy'):
+            stat = entry.stat()
+            slab = slabs.setdefault(entry.name.split('.')[0], [0, 0, []])
+            slab[0] = max(slab[0], stat.st_mtime)
+            slab[1] += stat.st_size
+            slab[2].append(entry.path)
+    total = incoming + sum(slab[1] for slab in slabs.values())
+    for _, size, paths in sorted(slabs.values()):
+        if total <= SHARED_CACHE_MAX_BYTES:
+            break
+        try:
+            # The values go before the mask, so a slab is never left without its mask
+            for path in sorted(paths, key=lambda path: path.endswith('.mask.npy')):
+                os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _store(base, values, directory):
+    mask = numpy.ma.getmask(values)
+    has_mask = mask is not numpy.ma.nomask and mask.any()
+    _evict(directory, values.nbytes + (mask.nbytes if has_mask else 0))
+    if has_mask:
+        # The mask goes first, so its values are never mapped without it
+        _write(base + '.mask.npy', mask)
+        _write(base + '.masked.npy', numpy.ma.getdata(values))
+    else:
+        _write(base + '.npy', numpy.ma.getdata(values))
+
+
+def _map_slab(base, lazy):
+    """Maps a cached slab as a MaskedArray, or returns None if any part of it
+    is missing. The mask is mapped before the values it belongs to, so a slab
+    evicted in between is read again rather than losing its mask."""
+    mask = _map(base + '.mask.npy', lazy.shape, numpy.bool_)
+    if mask is None:
+        path, mask = base + '.npy', numpy.ma.nomask
+    else:
+        path = base + '.masked.npy'
+    data = _map(path, lazy.shape)
+    if data is None:
+        return None
+    try:
+        # Marks the slab as recently used, which only works for our own slabs
+        os.utime(path)
+    except OSError:
+        pass
+    return numpy.ma.MaskedArray(data, mask=mask, copy=False)
+
+
+def shared_variable(path, name, **selection):
+    """Loads the region of a file variable in selection from the node's shared
+    slab cache, reading it and adding it first if no kernel has yet.
+
+    The values are mapped read-only, so clone the variable before changing it
+    in place. If the cache can't be written, the values are returned as read.
+    """
+    lazy = LazyVariable(path, name, **selection)
+    try:
+        directory = cache_dir()
+    except OSError:
+        return lazy.load()
+    base = os.path.join(directory, slab_key(lazy))
+    values = _map_slab(base, lazy)
+    if values is None:
+        values = lazy.load()
+        try:
+            _store(base, values, directory)
+        except OSError:
+            return values
+        del values
+        values = _map_slab(base, lazy)
+        if values is None:
+            return lazy.load()
+    return cdms2.createVariable(values, copy=0, axes=lazy.getAxisList(), id=name,
+                                attributes=dict(lazy.attributes))
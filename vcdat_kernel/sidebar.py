@@ -0,0 +1,167 @@
+"""Tracks the state the sidebar shows: variables, graphics methods, templates and plots.
+
+Each piece has a version which changes when its value does, so only the
+pieces the sidebar doesn't have yet are sent.
+"""
+import uuid
+
+import __main__
+import cdms2
+import vcs
+
+from .info import add_var_info
+from .lazy import LazyVariable
+from .parallel import close_idle_workers
+from .readers import close_idle_readers
+
+# The notebook variables at the last refresh: {token, fingerprint, entries}
+_var_state = None
+# The versions of the last snapshot: {session, plotCount, plotExists, versions}
+_snapshot_state = None
+# The post_run_cell hook that is installed, if any
+_push_hook = None
+
+
+def refresh_variables(since):
+    """Returns the notebook variables added, reassigned or removed since a refresh.
+
+    A fingerprint of each variable's name, id and shape is kept along with its
+    info, so only new or reassigned variables are scanned again. If since isn't
+    the token of the latest refresh, every variable is returned.
+    """
+    global _var_state
+    state = _var_state
+    full = state is None or since is None or state['token'] != since
+    if state is None:
+        state = {'token': None, 'fingerprint': {}, 'entries': {}}
+    fingerprint = {}
+    for name, obj in list(__main__.__dict__.items()):
+        if isinstance(obj, (cdms2.MV2.TransientVariable, LazyVariable)):
+            fingerprint[name] = (id(obj), tuple(obj.shape))
+    changed = []
+    grid_bounds = {}
+    for name, key in fingerprint.items():
+        if state['fingerprint'].get(name) != key:
+            entries = {}
+            add_var_info(name, __main__.__dict__[name], entries, grid_bounds)
+            state['entries'][name] = entries[name]
+            changed.append(name)
+        elif full:
+            changed.append(name)
+    removed = [name for name in state['fingerprint'] if name not in fingerprint]
+    for name in removed:
+        del state['entries'][name]
+    state['fingerprint'] = fingerprint
+    state['token'] = uuid.uuid4().hex
+    _var_state = state
+    return {
+        'token': state['token'],
+        'full': full,
+        'changed': {name: state['entries'][name] for name in changed},
+        'removed': [] if full else removed
+    }
+
+
+def registry_hash(types):
+    """A cheap hash of the names of the vcs elements of the given types."""
+    key = tuple((name, tuple(vcs.elements.get(name, {}))) for name in types)
+    return '%x' % (hash(key) & 0xffffffffffffffff)
+
+
+def element_list(name, version):
+    """Returns the graphics methods ('graphics') or templates ('templates').
+
+    If version matches the registry hash, only {version, unchanged} is returned.
+    """
+    if name == 'graphics':
+        current = registry_hash(vcs.graphicsmethodlist())
+    else:
+        current = registry_hash(['template'])
+    if current == version:
+        return {'version': current, 'unchanged': True}
+    if name == 'graphics':
+        value = {gtype: vcs.listelements(gtype)
+                 for gtype in vcs.graphicsmethodlist()}
+    else:
+        value = vcs.listelements('template')
+    return {'version': current, 'value': value}
+
+
+def sidebar_snapshot(versions, since):
+    """Returns the pieces of the sidebar state with a version other than the one given.
+
+    The changed variables since the refresh token are always included.
+    """
+    global _snapshot_state
+    state = _snapshot_state
+    if state is None:
+        state = {'session': uuid.uuid4().hex, 'plotCount': 0,
+                 'plotExists': None, 'versions': {}}
+        _snapshot_state = state
+    out = {}
+    for piece in ('graphics', 'templates'):
+        elements = element_list(piece, versions.get(piece))
+        state['versions'][piece] = elements['version']
+        if 'unchanged' not in elements:
+            out[piece] = elements
+    try:
+        plot_exists = len(__main__.canvas.listelements('display')) > 1
+    except Exception:
+        plot_exists = False
+    if plot_exists != state['plotExists']:
+        state['plotCount'] += 1
+        state['plotExists'] = plot_exists
+    state['versions']['plotExists'] = '%s-%d' % (state['session'],
+                                                 state['plotCount'])
+    if versions.get('plotExists') != state['versions']['plotExists']:
+        out['plotExists'] = {'version': state['versions']['plotExists'],
+                             'value': plot_exists}
+    out['variables'] = refresh_variables(since)
+    # Runs after every cell, so idle files and workers are closed even when nothing is loaded
+    close_idle_readers()
+    close_idle_workers()
+    return out
+
+
+def install_push_hook(target, skip_marker):
+    """Sends changes to the sidebar state over a comm after each cell.
+
+    Cells containing skip_marker are the sidebar's own requests, which get the
+    state they need in their reply. Cells that don't change any CDAT objects
+    send nothing. Returns False if the kernel isn't IPython.
+    """
+    global _push_hook
+    try:
+        from IPython import get_ipython
+    except ImportError:
+        return False
+    shell = get_ipython()
+    if shell is None:
+        return False
+    events = shell.events
+
+    def push_updates(result=None):
+        info = getattr(result, 'info', None)
+        if skip_marker in (getattr(info, 'raw_cell', None) or ''):
+            return
+        # Compare to the last state computed, which the sidebar already has
+        versions = {} if _snapshot_state is None else dict(_snapshot_state['versions'])
+        since = None if _var_state is None else _var_state['token']
+        try:
+            out = sidebar_snapshot(versions, since)
+        except Exception:
+            return
+        if (len(out) == 1 and not out['variables']['changed']
+                and not out['variables']['removed']):
+            return
+        from ipykernel.comm import Comm
+        Comm(target_name=target, data={'snapshot': out}).close()
+
+    if _push_hook is not None:
+        try:
+            events.unregister('post_run_cell', _push_hook)
+        except ValueError:
+            pass
+    events.register('post_run_cell', push_updates)
+    _push_hook = push_updates
+    return True